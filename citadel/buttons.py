@@ -2,11 +2,11 @@ import discord
 import asyncio
 from discord.ext import commands
 import numpy as np
-from citadel.crafting import CraftingSelect, create_crafting_stations
+from citadel.crafting import CraftingSelect, crafting_station
 from images.urls import generate_urls
 from citadel.grains import HarvestButton
 from discord import Embed
-from utils import CommonResponses, load_player_data, save_player_data, refresh_player_from_data, get_server_setting
+from utils import CommonResponses, asave_player_data, refresh_player_from_data, aget_server_setting, aload_player_data
 import random
 
 class CitadelCog(commands.Cog, CommonResponses):
@@ -32,7 +32,7 @@ class CitadelCog(commands.Cog, CommonResponses):
             return
 
         if player_data["location"] == "citadel":
-            will_encounter_brute = random.random() <= get_server_setting(guild_id, "brute_percent")
+            will_encounter_brute = random.random() <= await aget_server_setting(guild_id, "brute_percent")
 
             # Defer the response because there might be a delay due to suspense buildup
             await ctx.defer(ephemeral=True)
@@ -67,7 +67,7 @@ class CitadelCog(commands.Cog, CommonResponses):
 
             # Regardless of encounter, update the player location to None
             player_data["location"] = None
-            save_player_data(guild_id, player_id, player_data)
+            await asave_player_data(guild_id, player_id, player_data)
 
             return
 
@@ -77,12 +77,11 @@ class CitadelCog(commands.Cog, CommonResponses):
     @commands.slash_command(description="Visit the Citadel!")
     async def citadel(self, ctx):
 
-        from utils import load_player_data
         from exemplars.exemplars import Exemplar
 
         guild_id = ctx.guild.id
         author_id = str(ctx.author.id)
-        player_data = load_player_data(guild_id, author_id)
+        player_data = await aload_player_data(guild_id, author_id)
 
         # Check if player data exists for the user
         if not player_data:
@@ -141,7 +140,7 @@ class CitadelCog(commands.Cog, CommonResponses):
 
         # Update the player location to "citadel"
         player_data["location"] = "citadel"
-        save_player_data(guild_id, author_id, player_data)
+        await asave_player_data(guild_id, author_id, player_data)
 
         # Initialize the rows with the author_id and send views
         row1 = ForgeRow(ctx, author_id=author_id)
@@ -167,7 +166,7 @@ class ForgeRow(discord.ui.View, CommonResponses):
 
         if self.crafting_select:
             self.remove_item(self.crafting_select)
-        self.crafting_select = CraftingSelect(recipes, interaction, self.author_id)
+        self.crafting_select = CraftingSelect(recipes, interaction, self.author_id, self.player_data)
         self.add_item(self.crafting_select)
 
     @discord.ui.button(label="🔨 Forge", custom_id="citadel_forge", style=discord.ButtonStyle.blurple)
@@ -179,14 +178,14 @@ class ForgeRow(discord.ui.View, CommonResponses):
             return
 
         # Refresh player data to prevent exploit after citadel exit.
-        self.player_data = load_player_data(interaction.guild_id, self.author_id)
+        self.player_data = await aload_player_data(interaction.guild_id, self.author_id)
 
         # Check if the player is not in the citadel
         if self.player_data["location"] != "citadel":
             await self.not_in_citadel_response(interaction)
             return
 
-        station = create_crafting_stations(interaction, "forge")
+        station = crafting_station(self.player_data, "forge")
         self.update_or_add_crafting_select(station, interaction)
         await interaction.response.edit_message(content="Choose an item to Forge:", view=self)
 
@@ -199,14 +198,14 @@ class ForgeRow(discord.ui.View, CommonResponses):
             return
 
         # Refresh player data to prevent exploit after citadel exit.
-        self.player_data = load_player_data(interaction.guild_id, self.author_id)
+        self.player_data = await aload_player_data(interaction.guild_id, self.author_id)
 
         # Check if the player is not in the citadel
         if self.player_data["location"] != "citadel":
             await self.not_in_citadel_response(interaction)
             return
 
-        station = create_crafting_stations(interaction, "woodshop")
+        station = crafting_station(self.player_data, "woodshop")
         self.update_or_add_crafting_select(station, interaction)
         await interaction.response.edit_message(content="Choose an item from the Wood Shop:", view=self)
 
@@ -219,14 +218,14 @@ class ForgeRow(discord.ui.View, CommonResponses):
             return
 
         # Refresh player data to prevent exploit after citadel exit.
-        self.player_data = load_player_data(interaction.guild_id, self.author_id)
+        self.player_data = await aload_player_data(interaction.guild_id, self.author_id)
 
         # Check if the player is not in the citadel
         if self.player_data["location"] != "citadel":
             await self.not_in_citadel_response(interaction)
             return
 
-        station = create_crafting_stations(interaction, "archery_stand")
+        station = crafting_station(self.player_data, "archery_stand")
         self.update_or_add_crafting_select(station, interaction)
         await interaction.response.edit_message(content="Choose an item from the Archery Stand:", view=self)
 
@@ -242,7 +241,7 @@ class TanneryRow(discord.ui.View, CommonResponses):
     def update_or_add_crafting_select(self, recipes, interaction):
         if self.crafting_select:
             self.remove_item(self.crafting_select)
-        self.crafting_select = CraftingSelect(recipes, interaction, self.author_id)
+        self.crafting_select = CraftingSelect(recipes, interaction, self.author_id, self.player_data)
         self.add_item(self.crafting_select)
 
     @discord.ui.button(label="🐄 Tannery", custom_id="citadel_tannery", style=discord.ButtonStyle.blurple)
@@ -261,7 +260,7 @@ class TanneryRow(discord.ui.View, CommonResponses):
             await self.not_in_citadel_response(interaction)
             return
 
-        station = create_crafting_stations(interaction, "tannery")
+        station = crafting_station(self.player_data, "tannery")
         self.update_or_add_crafting_select(station, interaction)
         await interaction.response.edit_message(content="Choose an item from the Tannery:", view=self)
 
@@ -281,7 +280,7 @@ class TanneryRow(discord.ui.View, CommonResponses):
             await self.not_in_citadel_response(interaction)
             return
 
-        station = create_crafting_stations(interaction, "clothiery")
+        station = crafting_station(self.player_data, "clothiery")
         self.update_or_add_crafting_select(station, interaction)
         await interaction.response.edit_message(content="Choose an item from the Clothiery:", view=self)
 
@@ -301,7 +300,7 @@ class TanneryRow(discord.ui.View, CommonResponses):
             await self.not_in_citadel_response(interaction)
             return
 
-        station = create_crafting_stations(interaction, "potion_shop")
+        station = crafting_station(self.player_data, "potion_shop")
         self.update_or_add_crafting_select(station, interaction)
         await interaction.response.edit_message(content="Choose an item from the Potion Shop:", view=self)
 
@@ -321,7 +320,7 @@ class BreadRow(discord.ui.View, CommonResponses):
 
         # Pass 'tavern' as context if is_tavern is True
         context = 'tavern' if is_tavern else None
-        self.crafting_select = CraftingSelect(recipes, interaction, self.author_id, context=context)
+        self.crafting_select = CraftingSelect(recipes, interaction, self.author_id, self.player_data, context=context)
         if is_tavern:
             # Append the 'Three Eyed Snake' option only for the tavern
             three_eyed_snake_recipe = Recipe(TavernSpecialItem(), None)  # Create a special recipe for Three Eyed Snake
@@ -348,7 +347,7 @@ class BreadRow(discord.ui.View, CommonResponses):
             await self.not_in_citadel_response(interaction)
             return
 
-        station = create_crafting_stations(interaction, "bread_stand")
+        station = crafting_station(self.player_data, "bread_stand")
         self.update_or_add_crafting_select(station, interaction)
         await interaction.response.edit_message(content="Choose an item from the Bread Stand:", view=self)
 
@@ -369,7 +368,7 @@ class BreadRow(discord.ui.View, CommonResponses):
             await self.not_in_citadel_response(interaction)
             return
 
-        station = create_crafting_stations(interaction, "meat_stand")
+        station = crafting_station(self.player_data, "meat_stand")
         self.update_or_add_crafting_select(station, interaction)
         await interaction.response.edit_message(content="Choose an item from the Meat Stand:", view=self)
 
@@ -390,8 +389,7 @@ class BreadRow(discord.ui.View, CommonResponses):
             await self.not_in_citadel_response(interaction)
             return
 
-        station = create_crafting_stations(interaction, "tavern")
-        self.update_or_add_crafting_select(station, interaction)
+        station = crafting_station(self.player_data, "tavern")
         self.update_or_add_crafting_select(station, interaction, is_tavern=True)
         await interaction.response.edit_message(content="Choose an item from the Tavern:", view=self)
 
@@ -591,11 +589,11 @@ class TravelRow(discord.ui.View, CommonResponses):
             return
 
         # Determine if the brute encounter will happen
-        will_encounter_brute = np.random.rand() <= get_server_setting(interaction.guild_id, "brute_percent")
+        will_encounter_brute = np.random.rand() <= await aget_server_setting(interaction.guild_id, "brute_percent")
 
         await interaction.response.defer()
 
-        player_data = load_player_data(interaction.guild.id, str(interaction.user.id))
+        player_data = await aload_player_data(interaction.guild.id, str(interaction.user.id))
 
         if will_encounter_brute:
             # Prepare the suspenseful message for brute encounter
@@ -625,7 +623,7 @@ class TravelRow(discord.ui.View, CommonResponses):
             await interaction.followup.send(embed=embed, ephemeral = True)
 
         player_data["location"] = None
-        save_player_data(self.guild_id, self.author_id, player_data)
+        await asave_player_data(self.guild_id, self.author_id, player_data)
 
 def setup(bot):
     bot.add_cog(CitadelCog(bot))
\ No newline at end of file
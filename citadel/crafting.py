@@ -2,12 +2,13 @@ from resources.item import Item
 import discord
 from discord import Embed
 from images.urls import generate_urls
-from emojis import get_emoji
+from emojis import get_emoji, get_partial_emoji
 from exemplars.exemplars import Exemplar
 from resources.ore import Ore
 from resources.potion import Potion
 from resources.materium import Materium
-from utils import CommonResponses, refresh_player_from_data, get_server_setting
+from utils import CommonResponses, refresh_player_from_data, get_server_setting, asave_player_data
+from gamedata import ZONE_LEVELS
 
 class Weapon(Item):
     def __init__(self, name, wtype, attack_modifier, special_attack, value, zone_level, description=None, stack=1):
@@ -113,6 +114,12 @@ class Recipe:
         self.result = result
         self.ingredients = ingredients  # List of tuples (item, quantity)
 
+    def result_for(self, guild_id):
+        # Charm descriptions quote the guild's settings, so those are filled in per guild
+        if isinstance(self.result, Charm) and self.result.name in CHARM_DESCRIPTIONS:
+            return Charm(self.result.name, description=charm_description(self.result.name, guild_id), value=self.result.value)
+        return self.result
+
     def can_craft(self, inventory):
         for ingredient, quantity in self.ingredients:
             available_quantity = inventory.get_item_quantity(ingredient.name)
@@ -136,14 +143,16 @@ class CraftingStation:
     def __init__(self, name):
         self.name = name
         self.recipes = []
+        self.recipes_by_name = {}
 
     def add_recipe(self, recipe):
         self.recipes.append(recipe)
+        self.recipes_by_name[recipe.result.name] = recipe
 
     def craft(self, recipe_name, player, player_data, guild_id, author_id):
         from utils import save_player_data
 
-        recipe = next((r for r in self.recipes if r.result.name == recipe_name), None)
+        recipe = self.recipes_by_name.get(recipe_name)
 
         # Check if the result of the crafting operation is a Charm or Potion, or an auto-consume item like 'Bread' or 'Trencher'.
         # If it is, skip the inventory check and allow crafting regardless of inventory space.
@@ -167,11 +176,12 @@ class CraftingStation:
             return recipe.result  # Return the Trencher item even though it's consumed
 
         # Add item to inventory for other items
-        player.inventory.add_item_to_inventory(recipe.result)
+        result = recipe.result_for(guild_id)
+        player.inventory.add_item_to_inventory(result)
 
         save_player_data(guild_id, author_id, player_data)
 
-        return recipe.result
+        return result
 
 class CraftView(discord.ui.View):
     def __init__(self, player, player_data, station, selected_recipe, crafted_item, guild_id, author_id, disabled=True, show_added_to_backpack=True):
@@ -413,7 +423,7 @@ class CraftButton(discord.ui.Button, CommonResponses):
             elif self.selected_recipe.result.name == "Trencher":
                 self.player.stats.stamina = self.player.stats.max_stamina
                 self.player_data["stats"]["stamina"] = self.player.stats.stamina
-            save_player_data(self.guild_id, self.author_id, self.player_data)
+            await asave_player_data(self.guild_id, self.author_id, self.player_data)
 
             # If stamina is full, disable the button
             if self.player.stats.stamina >= self.player.stats.max_stamina:
@@ -432,16 +442,15 @@ class CraftButton(discord.ui.Button, CommonResponses):
         await interaction.response.edit_message(embed=embed, view=self.view)
 
 class CraftingSelect(discord.ui.Select, CommonResponses):
-    def __init__(self, crafting_station, interaction, author_id, context=None):
+    def __init__(self, crafting_station, interaction, author_id, player_data, context=None):
         self.crafting_station = crafting_station
         self.interaction = interaction
         self.author_id = author_id
 
-        # Load the player data here
-        from utils import load_player_data
+        # Labels are worked out from the player data the station button just loaded
         self.guild_id = self.interaction.guild.id
         self.author_id = str(self.interaction.user.id)
-        self.player_data = load_player_data(self.guild_id, self.author_id)
+        self.player_data = player_data
         self.player = Exemplar(self.player_data["exemplar"],
                                self.player_data["stats"],
                                self.guild_id,
@@ -453,7 +462,7 @@ class CraftingSelect(discord.ui.Select, CommonResponses):
             discord.SelectOption(
                 label=self._get_item_label(recipe.result),
                 value=recipe.result.name,
-                emoji=get_emoji(recipe.result.name)
+                emoji=get_partial_emoji(recipe.result.name)
             )
             for recipe in self.crafting_station.recipes
         ]
@@ -555,7 +564,8 @@ class CraftingSelect(discord.ui.Select, CommonResponses):
             embed_color = color_mapping.get(zone_level)
 
             # Retrieve the recipe for the selected item.
-            selected_recipe = next((r for r in self.crafting_station.recipes if r.result.name == self.values[0]), None)
+            selected_recipe = self.crafting_station.recipes_by_name.get(self.values[0])
+            crafted_item = selected_recipe.result_for(self.guild_id)
 
             # Check player's inventory for quantity of the crafted item with zone_level rarity
             if isinstance(selected_recipe.result, (Weapon, Armor, Shield)):
@@ -606,8 +616,8 @@ class CraftingSelect(discord.ui.Select, CommonResponses):
                 message_content += f"\n**Special Attack:** {selected_recipe.result.special_attack}"
 
             # Check and include the description of the selected item, if it exists
-            if hasattr(selected_recipe.result, "description") and selected_recipe.result.description:
-                message_content += f"\n**Description:** {selected_recipe.result.description}"
+            if hasattr(crafted_item, "description") and crafted_item.description:
+                message_content += f"\n**Description:** {crafted_item.description}"
 
             crafted_item_url = generate_urls('Icons', selected_recipe.result.name.replace(" ", "%20"))
             embed = Embed(title=embed_title, description=message_content, color=embed_color)
@@ -646,7 +656,7 @@ class CraftingSelect(discord.ui.Select, CommonResponses):
                 player_data=self.player_data,
                 station=self.crafting_station,
                 selected_recipe=selected_recipe,
-                crafted_item=selected_recipe.result,
+                crafted_item=crafted_item,
                 guild_id=self.guild_id,
                 author_id=self.author_id,
                 disabled=not can_craft
@@ -655,20 +665,25 @@ class CraftingSelect(discord.ui.Select, CommonResponses):
             message = await interaction.response.send_message(embed=embed, ephemeral=True, view=view)
             view.message = message
 
-def create_crafting_stations(interaction, station_name=None):
-    from utils import load_player_data
+# Charm descriptions quote guild settings; each takes a setting_name -> value lookup
+CHARM_DESCRIPTIONS = {
+    "Woodcleaver": lambda setting: f"Increase woodcutting success rate by {int(round(setting('woodcleaver_percent') * 100))}% while wearing",
+    "Stonebreaker": lambda setting: f"Increase mining success rate by {int(round(setting('stonebreaker_percent') * 100))}% while wearing",
+    "Loothaven": lambda setting: f"Gives a {int(round(setting('loothaven_percent') * 100))}% chance to **double** your monster loot *and* drop rates of bonus loot while wearing",
+    "Mightstone": lambda setting: f"Doubles your critical hit chance *and* damage multiplier (**{int(round((setting('mightstone_multiplier') * setting('critical_hit_chance')) * 100))}%** and **{int(setting('critical_hit_multiplier') * 2)}x**) while wearing",
+    "Ironhide": lambda setting: f"Increases your chance to **evade all attacks** by {int(round(setting('ironhide_percent') * 100))}% and **run chance** by **{int(setting('ironhide_multiplier'))}x** while wearing",
+}
+
 
-    guild_id = interaction.guild.id
-    author_id = str(interaction.user.id)
-    player_data = load_player_data(guild_id, author_id)
-    player = Exemplar(player_data["exemplar"],
-                      player_data["stats"],
-                      guild_id,
-                      player_data["inventory"])
+def charm_description(charm_name, guild_id):
+    return CHARM_DESCRIPTIONS[charm_name](lambda setting_name: get_server_setting(guild_id, setting_name))
 
-    # Get zone level from player stats
-    zone_level = player.stats.zone_level
 
+def build_crafting_stations(zone_level):
+    """Every crafting station with its recipes for one zone level.
+
+    Recipes are shared by all players in the zone, so nothing here may depend on a player or guild.
+    """
     # Defining All Items
     charcoal = Item("Charcoal")
     iron = Item("Iron")
@@ -779,21 +794,11 @@ def create_crafting_stations(interaction, station_name=None):
                           value=80 + round(zone_level ** 2) * 3, zone_level=zone_level)
 
     # Charms
-    woodcrafters_charm = Charm("Woodcleaver",
-                               description=f"Increase woodcutting success rate by {int(round(get_server_setting(guild_id, 'woodcleaver_percent') * 100))}% while wearing",
-                               value=25000)
-    miners_charm = Charm("Stonebreaker",
-                         description=f"Increase mining success rate by {int(round(get_server_setting(guild_id, 'stonebreaker_percent') * 100))}% while wearing",
-                         value=25000)
-    lootmasters_charm = Charm("Loothaven",
-                              description=f"Gives a {int(round(get_server_setting(guild_id, 'loothaven_percent') * 100))}% chance to **double** your monster loot *and* drop rates of bonus loot while wearing",
-                              value=25000)
-    strength_charm = Charm("Mightstone",
-                           description=f"Doubles your critical hit chance *and* damage multiplier (**{int(round((get_server_setting(guild_id, 'mightstone_multiplier') * get_server_setting(guild_id, 'critical_hit_chance')) * 100))}%** and **{int(get_server_setting(guild_id, 'critical_hit_multiplier') * 2)}x**) while wearing",
-                           value=25000)
-    defenders_charm = Charm("Ironhide",
-                            description=f"Increases your chance to **evade all attacks** by {int(round(get_server_setting(guild_id, 'ironhide_percent') * 100))}% and **run chance** by **{int(get_server_setting(guild_id, 'ironhide_multiplier'))}x** while wearing",
-                            value=25000)
+    woodcrafters_charm = Charm("Woodcleaver", value=25000)
+    miners_charm = Charm("Stonebreaker", value=25000)
+    lootmasters_charm = Charm("Loothaven", value=25000)
+    strength_charm = Charm("Mightstone", value=25000)
+    defenders_charm = Charm("Ironhide", value=25000)
 
     # Potions
     stamina_potion = Potion("Stamina Potion", effect_stat="stamina", effect_value=50, value=10,
@@ -901,7 +906,42 @@ def create_crafting_stations(interaction, station_name=None):
         "tavern": tavern,
         "potion_shop": potion_shop
     }
-
-    if station_name:
+    # Nothing is added after the catalog is built
+    for station in stations.values():
+        station.recipes = tuple(station.recipes)
+    return stations
+
+
+class RecipeCatalog:
+    """Crafting stations compiled once per zone level, with an index of which recipes use each ingredient."""
+
+    def __init__(self, zone_levels):
+        self.zones = {}
+        self.recipes_by_ingredient = {}
+        for zone_level in zone_levels:
+            self.add_zone(zone_level)
+
+    def add_zone(self, zone_level):
+        stations = self.zones[zone_level] = build_crafting_stations(zone_level)
+        for station_name, station in stations.items():
+            for recipe in station.recipes:
+                for ingredient, _ in recipe.ingredients:
+                    self.recipes_by_ingredient.setdefault((zone_level, ingredient.name), []).append((station_name, recipe))
+        return stations
+
+    def station(self, zone_level, station_name):
+        stations = self.zones.get(zone_level) or self.add_zone(zone_level)
         return stations.get(station_name)
-    return stations
\ No newline at end of file
+
+    def recipes_using(self, zone_level, ingredient_name):
+        # (station name, recipe) for every recipe in the zone that takes this ingredient
+        if zone_level not in self.zones:
+            self.add_zone(zone_level)
+        return self.recipes_by_ingredient.get((zone_level, ingredient_name), [])
+
+
+recipe_catalog = RecipeCatalog(ZONE_LEVELS)
+
+
+def crafting_station(player_data, station_name):
+    return recipe_catalog.station(player_data["stats"]["zone_level"], station_name)
\ No newline at end of file
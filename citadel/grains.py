@@ -1,7 +1,7 @@
 import discord
 from images.urls import generate_urls
 from resources.item import Item
-from utils import save_player_data, CommonResponses, refresh_player_from_data
+from utils import CommonResponses, player_session
 import asyncio
 
 class HarvestButton(discord.ui.View, CommonResponses):
@@ -20,17 +20,18 @@ class HarvestButton(discord.ui.View, CommonResponses):
             await self.nero_unauthorized_user_response(interaction)
             return
 
-        player, self.player_data = await refresh_player_from_data(self.ctx)
+        async with player_session(self.guild_id, self.author_id) as session:
+            self.player_data = session.player_data
+            in_citadel = self.player_data["location"] == "citadel"
+            if in_citadel:
+                crop_item = Item(name=self.crop)
+                session.player.inventory.add_item_to_inventory(crop_item, amount=1)
+                crop_count = session.player.inventory.get_item_quantity(self.crop)
 
-        if self.player_data["location"] != "citadel":
+        if not in_citadel:
             await self.not_in_citadel_response(interaction)
             return
 
-        crop_item = Item(name=self.crop)
-        player.inventory.add_item_to_inventory(crop_item, amount=1)
-        save_player_data(self.guild_id, self.author_id, self.player_data)
-
-        crop_count = player.inventory.get_item_quantity(self.crop)
         formatted_crop_count = "{:,}".format(crop_count)
         crop_url = generate_urls("Citadel", self.crop)
 
@@ -1,6 +1,6 @@
 import discord
 from images.urls import generate_urls
-from utils import save_player_data, CommonResponses, refresh_player_from_data, get_server_setting
+from utils import CommonResponses, player_session, aget_server_setting
 from emojis import get_emoji
 import asyncio
 
@@ -19,9 +19,17 @@ class HealTentButton(discord.ui.View, CommonResponses):
             await self.nero_unauthorized_user_response(interaction)
             return
 
-        self.player, self.player_data = await refresh_player_from_data(interaction)
+        heal_amount = int(await aget_server_setting(self.guild_id, 'tent_health'))
 
-        if self.player_data["location"] != "citadel":
+        async with player_session(self.guild_id, self.author_id) as session:
+            self.player, self.player_data = session.player, session.player_data
+            in_citadel = self.player_data["location"] == "citadel"
+            if in_citadel:
+                previous_health = self.player.stats.health
+                self.player.stats.health = int(min(self.player.stats.health + heal_amount, self.player.stats.max_health))
+                actual_healed_amount = self.player.stats.health - previous_health
+
+        if not in_citadel:
             await self.not_in_citadel_response(interaction)
             return
 
@@ -31,12 +39,6 @@ class HealTentButton(discord.ui.View, CommonResponses):
             filled_length = int(round(bar_length * health_percentage))
             return '◼' * filled_length + '◻' * (bar_length - filled_length)
 
-        previous_health = self.player.stats.health
-        heal_amount = int(get_server_setting(self.guild_id, 'tent_health'))
-        self.player.stats.health = int(min(self.player.stats.health + heal_amount, self.player.stats.max_health))
-        actual_healed_amount = self.player.stats.health - previous_health
-        self.player_data["stats"] = self.player.stats
-        save_player_data(self.guild_id, self.author_id, self.player_data)
         updated_health_bar = health_bar(self.player.stats.health, self.player.stats.max_health)
         health_emoji = get_emoji('heart_emoji')
 
@@ -4,10 +4,11 @@ from discord import ButtonStyle
 from discord.ui import View
 import datetime
 from discord.ext import commands
-from utils import load_player_data, save_player_data, CommonResponses, refresh_player_from_data, save_server_settings, load_server_settings
+from utils import aload_player_data, asave_player_data, CommonResponses, refresh_player_from_data, asave_server_settings, load_server_settings, aload_server_settings
 from images.urls import generate_urls
-from emojis import get_emoji
+from emojis import get_emoji, get_partial_emoji
 from probabilities import default_settings
+from gamedata import reload_game_data
 
 class PrivateGameView(View, CommonResponses):
     def __init__(self, user_id: str, author_id):
@@ -88,7 +89,7 @@ class TeleportModal(discord.ui.Modal):
             await interaction.response.send_message("Invalid ID: IDs must be numeric.", ephemeral=True)
             return
 
-        player_data = load_player_data(interaction.guild_id, discord_id)
+        player_data = await aload_player_data(interaction.guild_id, discord_id)
         if player_data is None:
             await interaction.response.send_message("No player data found for the given ID.", ephemeral=True)
             return
@@ -99,7 +100,7 @@ class TeleportModal(discord.ui.Modal):
             return
 
         player_data["location"] = None
-        save_player_data(interaction.guild_id, discord_id, player_data)
+        await asave_player_data(interaction.guild_id, discord_id, player_data)
 
         # Use user.mention to mention the user in the response
         await interaction.response.send_message(f"{user.mention} has been teleported to neutral ground.", ephemeral=True)
@@ -149,14 +150,14 @@ class SettingsModal(discord.ui.Modal):
 
     async def callback(self, interaction: discord.Interaction):
         new_value = self.children[0].value
-        settings_data = load_server_settings(interaction.guild_id)
+        settings_data = await aload_server_settings(interaction.guild_id)
         if settings_data is not None:
             try:
                 value = float(new_value)
                 if not (self.valid_range[0] <= value <= self.valid_range[1]):
                     raise ValueError(f"Please enter a value between {self.valid_range[0]} and {self.valid_range[1]}.")
                 settings_data[self.setting_name] = value
-                save_server_settings(interaction.guild_id, settings_data)
+                await asave_server_settings(interaction.guild_id, settings_data)
                 formatted_name = get_formatted_name(self.setting_name)
                 await interaction.response.send_message(f"{formatted_name} updated to {new_value}", ephemeral=True)
             except ValueError as e:
@@ -175,25 +176,25 @@ class SettingsSelect(discord.ui.Select):
                 label=f"MTRM Drop Percent - Default: {default_settings['mtrm_drop_percent']}",
                 description=f"Chance of MTRM loot drop - Current: {settings_data.get('mtrm_drop_percent')}",
                 value="mtrm_drop_percent",
-                emoji=get_emoji('Materium')
+                emoji=get_partial_emoji('Materium')
             ),
             discord.SelectOption(
                 label=f"Herb Drop Percent - Default: {default_settings['herb_drop_percent']}",
                 description=f"Chance of Herb loot drop - Current: {settings_data.get('herb_drop_percent')}",
                 value="herb_drop_percent",
-                emoji=get_emoji('Ranarr')
+                emoji=get_partial_emoji('Ranarr')
             ),
             discord.SelectOption(
                 label=f"Potion Drop Percent - Default: {default_settings['potion_drop_percent']}",
                 description=f"Chance of Potion loot drop - Current: {settings_data.get('potion_drop_percent')}",
                 value="potion_drop_percent",
-                emoji=get_emoji('Super Stamina Potion')
+                emoji=get_partial_emoji('Super Stamina Potion')
             ),
             discord.SelectOption(
                 label=f"Weapon Specialty Bonus - Default: {default_settings['weapon_specialty_bonus']}",
                 description=f"Bonus to damage for weapon specialty - Current: {settings_data.get('weapon_specialty_bonus')}",
                 value="weapon_specialty_bonus",
-                emoji=get_emoji('Voltaic Sword')
+                emoji=get_partial_emoji('Voltaic Sword')
             ),
             discord.SelectOption(
                 label=f"Death Penalty - Default: {default_settings['death_penalty']}",
@@ -223,25 +224,25 @@ class SettingsSelect(discord.ui.Select):
                 label=f"Stonebreaker Percent - Default: {default_settings['stonebreaker_percent']}",
                 description=f"Increase mining success rate - Current: {settings_data.get('stonebreaker_percent')}",
                 value="stonebreaker_percent",
-                emoji=get_emoji('Stonebreaker')
+                emoji=get_partial_emoji('Stonebreaker')
             ),
             discord.SelectOption(
                 label=f"Woodcleaver Percent - Default: {default_settings['woodcleaver_percent']}",
                 description=f"Increase woodcutting success rate - Current: {settings_data.get('woodcleaver_percent')}",
                 value="woodcleaver_percent",
-                emoji=get_emoji('Woodcleaver')
+                emoji=get_partial_emoji('Woodcleaver')
             ),
             discord.SelectOption(
                 label=f"Loothaven Percent - Default: {default_settings['loothaven_percent']}",
                 description=f"Doubles loot drops and drop rates - Current: {settings_data.get('loothaven_percent')}",
                 value="loothaven_percent",
-                emoji=get_emoji('Loothaven')
+                emoji=get_partial_emoji('Loothaven')
             ),
             discord.SelectOption(
                 label=f"Ironhide Percent - Default: {default_settings['ironhide_percent']}",
                 description=f"Increase evade chance in battle - Current: {settings_data.get('ironhide_percent')}",
                 value="ironhide_percent",
-                emoji=get_emoji('Ironhide')
+                emoji=get_partial_emoji('Ironhide')
             )
 
         ]
@@ -249,7 +250,7 @@ class SettingsSelect(discord.ui.Select):
 
     async def callback(self, interaction: discord.Interaction):
         selected_setting = self.values[0]
-        settings_data = load_server_settings(interaction.guild_id)
+        settings_data = await aload_server_settings(interaction.guild_id)
         if settings_data:
             current_value = settings_data.get(selected_setting)
             default_value = default_settings.get(selected_setting)
@@ -352,11 +353,11 @@ class SetupCog(commands.Cog, CommonResponses):
 
                 # Handle the confirmation logic
                 # Load settings, check, and reset to defaults as needed
-                settings_data = load_server_settings(interaction.guild_id)
+                settings_data = await aload_server_settings(interaction.guild_id)
                 if settings_data is None:
                     await interaction.followup.send("Settings file could not be found or loaded.", ephemeral=True)
                 else:
-                    save_server_settings(interaction.guild_id, default_settings)
+                    await asave_server_settings(interaction.guild_id, default_settings)
                     await interaction.followup.send("All settings have been reset to default values.", ephemeral=True)
                 self.stop()
 
@@ -381,5 +382,16 @@ class SetupCog(commands.Cog, CommonResponses):
         # Wait for user interaction
         await confirmation_view.wait()
 
+    @commands.slash_command(name="reloadgamedata", description="Reload monster, loot and resource definitions from game_data.json.")
+    @commands.is_owner()
+    async def reload_game_data(self, ctx):
+        # Game data is shared by every guild, so only the bot owner can swap it
+        try:
+            reload_game_data()
+        except Exception as e:
+            await ctx.respond(f"Game data was not reloaded: {e}", ephemeral=True)
+            return
+        await ctx.respond("Game data reloaded.", ephemeral=True)
+
 def setup(bot):
     bot.add_cog(SetupCog(bot))
\ No newline at end of file
@@ -1,12 +1,9 @@
 from resources.inventory import Inventory
 import random
-import json
 import discord
 from emojis import get_emoji
-
-
-with open("level_data.json", "r") as f:
-    LEVEL_DATA = json.load(f)
+from exemplars.level_curve import LEVEL_CURVE
+from exemplars.stat_tables import combat_stats, starting_stats
 
 class Exemplar:
     def __init__(
@@ -178,18 +175,8 @@ class Exemplar:
         return None  # return None if there's no level-up
 
     def set_level(self, skill, updated_exp, player=None, player_object=None):
-        new_level = 1  # Initialize to the lowest level
-        for level, level_data in sorted(LEVEL_DATA.items(), key=lambda x: int(x[0])):
-            if updated_exp >= level_data["total_experience"]:
-                new_level = int(level) + 1
-            else:
-                break
-
-        if new_level >= 100:  # Check if new level is 100
-            new_level = 99
-            max_level = True
-        else:
-            max_level = False
+        new_level = LEVEL_CURVE.level_for_xp(updated_exp)
+        max_level = LEVEL_CURVE.is_max_xp(updated_exp)
 
         if skill == "combat":
             self.stats.combat_level = new_level
@@ -216,49 +203,8 @@ class Exemplar:
         else:
             player_name = player.name
 
-        if player_name == "human":
-            max_health_update = 100 + (10 * (new_combat_level - 1))
-            strength_update = 12 + (5 * (new_combat_level - 1))
-            stamina_update = 12 + (5 * (new_combat_level - 1))
-            attack_update = 6 + (2 * (new_combat_level - 1))
-            defense_update = 6 + (2 * (new_combat_level - 1))
-
-        elif player_name == "dwarf":
-            max_health_update = 110 + (10 * (new_combat_level - 1))
-            strength_update = 14 + (5 * (new_combat_level - 1))
-            stamina_update = 10 + (5 * (new_combat_level - 1))
-            attack_update = 7 + (2 * (new_combat_level - 1))
-            defense_update = 5 + (2 * (new_combat_level - 1))
-
-        elif player_name == "orc":
-            max_health_update = 120 + (10 * (new_combat_level - 1))
-            strength_update = 16 + (5 * (new_combat_level - 1))
-            stamina_update = 8 + (5 * (new_combat_level - 1))
-            attack_update = 8 + (2 * (new_combat_level - 1))
-            defense_update = 4 + (2 * (new_combat_level - 1))
-
-        elif player_name == "halfling":
-            max_health_update = 90 + (10 * (new_combat_level - 1))
-            strength_update = 10 + (5 * (new_combat_level - 1))
-            stamina_update = 14 + (5 * (new_combat_level - 1))
-            attack_update = 5 + (2 * (new_combat_level - 1))
-            defense_update = 7 + (2 * (new_combat_level - 1))
-
-        else:
-            # For the Elf exemplar type
-            max_health_update = 95 + (10 * (new_combat_level - 1))
-            strength_update = 11 + (5 * (new_combat_level - 1))
-            stamina_update = 13 + (5 * (new_combat_level - 1))
-            attack_update = 6 + (2 * (new_combat_level - 1))
-            defense_update = 7 + (2 * (new_combat_level - 1))
-
-        if woodcutting_level:
-            # Update attack based on woodcutting level
-            attack_update += (woodcutting_level - 1)
-
-        if mining_level:
-            # Update strength based on mining level
-            strength_update += (mining_level - 1)
+        max_health_update, strength_update, stamina_update, attack_update, defense_update = combat_stats(
+            player_name, new_combat_level, woodcutting_level, mining_level)
 
         if player is None:
             # Update the stats
@@ -506,113 +452,23 @@ class PlayerStats:
 
 class Human(Exemplar):
     def __init__(self, guild_id):
-        human_stats = {
-            "zone_level": 1,
-            "health": 100,
-            "max_health": 100,
-            "strength": 12,
-            "stamina": 12,
-            "max_stamina": 12,
-            "attack": 6,
-            "damage": 0,
-            "defense": 6,
-            "armor": 0,
-            "combat_level": 1,
-            "combat_experience": 0,
-            "mining_level": 1,
-            "mining_experience": 0,
-            "woodcutting_level": 1,
-            "woodcutting_experience": 0
-        }
-        super().__init__("Human", stats=human_stats, guild_id=guild_id)
+        super().__init__("Human", stats=starting_stats("human"), guild_id=guild_id)
 
 class Dwarf(Exemplar):
     def __init__(self, guild_id):
-        dwarf_stats = {
-            "zone_level": 1,
-            "health": 110,
-            "max_health": 110,
-            "strength": 14,
-            "stamina": 10,
-            "max_stamina": 10,
-            "attack": 7,
-            "damage": 0,
-            "defense": 5,
-            "armor": 0,
-            "combat_level": 1,
-            "combat_experience": 0,
-            "mining_level": 1,
-            "mining_experience": 0,
-            "woodcutting_level": 1,
-            "woodcutting_experience": 0
-        }
-        super().__init__("Dwarf", stats=dwarf_stats, guild_id=guild_id)
+        super().__init__("Dwarf", stats=starting_stats("dwarf"), guild_id=guild_id)
 
 class Orc(Exemplar):
     def __init__(self, guild_id):
-        orc_stats = {
-            "zone_level": 1,
-            "health": 120,
-            "max_health": 120,
-            "strength": 16,
-            "stamina": 8,
-            "max_stamina": 8,
-            "attack": 8,
-            "damage": 0,
-            "defense": 4,
-            "armor": 0,
-            "combat_level": 1,
-            "combat_experience": 0,
-            "mining_level": 1,
-            "mining_experience": 0,
-            "woodcutting_level": 1,
-            "woodcutting_experience": 0
-        }
-        super().__init__("Orc", stats=orc_stats, guild_id=guild_id)
+        super().__init__("Orc", stats=starting_stats("orc"), guild_id=guild_id)
 
 class Halfling(Exemplar):
     def __init__(self, guild_id):
-        halfling_stats = {
-            "zone_level": 1,
-            "health": 90,
-            "max_health": 90,
-            "strength": 10,
-            "stamina": 14,
-            "max_stamina": 14,
-            "attack": 5,
-            "damage": 0,
-            "defense": 7,
-            "armor": 0,
-            "combat_level": 1,
-            "combat_experience": 0,
-            "mining_level": 1,
-            "mining_experience": 0,
-            "woodcutting_level": 1,
-            "woodcutting_experience": 0
-        }
-        super().__init__("Halfling", stats=halfling_stats, guild_id=guild_id)
+        super().__init__("Halfling", stats=starting_stats("halfling"), guild_id=guild_id)
 
 class Elf(Exemplar):
     def __init__(self, guild_id):
-        elf_stats = {
-            "zone_level": 1,
-            "health": 95,
-            "max_health": 95,
-            "strength": 11,
-            "stamina": 13,
-            "max_stamina": 13,
-            "attack": 6,
-            "damage": 0,
-            "defense": 7,
-            "armor": 0,
-            "combat_level": 1,
-            "combat_experience": 0,
-            "mining_level": 1,
-            "mining_experience": 0,
-            "woodcutting_level": 1,
-            "woodcutting_experience": 0
-        }
-        super().__init__("Elf", stats=elf_stats, guild_id=guild_id)
+        super().__init__("Elf", stats=starting_stats("elf"), guild_id=guild_id)
 
 def create_exemplar(exemplar_name, guild_id):
     exemplar_classes = {
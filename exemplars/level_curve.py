@@ -0,0 +1,58 @@
+# level_curve.py
+import json
+from array import array
+from bisect import bisect_right
+import numpy as np
+
+
+class LevelCurve:
+    """The skill XP curve from level_data.json, loaded once into flat arrays.
+
+    Entry n of level_data.json is level n: "experience_needed" is the XP from n to n + 1 and
+    "total_experience" the total XP at which n + 1 is reached.
+    """
+
+    def __init__(self, path="level_data.json"):
+        with open(path, "r") as f:
+            entries = sorted(json.load(f).values(), key=lambda entry: entry["level"])
+
+        # Index level - 1 holds that level's values
+        self.level_totals = array('q', (entry["total_experience"] for entry in entries))
+        self.level_spans = array('q', (entry["experience_needed"] for entry in entries))
+        self.max_level = len(entries)
+        self._totals = np.frombuffer(self.level_totals, dtype=np.int64)
+
+    def level_for_xp(self, xp):
+        return min(bisect_right(self.level_totals, xp) + 1, self.max_level)
+
+    def levels_for_xp(self, xp_values):
+        """level_for_xp over a whole array of XP values at once."""
+        levels = np.searchsorted(self._totals, np.asarray(xp_values, dtype=np.int64), side='right') + 1
+        return np.minimum(levels, self.max_level)
+
+    def is_max_xp(self, xp):
+        # Enough XP for the level after the last one
+        return xp >= self.level_totals[-1]
+
+    def level_start_xp(self, level):
+        return self.level_totals[level - 2] if level > 1 else 0
+
+    def next_level_xp(self, level):
+        # Total XP at which `level` turns into the next one; None once there is no next level
+        if level >= self.max_level:
+            return None
+        return self.level_totals[level - 1]
+
+    def xp_to_next(self, level, xp):
+        next_level_xp = self.next_level_xp(level)
+        return None if next_level_xp is None else next_level_xp - xp
+
+    def progress_fraction(self, level, xp):
+        # Share of the way from `level` to the next one, 1.0 at the max level
+        if level >= self.max_level:
+            return 1.0
+        span = self.level_spans[level - 1]
+        return (span - (self.level_totals[level - 1] - xp)) / span
+
+
+LEVEL_CURVE = LevelCurve()
@@ -101,7 +101,8 @@ class PickExemplars(Select, CommonResponses):
         player_id = str(interaction.user.id)
 
         # Attempt to load the player's data; initialize as empty dict if not found
-        player_data = load_player_data(guild_id, player_id) or {}
+        # Work on a copy so the stored record is untouched until the selection is confirmed
+        player_data = dict(load_player_data(guild_id, player_id) or {})
 
         # Update the exemplar in player_data
         player_data["exemplar"] = self.values[0]
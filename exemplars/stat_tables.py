@@ -0,0 +1,84 @@
+# stat_tables.py
+from array import array
+import numpy as np
+from exemplars.level_curve import LEVEL_CURVE
+
+STAT_COLUMNS = ("max_health", "strength", "stamina", "attack", "defense")
+
+# Combat level 1 values of STAT_COLUMNS for each exemplar
+BASE_STATS = {
+    "human": (100, 12, 12, 6, 6),
+    "dwarf": (110, 14, 10, 7, 5),
+    "orc": (120, 16, 8, 8, 4),
+    "halfling": (90, 10, 14, 5, 7),
+    "elf": (95, 11, 13, 6, 7),
+}
+
+# What every combat level past the first adds to each of STAT_COLUMNS
+STATS_PER_LEVEL = (10, 5, 5, 2, 2)
+
+
+def _build_table(base):
+    # Flat rows of len(STAT_COLUMNS) ints, row n for combat level n (row 0 is unused padding)
+    table = array('i', [0] * len(STAT_COLUMNS))
+    for level in range(1, LEVEL_CURVE.max_level + 1):
+        table.extend(value + per_level * (level - 1) for value, per_level in zip(base, STATS_PER_LEVEL))
+    return table
+
+
+# Built once at import; stat changes are then a slice instead of a formula per exemplar
+COMBAT_STAT_TABLES = {exemplar: _build_table(base) for exemplar, base in BASE_STATS.items()}
+
+
+def combat_stats(exemplar, combat_level, woodcutting_level=None, mining_level=None):
+    """(max_health, strength, stamina, attack, defense) for an exemplar at a combat level.
+
+    Woodcutting levels past the first add to attack and mining levels to strength.
+    """
+    # Anything unrecognised gets the elf line, as set_combat_stats always has
+    table = COMBAT_STAT_TABLES.get(exemplar.lower(), COMBAT_STAT_TABLES["elf"])
+    width = len(STAT_COLUMNS)
+    max_health, strength, stamina, attack, defense = table[combat_level * width:(combat_level + 1) * width]
+
+    if woodcutting_level:
+        attack += woodcutting_level - 1
+    if mining_level:
+        strength += mining_level - 1
+    return max_health, strength, stamina, attack, defense
+
+
+def starting_stats(exemplar):
+    # Full stats record for a brand new character
+    max_health, strength, stamina, attack, defense = combat_stats(exemplar, 1)
+    return {
+        "zone_level": 1,
+        "health": max_health,
+        "max_health": max_health,
+        "strength": strength,
+        "stamina": stamina,
+        "max_stamina": stamina,
+        "attack": attack,
+        "damage": 0,
+        "defense": defense,
+        "armor": 0,
+        "combat_level": 1,
+        "combat_experience": 0,
+        "mining_level": 1,
+        "mining_experience": 0,
+        "woodcutting_level": 1,
+        "woodcutting_experience": 0
+    }
+
+
+def stat_table(exemplar):
+    """Levels x STAT_COLUMNS NumPy view of an exemplar's table, for balance tooling."""
+    table = COMBAT_STAT_TABLES[exemplar]
+    return np.frombuffer(table, dtype=np.intc).reshape(-1, len(STAT_COLUMNS))[1:]
+
+
+if __name__ == "__main__":
+    # Dump every exemplar's derived stats at every combat level as CSV
+    print(",".join(("exemplar", "combat_level") + STAT_COLUMNS))
+    for exemplar in BASE_STATS:
+        for level, row in enumerate(stat_table(exemplar), 1):
+            print(",".join([exemplar, str(level)] + [str(value) for value in row]))
@@ -0,0 +1,137 @@
+# gamedata.py
+import json
+import math
+import logging
+from collections import namedtuple
+from types import MappingProxyType
+from resources.item import Item
+from resources.herb import Herb
+from resources.potion import Potion
+from resources.ore import Ore, Gem
+from resources.tree import Tree
+
+logger = logging.getLogger(__name__)
+
+GAME_DATA_PATH = "game_data.json"
+
+# Zones whose monster stat blocks are computed up front; any other zone level is scaled on request
+ZONE_LEVELS = range(1, 6)
+
+MonsterTemplate = namedtuple("MonsterTemplate", (
+    "name", "health", "attack", "stamina", "weak_against", "strong_against", "attack_speed", "drops", "coppers_multiplier"
+))
+# A monster's numbers at one zone level; drops are (loot name, quantity) pairs
+MonsterStats = namedtuple("MonsterStats", (
+    "name", "health", "attack", "defense", "experience_reward", "weak_against", "strong_against", "attack_speed", "drops"
+))
+LootDefinition = namedtuple("LootDefinition", ("name", "description", "value", "emoji", "plural"))
+
+
+def scale_monster(template, zone_level):
+    health = round(template.health * math.sqrt(zone_level))
+    attack = round(template.attack * math.log2(zone_level + 1))
+    stamina = round(template.stamina * math.log2(zone_level + 1))
+    experience_reward = round((attack + stamina) * 1.5)
+    # Making it slightly faster in higher zones
+    attack_speed = template.attack_speed - (0.05 * math.log2(zone_level + 1))
+    return MonsterStats(template.name, health, attack, stamina, experience_reward,
+                        template.weak_against, template.strong_against, attack_speed, template.drops)
+
+
+def _index(entries):
+    return MappingProxyType({entry.name: entry for entry in entries})
+
+
+class GameData:
+    """Every static definition from game_data.json, built once and read-only afterwards.
+
+    Lists keep the file's order (drop weights depend on it) and each has a by-name index.
+    Herb, potion, ore, tree and gem entries are shared templates: the inventory stores copies.
+    """
+
+    def __init__(self, definitions):
+        self.monsters = tuple(
+            MonsterTemplate(**{**entry, "drops": tuple(tuple(drop) for drop in entry["drops"])})
+            for entry in definitions["monsters"]
+        )
+        self.monsters_by_name = _index(self.monsters)
+        self.monster_names = tuple(monster.name for monster in self.monsters)
+        self.zone_monsters = MappingProxyType({
+            (monster.name, zone_level): scale_monster(monster, zone_level)
+            for monster in self.monsters for zone_level in ZONE_LEVELS
+        })
+
+        self.loot = tuple(LootDefinition(**entry) for entry in definitions["loot"])
+        self.loot_by_name = _index(self.loot)
+
+        self.herbs = tuple(Herb(**entry) for entry in definitions["herbs"])
+        self.herbs_by_name = _index(self.herbs)
+        self.potions = tuple(Potion(**entry) for entry in definitions["potions"])
+        self.potions_by_name = _index(self.potions)
+        self.ores = tuple(Ore(**entry) for entry in definitions["ores"])
+        self.ores_by_name = _index(self.ores)
+        self.trees = tuple(Tree(**entry) for entry in definitions["trees"])
+        self.trees_by_name = _index(self.trees)
+        self.gems = tuple(Gem(**entry) for entry in definitions["gems"])
+        self.gems_by_name = _index(self.gems)
+
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False):
+            raise AttributeError("GameData is read-only, use reload_game_data() to swap in new definitions")
+        super().__setattr__(name, value)
+
+    @classmethod
+    def load(cls, path=GAME_DATA_PATH):
+        with open(path, "r") as f:
+            return cls(json.load(f))
+
+    def monster_stats(self, name, zone_level):
+        stats = self.zone_monsters.get((name, zone_level))
+        if stats is not None:
+            return stats
+        template = self.monsters_by_name.get(name)
+        if template is None:
+            raise ValueError(f"No monster found with name {name}")
+        return scale_monster(template, zone_level)
+
+    def coppers_multiplier(self, monster_name):
+        template = self.monsters_by_name.get(monster_name)
+        return template.coppers_multiplier if template else 1
+
+    def new_loot_item(self, name):
+        # A fresh Item for the inventory; names without a definition get the old default value
+        definition = self.loot_by_name.get(name)
+        if definition is None:
+            return Item(name, value=10)
+        return Item(name, description=definition.description, value=definition.value)
+
+    def loot_plural(self, name, quantity):
+        if quantity <= 1:
+            return name
+        definition = self.loot_by_name.get(name)
+        return definition.plural if definition else name + "s"
+
+    def loot_emoji(self, name):
+        definition = self.loot_by_name.get(name)
+        return definition.emoji if definition else ''
+
+
+_game_data = GameData.load()
+
+
+def game_data():
+    return _game_data
+
+
+def reload_game_data(path=GAME_DATA_PATH):
+    """Re-read the definitions file for balance tweaks without a restart.
+
+    The new registry is built completely before it replaces the old one, so a bad file leaves the
+    current data in place and anything already holding the old registry finishes with it.
+    """
+    global _game_data
+    _game_data = GameData.load(path)
+    logger.info(f"Reloaded game data from {path}.")
+    return _game_data
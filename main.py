@@ -3,14 +3,15 @@ import json
 import discord
 from discord.ext import commands
 from discord.commands import Option
-from utils import save_player_data, send_message, CommonResponses, refresh_player_from_data
-from monsters.monster import generate_monster_list, generate_monster_by_name, monster_battle, create_battle_embed, footer_text_for_embed
+from utils import CommonResponses, refresh_player_from_data, start_event_loop_lag_monitor
+from monsters.monster import generate_monster_list, generate_monster_by_name
+from monsters.session import BattleSession
 from discord import Embed
 from stats import ResurrectOptions
-from monsters.battle import BattleOptions, LootOptions, SpecialAttackOptions
-from emojis import get_emoji
+from emojis import get_emoji, validate_emojis
 from images.urls import generate_urls
 from probabilities import default_settings
+from storage.store import player_store
 import logging
 
 bot = commands.Bot(command_prefix="/", intents=discord.Intents.all())
@@ -24,10 +25,17 @@ bot.load_extension("nero.kraken")
 bot.load_extension("exemplars.newgame")
 bot.load_extension("nero.spork")
 bot.load_extension("config.setup")
+bot.load_extension("monsters.autobattle")
 
 @bot.event
 async def on_ready():
     # await bot.sync_commands()
+    player_store.start()
+    start_event_loop_lag_monitor()
+    validate_emojis()
+    # Build each guild's leaderboard index up front so the first /stats query does not pay for the scan
+    for guild in bot.guilds:
+        await player_store.load_leaderboards(guild.id)
     print(f'We have logged in as {bot.user}')
 
 @bot.event
@@ -119,15 +127,11 @@ async def on_guild_join(guild):
     # Initialize directory and files for server-specific data
     guild_id = guild.id
     directory_path = f'server/{guild_id}'
-    player_data_file = f'{directory_path}/player_data.json'
+    players_directory = f'{directory_path}/players'
     settings_file = f'{directory_path}/server_settings.json'
 
-    os.makedirs(directory_path, exist_ok=True)
-
-    # Initialize player data
-    if not os.path.exists(player_data_file):
-        with open(player_data_file, 'w') as f:
-            json.dump({}, f)  # Initially empty
+    # Initialize player data (one file per player)
+    os.makedirs(players_directory, exist_ok=True)
 
     # Initialize server settings if not already set
     if not os.path.exists(settings_file):
@@ -165,15 +169,8 @@ async def on_application_command_error(ctx, error):
         # Generic error response if not one of the above
         await ctx.respond(f"An error occurred while processing the command: {error}", ephemeral=True)
 
-def update_special_attack_options(battle_context):
-    if battle_context.special_attack_options_view:
-        battle_context.special_attack_options_view.update_button_states()
-
 @bot.slash_command(description="Battle a monster!")
 async def battle(ctx, monster: Option(str, "Pick a monster to battle.", choices=generate_monster_list(), required=True)):
-    from monsters.monster import BattleContext
-    from utils import CommonResponses
-
     guild_id = ctx.guild.id
     player_id = str(ctx.author.id)
 
@@ -210,154 +207,17 @@ async def battle(ctx, monster: Option(str, "Pick a monster to battle.", choices=
         await CommonResponses.ongoing_battle_response(ctx)
         return
 
-    player_data["location"] = "battle"
-    save_player_data(guild_id, player_id, player_data)
+    monster = generate_monster_by_name(monster, player.stats.zone_level)
 
-    zone_level = player.stats.zone_level
-    monster = generate_monster_by_name(monster, zone_level)
-
-    battle_embed = await send_message(ctx.channel,
-                                      create_battle_embed(ctx.author, player, monster, footer_text_for_embed(ctx, monster, player=player), messages= ""))
+    # Claimed before the first await, so another fight starting while we respond finds the player busy
+    session = BattleSession(ctx, ctx, ctx.author, player, player_data, monster, guild_id, player_id)
+    if not session.begin():
+        await CommonResponses.ongoing_battle_response(ctx)
+        return
 
     await ctx.respond(f"{ctx.author.mention} encounters a {monster.name}")
 
-    def update_special_attack_buttons(context):
-        if context.special_attack_options_view:
-            context.special_attack_options_view.update_button_states()
-
-    battle_context = BattleContext(ctx, ctx.author, player, monster, battle_embed, zone_level,
-                                   update_special_attack_buttons)
-
-    # Create the special attack options view without the messages first
-    special_attack_options_view = SpecialAttackOptions(battle_context, None, None)
-
-    # IMPORTANT: Set the special attack options view in the battle context immediately
-    battle_context.special_attack_options_view = special_attack_options_view
-
-    # Send the special attack message and store the reference
-    special_attack_message = await ctx.send(view=special_attack_options_view)
-    battle_context.special_attack_message = special_attack_message
-
-    # Send the battle options message and store the reference
-    battle_options_msg = await ctx.send(view=BattleOptions(ctx, player, player_data, battle_context, special_attack_options_view))
-    battle_context.battle_options_msg = battle_options_msg
-
-    # Now update the special attack options view with the message references
-    special_attack_options_view.battle_options_msg = battle_options_msg
-    special_attack_options_view.special_attack_message = special_attack_message
-
-    # Start the monster attack task and receive its outcome
-    battle_result = await monster_battle(battle_context, guild_id)
-
-    if battle_result is None:
-        # Save the player's current stats
-        player_data["stats"]["stamina"] = player.stats.stamina
-        player_data["stats"]["combat_level"] = player.stats.combat_level
-        player_data["stats"]["combat_experience"] = player.stats.combat_experience
-        player_data["stats"]["health"] = player.stats.health
-        player_data["stats"]["damage_taken"] = player.stats.damage_taken
-        player_data["stats"].update(player.stats.__dict__)
-
-        save_player_data(guild_id, player_id ,player_data)
-
-    # Process battle outcome
-    else:
-        # Unpack the battle outcome and loot messages
-        battle_outcome, loot_messages = battle_result
-
-        if battle_outcome[0]:
-
-            # Define the maximum level for each zone
-            zone_max_levels = {
-                1: 20,
-                2: 40,
-                3: 60,
-                4: 80,
-            }
-
-            # Check if the player is at or above the level cap for their current zone
-            if zone_level in zone_max_levels and player.stats.combat_level >= zone_max_levels[zone_level]:
-                # Player is at or has exceeded the level cap for their zone; set XP gain to 0
-                experience_gained = 0
-            else:
-                # Player is below the level cap; award XP from the monster
-                experience_gained = monster.experience_reward
-
-            loothaven_effect = battle_outcome[5]  # Get the Loothaven effect status
-            messages = await player.gain_experience(experience_gained, 'combat', ctx, player)
-
-            # Ensure messages is iterable if it's None
-            messages = messages or []
-
-            for msg_embed in messages:
-                await ctx.followup.send(embed=msg_embed, ephemeral=False)
-
-            player_data["stats"]["stamina"] = player.stats.stamina
-            player_data["stats"]["combat_level"] = player.stats.combat_level
-            player_data["stats"]["combat_experience"] = player.stats.combat_experience
-            player.stats.damage_taken = 0
-            player_data["stats"].update(player.stats.__dict__)
-
-            if player.stats.health <= 0:
-                player.stats.health = player.stats.max_health
-
-            # Increment the count of the defeated monster
-            player_data["monster_kills"][monster.name] += 1
-
-            # Save the player data after common actions
-            save_player_data(guild_id, player_id, player_data)
-
-            # Clear the previous views
-            await battle_context.special_attack_message.delete()
-            await battle_options_msg.delete()
-
-            loot_view = LootOptions(ctx, player, monster, battle_embed, player_data, player_id, battle_outcome, loot_messages, guild_id, ctx, experience_gained, loothaven_effect, battle_context.rusty_spork_dropped)
-
-            max_cap_message = ""
-            if experience_gained == 0:
-                max_cap_message = f"\n**(Max XP cap reached for Zone {player.stats.zone_level})**"
-
-            # Construct the embed with the footer
-            battle_outcome_embed = create_battle_embed(ctx.user, player, monster, footer_text_for_embed(ctx, monster),
-                                                       f"You have **DEFEATED** the {monster.name}!\n"
-                                                       f"You dealt **{battle_outcome[1]} damage** to the monster and took **{battle_outcome[2]} damage**. "
-                                                       f"You gained {experience_gained} combat XP. {max_cap_message}\n"
-                                                       f"\n\u00A0\u00A0")
-
-            await battle_embed.edit(
-                embed=battle_outcome_embed,
-                view=loot_view
-            )
-
-        else:
-
-            # The player is defeated
-            player.stats.health = 0  # Set player's health to 0
-            player_data["stats"]["health"] = 0
-
-            # Create a new embed with the defeat message
-            new_embed = create_battle_embed(ctx.user, player, monster, footer_text = "", messages =
-
-            f"☠️ You have been **DEFEATED** by the **{monster.name}**!\n"
-            f"{get_emoji('rip_emoji')} *Your spirit lingers, seeking renewal.* {get_emoji('rip_emoji')}\n\n"
-            f"__**Options for Revival:**__\n"
-            f"1. Use {get_emoji('Materium')} to revive without penalty.\n"
-            f"2. Resurrect with 2.5% penalty to all skills."
-            f"**Lose all items in inventory** (Keep equipped items, coppers, MTRM, potions, and charms)"                                )
-
-            # Clear the previous BattleOptions view
-            await battle_context.special_attack_message.delete()
-            await battle_options_msg.delete()
-
-            # Add the "dead.png" image to the embed
-            new_embed.set_image(url=generate_urls("cemetery", "dead"))
-
-            # Update the message with the new embed and view
-            await battle_embed.edit(embed=new_embed, view=ResurrectOptions(ctx, player_data, player_id))
-
-    # Clear the battle flag after the battle ends
-    player_data["location"] = None
-    save_player_data(guild_id, player_id, player_data)
+    await session.run()
 
 
 @bot.slash_command(description="Visit the cemetery.")
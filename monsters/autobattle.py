@@ -0,0 +1,170 @@
+# autobattle.py
+import discord
+from collections import Counter
+from discord import Embed
+from discord.ext import commands
+from discord.commands import Option
+from utils import CommonResponses, refresh_player_from_data, aserver_settings, player_session
+from images.urls import generate_urls
+from emojis import get_emoji
+from gamedata import game_data
+from resources.loot import generate_zone_loot, loot_slots_needed, add_loot_to_inventory
+from monsters import engine
+from monsters.monster import generate_monster_list
+from monsters.battle import combat_footer_text
+from monsters.session import ZONE_MAX_LEVELS
+
+MAX_AUTO_BATTLES = 25
+
+# No new fight starts below this share of max health
+STOP_HEALTH = 0.5
+
+
+def loot_counts(loot):
+    # generate_zone_loot entries added up by item name
+    counts = Counter()
+    for loot_type, loot_items in loot:
+        if loot_type == 'coppers':
+            counts["Coppers"] += loot_items
+        elif loot_type == 'items':
+            for item, quantity in loot_items:
+                counts[item.name] += quantity
+        else:
+            counts[loot_items.name] += 1
+    return counts
+
+
+class AutoBattleCog(commands.Cog, CommonResponses):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.slash_command(description="Fight a monster several times in a row and get one report.")
+    async def autobattle(self, ctx,
+                         monster: Option(str, "Pick a monster to battle.", choices=generate_monster_list(), required=True),
+                         count: Option(int, "How many fights", min_value=1, max_value=MAX_AUTO_BATTLES, default=5)):
+
+        guild_id = ctx.guild.id
+        author_id = str(ctx.author.id)
+
+        player, player_data = await refresh_player_from_data(ctx)
+
+        if not player_data:
+            embed = Embed(title="Captain Ner0",
+                          description="Arr! What be this? No record of yer adventures? Start a new game with `/newgame` before I make ye walk the plank.",
+                          color=discord.Color.dark_gold())
+            embed.set_thumbnail(url=generate_urls("nero", "confused"))
+            await ctx.respond(embed=embed, ephemeral=True)
+            return
+
+        if player.stats.health <= 0:
+            embed = Embed(title="Captain Ner0",
+                          description="Ahoy! Ye can't do that ye bloody ghost! Ye must travel to the 🪦 `/cemetery` to reenter the realm of the living.",
+                          color=discord.Color.dark_gold())
+            embed.set_thumbnail(url=generate_urls("nero", "confused"))
+            await ctx.respond(embed=embed, ephemeral=True)
+            return
+
+        if player_data["location"] == "citadel":
+            await CommonResponses.exit_citadel_response(ctx)
+            return
+
+        if player_data["location"] == "kraken" or player_data["location"] == "kraken_battle":
+            await CommonResponses.during_kraken_battle_response(ctx)
+            return
+
+        if player_data["location"] == "battle":
+            await CommonResponses.ongoing_battle_response(ctx)
+            return
+
+        settings = await aserver_settings(guild_id)
+        data = game_data()
+
+        # Every fight is resolved in memory; the session saves the player once at the end
+        async with player_session(guild_id, author_id) as session:
+            # A fight may have claimed the player while the settings were loading
+            if session.player_data["location"] == "battle":
+                await CommonResponses.ongoing_battle_response(ctx)
+                return
+            player = session.player
+            zone_level = player.stats.zone_level
+            stats = data.monster_stats(monster, zone_level)
+            starting_level = player.stats.combat_level
+
+            outcomes = Counter()
+            loot_totals = Counter()
+            potions_used = Counter()
+            experience_gained = damage_taken = 0
+            stop_reason = None
+
+            for _ in range(count):
+                if player.stats.health < player.stats.max_health * STOP_HEALTH:
+                    stop_reason = "Stopped to catch yer breath, health is running low."
+                    break
+
+                result = engine.resolve_fight(engine.fighter_from_player(player), stats, settings)
+                outcomes[result.outcome] += 1
+                damage_taken += result.damage_taken
+                player.stats.health = result.health
+                player.stats.stamina = result.stamina
+                for potion in player.inventory.potions:
+                    potion.stack -= result.potions_used.get(potion.name, 0)
+                potions_used.update(result.potions_used)
+
+                if result.outcome != 'won':
+                    stop_reason = {
+                        'died': f"The {monster} got the better of ye.",
+                        'fled': "Out of stamina and potions, ye ran for it.",
+                        'timeout': f"The fight with the {monster} dragged on, so ye called it off.",
+                    }[result.outcome]
+                    break
+
+                session.player_data["monster_kills"][monster] += 1
+
+                # At or above the level cap for the zone, kills give no XP
+                if zone_level not in ZONE_MAX_LEVELS or player.stats.combat_level < ZONE_MAX_LEVELS[zone_level]:
+                    experience_gained += stats.experience_reward
+                    await player.gain_experience(stats.experience_reward, 'combat', None, player)
+
+                loot, _, _, _ = generate_zone_loot(player, zone_level, guild_id, stats.drops, monster)
+                available_slots = player.inventory.limit - player.inventory.total_items_count()
+                if available_slots < loot_slots_needed(player.inventory, loot):
+                    stop_reason = "Yer backpack is full, the last loot was left behind."
+                    break
+                add_loot_to_inventory(player.inventory, loot)
+                loot_totals.update(loot_counts(loot))
+
+            player.stats.damage_taken = 0
+            session.player_data["inventory"] = player.inventory
+
+        fights = sum(outcomes.values())
+        lines = [
+            f"Fought the **{monster}** {fights} time{'s' if fights != 1 else ''}: "
+            f"**{outcomes['won']} won**, {outcomes['fled']} fled, {outcomes['died']} lost.",
+            f"Took **{damage_taken} damage** and gained **{experience_gained} combat XP**.",
+        ]
+        if player.stats.combat_level > starting_level:
+            lines.append(f"🎉 Combat level **{starting_level} → {player.stats.combat_level}**!")
+        if potions_used:
+            lines.append("Potions used: " + ", ".join(f"{get_emoji(name)} {used} {name}" for name, used in potions_used.items()))
+        if stop_reason:
+            lines.append(f"\n*{stop_reason}*")
+        if outcomes['died']:
+            lines.append("☠️ Ye must travel to the 🪦 `/cemetery` to reenter the realm of the living.")
+
+        if loot_totals:
+            lines.append("\n__**Loot picked up:**__")
+            for name, quantity in loot_totals.items():
+                if name == "Coppers":
+                    lines.append(f"{get_emoji('coppers_emoji')} **{quantity} {'Coppers' if quantity > 1 else 'Copper'}**")
+                elif name in data.loot_by_name:
+                    lines.append(f"{get_emoji(data.loot_emoji(name))} **{quantity} {data.loot_plural(name, quantity)}**")
+                else:
+                    lines.append(f"{get_emoji(name)} **{quantity} {name}**")
+
+        embed = Embed(title=f"Auto-battle: {monster}", description="\n".join(lines), color=discord.Color.dark_red())
+        embed.set_footer(text=combat_footer_text(player))
+        await ctx.respond(embed=embed)
+
+
+def setup(bot):
+    bot.add_cog(AutoBattleCog(bot))
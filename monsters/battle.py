@@ -1,10 +1,13 @@
 from discord import Embed
 import discord
-import json
 import random
-from emojis import get_emoji
-from utils import save_player_data, load_player_data, CommonResponses, refresh_player_from_data, get_server_setting
+from emojis import get_emoji, get_partial_emoji
+from utils import asave_player_data, CommonResponses, refresh_player_from_data, server_settings, player_session, get_nero_battle_warnings
 from images.urls import generate_urls
+from exemplars.level_curve import LEVEL_CURVE
+from monsters import engine
+from renderer import embed_renderer
+from resources.loot import loot_slots_needed, add_loot_to_inventory
 import asyncio
 
 class LootOptions(discord.ui.View, CommonResponses):
@@ -96,46 +99,16 @@ class LootOptions(discord.ui.View, CommonResponses):
         # Extract loot items and messages from the battle outcome
         loot = self.battle_outcome[3]
 
-        # Extract all item drops (excluding 'coppers', 'materium' as they don't occupy inventory slots)
-        new_items = [item for loot_type, loot_items in loot if loot_type in ('herb', 'items', 'gem', 'loot')
-                     for item in (loot_items if isinstance(loot_items, list) else [loot_items])]
-
-        # Calculate the number of new inventory slots required
-        required_slots = 0
-        for item in new_items:
-            if isinstance(item, tuple):  # This is for 'items' type which has (Item, quantity) structure
-                item_name = item[0].name
-            else:
-                item_name = item.name
-
-            if not self.player.inventory.has_item(item_name):
-                required_slots += 1
-
         # If player's inventory doesn't have enough space for new non-stackable items
         available_slots = self.player.inventory.limit - self.player.inventory.total_items_count()
-        if available_slots < required_slots:
+        if available_slots < loot_slots_needed(self.player.inventory, loot):
             await interaction.response.send_message("Inventory is full. Please make some room before collecting loot.",
                                                     ephemeral=True)
             return
 
-        for loot_type, loot_items in self.battle_outcome[3]:
-            if loot_type == 'coppers':
-                self.player.inventory.add_coppers(loot_items)
-            elif loot_type == 'gem':
-                self.player.inventory.add_item_to_inventory(loot_items)
-            elif loot_type == 'herb':
-                self.player.inventory.add_item_to_inventory(loot_items)
-            elif loot_type == 'materium':
-                self.player.inventory.add_item_to_inventory(loot_items)
-            elif loot_type == 'loot':
-                self.player.inventory.add_item_to_inventory(loot_items)
-            elif loot_type == 'potion':
-                self.player.inventory.add_item_to_inventory(loot_items)
-            elif loot_type == 'items':  # For items with quantity
-                for item, quantity in loot_items:
-                    self.player.inventory.add_item_to_inventory(item, amount=quantity)
-
-        self.player_data["inventory"] = self.player.inventory.to_dict()
+        add_loot_to_inventory(self.player.inventory, loot)
+
+        self.player_data["inventory"] = self.player.inventory
 
         loot_message_string = '\n'.join(self.loot_messages)
         # Incorporate Loothaven charm effect in the message
@@ -165,7 +138,7 @@ class LootOptions(discord.ui.View, CommonResponses):
             special_nero_embed.set_thumbnail(url=generate_urls("nero", "nero"))
             await interaction.followup.send(embed=special_nero_embed)
 
-        save_player_data(self.guild_id, self.author_id, self.player_data)
+        await asave_player_data(self.guild_id, self.author_id, self.player_data)
 
         self.clear_items()
 
@@ -180,8 +153,7 @@ class LootOptions(discord.ui.View, CommonResponses):
             await interaction.edit_original_response(view=self)
 
 async def start_battle(ctx, monster, player_data, player, author_id, guild_id, battle_embed):
-    from monsters.monster import BattleContext, monster_battle
-    from stats import ResurrectOptions
+    from monsters.session import BattleSession
 
     # Check if player data exists for the user
     if not player_data:
@@ -201,150 +173,18 @@ async def start_battle(ctx, monster, player_data, player, author_id, guild_id, b
         await ctx.respond(embed=embed, ephemeral=True)
         return
 
-    player_data["location"] = "battle"
-    save_player_data(guild_id, author_id, player_data)
-
-    zone_level = player.stats.zone_level
-
-    # Reset the monster's health to its maximum at the start of the battle
-    monster.health = monster.max_health
+    # Claimed before the first await, so another fight starting while we respond finds the player busy
+    session = BattleSession(ctx, ctx, ctx.author, player, player_data, monster, guild_id, author_id, battle_embed)
+    if not session.begin():
+        # The original interaction was answered long ago, so this goes through respond's followup
+        embed = Embed(title="Captain Ner0", description=get_nero_battle_warnings(ctx), color=discord.Color.dark_gold())
+        embed.set_thumbnail(url=generate_urls("nero", "gun"))
+        await ctx.respond(embed=embed, ephemeral=True)
+        return
 
     await ctx.respond(f"{ctx.author.mention} encounters a {monster.name}", ephemeral=True)
 
-    def update_special_attack_buttons(context):
-        if context.special_attack_options_view:
-            context.special_attack_options_view.update_button_states()
-
-    battle_context = BattleContext(ctx, ctx.author, player, monster, battle_embed, zone_level,
-                                   update_special_attack_buttons)
-
-    # Create the special attack options view without the messages first
-    special_attack_options_view = SpecialAttackOptions(battle_context, None, None)
-
-    # IMPORTANT: Set the special attack options view in the battle context immediately
-    battle_context.special_attack_options_view = special_attack_options_view
-
-    # Send the special attack message and store the reference
-    special_attack_message = await ctx.send(view=special_attack_options_view)
-    battle_context.special_attack_message = special_attack_message
-
-    # Send the battle options message and store the reference
-    battle_options_msg = await ctx.send(
-        view=BattleOptions(ctx, player, player_data, battle_context, special_attack_options_view))
-    battle_context.battle_options_msg = battle_options_msg
-
-    # Now update the special attack options view with the message references
-    special_attack_options_view.battle_options_msg = battle_options_msg
-    special_attack_options_view.special_attack_message = special_attack_message
-
-    # Start the monster attack task and receive its outcome
-    battle_result = await monster_battle(battle_context, guild_id=guild_id)
-
-    if battle_result is None:
-        # Save the player's current stats
-        player_data["stats"]["stamina"] = player.stats.stamina
-        player_data["stats"]["combat_level"] = player.stats.combat_level
-        player_data["stats"]["combat_experience"] = player.stats.combat_experience
-        player_data["stats"]["health"] = player.stats.health
-        player_data["stats"]["damage_taken"] = player.stats.damage_taken
-        player_data["stats"].update(player.stats.__dict__)
-
-        save_player_data(guild_id, author_id, player_data)
-
-    # Process battle outcome
-    else:
-        # Unpack the battle outcome and loot messages
-        battle_outcome, loot_messages = battle_result
-
-        # Define the maximum level for each zone
-        zone_max_levels = {
-            1: 20,
-            2: 40,
-            3: 60,
-            4: 80,
-        }
-
-        if battle_outcome[0]:
-
-            # Check if the player is at or above the level cap for their current zone
-            if zone_level in zone_max_levels and player.stats.combat_level >= zone_max_levels[zone_level]:
-                # Player is at or has exceeded the level cap for their zone; set XP gain to 0
-                experience_gained = 0
-            else:
-                # Player is below the level cap; award XP from the monster
-                experience_gained = monster.experience_reward
-
-            loothaven_effect = battle_outcome[5]  # Get the Loothaven effect status
-            await player.gain_experience(experience_gained, 'combat', ctx, player)
-
-            player_data["stats"]["stamina"] = player.stats.stamina
-            player_data["stats"]["combat_level"] = player.stats.combat_level
-            player_data["stats"]["combat_experience"] = player.stats.combat_experience
-            player.stats.damage_taken = 0
-            player_data["stats"].update(player.stats.__dict__)
-
-            if player.stats.health <= 0:
-                player.stats.health = player.stats.max_health
-
-            # Increment the count of the defeated monster
-            player_data["monster_kills"][monster.name] += 1
-
-            # Save the player data after common actions
-            save_player_data(guild_id, author_id, player_data)
-
-            # Clear the previous views
-            await battle_context.special_attack_message.delete()
-            await battle_options_msg.delete()
-
-            loot_view = LootOptions(ctx, player, monster, battle_embed, player_data, author_id, battle_outcome,
-                                    loot_messages, guild_id, ctx, experience_gained, loothaven_effect, battle_context.rusty_spork_dropped)
-
-            max_cap_message = ""
-            if experience_gained == 0:
-                max_cap_message = f"\n**(Max XP cap reached for Zone {player.stats.zone_level})**"
-
-            # Construct the embed with the footer
-            battle_outcome_embed = create_battle_embed(ctx.user, player, monster,
-                                                       footer_text_for_embed(ctx, monster),
-                                                       f"You have **DEFEATED** the {monster.name}!\n"
-                                                       f"You dealt **{battle_outcome[1]} damage** to the monster and took **{battle_outcome[2]} damage**. "
-                                                       f"You gained {experience_gained} combat XP. {max_cap_message}\n"
-                                                       f"\n\u00A0\u00A0")
-
-            await battle_embed.edit(
-                embed=battle_outcome_embed,
-                view=loot_view
-            )
-
-        else:
-
-            # The player is defeated
-            player.stats.health = 0  # Set player's health to 0
-            player_data["stats"]["health"] = 0
-
-            # Create a new embed with the defeat message
-            new_embed = create_battle_embed(ctx.user, player, monster, footer_text="", messages=
-
-            f"☠️ You have been **DEFEATED** by the **{monster.name}**!\n"
-            f"{get_emoji('rip_emoji')} *Your spirit lingers, seeking renewal.* {get_emoji('rip_emoji')}\n\n"
-            f"__**Options for Revival:**__\n"
-            f"1. Use {get_emoji('Materium')} to revive without penalty.\n"
-            f"2. Resurrect with 2.5% penalty to all skills."
-            f"**Lose all items in inventory** (Keep equipped items, coppers, MTRM, potions, and charms)")
-
-            # Clear the previous BattleOptions view
-            await battle_context.special_attack_message.delete()
-            await battle_options_msg.delete()
-
-            # Add the "dead.png" image to the embed
-            new_embed.set_image(url=generate_urls("cemetery", "dead"))
-
-            # Update the message with the new embed and view
-            await battle_embed.edit(embed=new_embed, view=ResurrectOptions(ctx, player_data, author_id))
-
-    # Clear the battle flag after the battle ends
-    player_data["location"] = None
-    save_player_data(guild_id, author_id, player_data)
+    await session.run()
 
 def use_potion_logic(player, potion_name):
 
@@ -385,9 +225,7 @@ class BattleOptions(discord.ui.View, CommonResponses):
 
     def create_potion_button(self, potion_name, callback):
         stack_count = self.player.get_potion_stack(potion_name)
-        emoji_str = get_emoji(potion_name)
-        emoji_id = int(emoji_str.split(':')[2].strip('>'))
-        emoji = discord.PartialEmoji(name=potion_name, id=emoji_id)
+        emoji = get_partial_emoji(potion_name)
         button_label = f" {stack_count:,}" if stack_count else ""
         button = discord.ui.Button(
             label=button_label,
@@ -443,10 +281,10 @@ class BattleOptions(discord.ui.View, CommonResponses):
         # Defer the interaction first
         await interaction.response.defer()
 
-        potion_used = use_potion_logic(self.player, potion_name)
-
-        # Save any changes to player data
-        save_player_data(self.interaction.guild_id, self.author_id, self.player_data)
+        # Holds the player while the potion is applied, so the fight's own save or a gathering click waits for it
+        async with player_session(self.interaction.guild_id, self.author_id, player=self.player) as session:
+            self.player_data = session.player_data
+            potion_used = use_potion_logic(self.player, potion_name)
 
         if potion_used:
             # Update the button label to show new stack count
@@ -462,17 +300,12 @@ class BattleOptions(discord.ui.View, CommonResponses):
                 potion_message = f"{emoji_str} **{potion_name} restores {potion.effect_value} {potion.effect_stat}**"
                 await self.battle_context.add_battle_message(potion_message)
 
-            # Attempt to update battle embed
-            try:
-                # Calculate the updated footer text including the run percentage
-                updated_footer_text = footer_text_for_embed(interaction, self.battle_context.monster, self.player)
-                battle_embed = create_battle_embed(
-                    self.interaction.user, self.player, self.battle_context.monster, updated_footer_text,
-                    self.battle_context.battle_messages
-                )
-                await self.battle_context.message.edit(embed=battle_embed)
-            except discord.NotFound:
-                pass
+            # Update the battle embed, including the new run percentage in the footer
+            battle_embed = create_battle_embed(
+                self.interaction.user, self.player, self.battle_context.monster, self.battle_context.footer_text(),
+                self.battle_context.battle_messages
+            )
+            embed_renderer.edit(self.battle_context.message, embed=battle_embed)
 
             # Since we deferred, attempt to use followup to edit the message
             try:
@@ -483,13 +316,10 @@ class BattleOptions(discord.ui.View, CommonResponses):
             # Update SpecialAttackOptions button states if available
             if self.special_attack_options_view:
                 self.special_attack_options_view.update_button_states()
-                try:
-                    await self.battle_context.special_attack_message.edit(view=self.special_attack_options_view)
-                except discord.NotFound:
-                    pass
+                embed_renderer.edit(self.battle_context.special_attack_message, view=self.special_attack_options_view)
 
 class SpecialAttackOptions(discord.ui.View, CommonResponses):
-    stamina_costs = {1: 1, 2: 10, 3: 20, 4: 30}
+    stamina_costs = engine.ATTACK_STAMINA_COSTS
 
     def __init__(self, battle_context, battle_options_msg, special_attack_message):
         super().__init__(timeout=None)
@@ -521,7 +351,7 @@ class SpecialAttackOptions(discord.ui.View, CommonResponses):
         attack_emojis = ["left_click", "right_click", "q", "e"]
 
         for i in range(1, self.max_special_attack_level + 1):
-            emoji = get_emoji(attack_emojis[i - 1])
+            emoji = get_partial_emoji(attack_emojis[i - 1])
             custom_id = f"attack_{i}"
 
             # Disable the button if the player doesn't have enough stamina
@@ -581,19 +411,14 @@ class SpecialAttackOptions(discord.ui.View, CommonResponses):
         if random.random() < run_chance:
             self.battle_context.end_battle()
             self.disable_all_buttons()
+            embed_renderer.discard(self.special_attack_message)
             await self.battle_options_msg.delete()
             await self.special_attack_message.delete()
 
-            # Add successful escape message to battle messages
+            # Add successful escape message to battle messages; the battle session clears the battle flag
             await self.battle_context.add_battle_message(
                 f"**{interaction.user.mention} has successfully fled the battle with the {self.battle_context.monster.name}!**")
 
-            # Clear the battle flag
-            player_data = load_player_data(self.battle_context.ctx.guild.id, str(self.battle_context.user.id))
-            player_data["location"] = None
-            save_player_data(self.battle_context.ctx.guild.id, str(self.battle_context.user.id), player_data)
-
-
         else:  # Failed escape
             self.disable_run_button()
             await interaction.edit_original_response(view=self)
@@ -647,11 +472,8 @@ class SpecialAttackOptions(discord.ui.View, CommonResponses):
         # After handling the attack, update the button states based on the new game context
         self.update_button_states()
 
-        try:
-            # Finally, edit the original response to reflect the updated button states
-            await interaction.edit_original_response(view=self)
-        except discord.NotFound:
-            pass
+        # Finally, queue the updated button states; they join the view edits made during the attack
+        embed_renderer.render(interaction.message.id, interaction.edit_original_response, view=self)
 
     def disable_unarmed_button(self):
         for item in self.children:
@@ -676,10 +498,9 @@ class SpecialAttackOptions(discord.ui.View, CommonResponses):
         await player_attack_task(self.battle_context, attack_level, guild_id=interaction.guild_id, is_unarmed=is_unarmed)
 
         # After monster's health changes, update the battle embed
-        new_footer_text = footer_text_for_embed(self.ctx, self.monster, self.player)
-        updated_embed = create_battle_embed(self.battle_context.user, self.player, self.monster, new_footer_text,
+        updated_embed = create_battle_embed(self.battle_context.user, self.player, self.monster, self.battle_context.footer_text(),
                                             self.battle_messages)
-        await self.battle_embed_message.edit(embed=updated_embed)
+        embed_renderer.edit(self.battle_embed_message, embed=updated_embed)
 
         # Check if the monster is already defeated
         if self.battle_context.monster.is_defeated():
@@ -689,36 +510,13 @@ class SpecialAttackOptions(discord.ui.View, CommonResponses):
                     f"The monster {self.battle_context.monster.name} is already dead!", ephemeral=True)
             return
 
-        try:
-            # Update button states based on the new stamina level
-            self.update_button_states()
-
-            # Update the Discord view again to reflect the re-enabled buttons
-            await interaction.edit_original_response(view=self)
-        except discord.NotFound:
-            pass
+        # Update button states based on the new stamina level and queue the re-enabled buttons
+        self.update_button_states()
+        embed_renderer.render(interaction.message.id, interaction.edit_original_response, view=self)
 
 def calculate_run_chance(player, monster_health, monster_max_health, guild_id):
-
-    base_run_chance = get_server_setting(guild_id, 'base_run_chance')
-
-    # Calculate base run chance
-    if monster_health > monster_max_health * 0.5:
-        run_chance = base_run_chance  # Base chance if monster health is above 50%
-    else:
-        # Linearly increase the run chance from base to 50% as monster health decreases from 50% to 0%
-        run_chance = base_run_chance + ((0.5 - base_run_chance) * ((monster_max_health * 0.5 - monster_health) / (monster_max_health * 0.5)))
-
-    # Double the run chance if Ironhide charm is equipped
-    if player.inventory.equipped_charm and player.inventory.equipped_charm.name == "Ironhide":
-        run_chance *= 2
-
-    # Halve the run chance if player's stamina is 0
-    if player.stats.stamina == 0:
-        run_chance *= 0.5
-
-    # Ensure run chance does not exceed 100%
-    return min(run_chance, 1.0)
+    return engine.run_chance(monster_health, monster_max_health, player.stats.stamina, server_settings(guild_id),
+                             engine.equipped_charm(player) == "Ironhide")
 
 
 def create_health_bar(current, max_health):
@@ -824,33 +622,31 @@ def create_battle_embed(user, player, monster, footer_text, messages=None):
 
     return embed
 
-def footer_text_for_embed(ctx, monster=None, player=None):
-    with open("level_data.json", "r") as f:
-        LEVEL_DATA = json.load(f)
-
-    guild_id = ctx.guild.id
-    author_id = str(ctx.user.id)
-    player_data = load_player_data(guild_id, author_id)
-
-    current_combat_level = player_data["stats"]["combat_level"]
+def combat_footer_text(player):
+    """Combat level and XP part of the battle footer, from the in-memory player and LEVEL_CURVE."""
+    current_combat_level = player.stats.combat_level
     next_combat_level = current_combat_level + 1
-    current_combat_experience = player_data["stats"]["combat_experience"]
+    current_combat_experience = player.stats.combat_experience
     formatted_current_combat_experience = "{:,}".format(current_combat_experience)
 
     # Generate base footer text based on combat level
     if next_combat_level >= 100:
-        footer_text = f"⚔️ Combat Level: {current_combat_level} | 📊 Max Level! {formatted_current_combat_experience} XP"
-    else:
-        next_level_experience_needed = LEVEL_DATA.get(str(current_combat_level), {}).get("total_experience")
-        experience_to_next_level = next_level_experience_needed - current_combat_experience
-        formatted_experience_to_next_level = "{:,}".format(experience_to_next_level)
-        footer_text = f"⚔️ Combat: {current_combat_level} ~~ 📊 XP to {next_combat_level}: {formatted_experience_to_next_level}"
+        return f"⚔️ Combat Level: {current_combat_level} | 📊 Max Level! {formatted_current_combat_experience} XP"
+    experience_to_next_level = LEVEL_CURVE.xp_to_next(current_combat_level, current_combat_experience)
+    formatted_experience_to_next_level = "{:,}".format(experience_to_next_level)
+    return f"⚔️ Combat: {current_combat_level} ~~ 📊 XP to {next_combat_level}: {formatted_experience_to_next_level}"
+
+
+def run_chance_footer_text(run_chance):
+    return f" ~~ 💨 Run {round(run_chance * 100)}%"
+
+
+def footer_text_for_embed(ctx, monster=None, player=None):
+    footer_text = combat_footer_text(player)
 
     # Calculate and append the run chance if the monster is not defeated
     if monster and not monster.is_defeated():
-        run_chance = calculate_run_chance(player, monster.health, monster.max_health, guild_id)
-        run_chance_percent = round(run_chance * 100)  # Convert to percentage
-        footer_text += f" ~~ 💨 Run {run_chance_percent}%"
+        footer_text += run_chance_footer_text(calculate_run_chance(player, monster.health, monster.max_health, ctx.guild.id))
 
     return footer_text
 
@@ -0,0 +1,177 @@
+# engine.py
+import math
+import random
+from collections import namedtuple
+
+# Stamina each special attack level costs; level 1 is also the unarmed punch
+ATTACK_STAMINA_COSTS = {1: 1, 2: 10, 3: 20, 4: 30}
+
+HEALTH_POTIONS = ("Health Potion", "Super Health Potion")
+STAMINA_POTIONS = ("Stamina Potion", "Super Stamina Potion")
+
+
+def hit_probability(attacker_attack, defender_defense, settings, ironhide=False):
+    # Ironhide on the defender lowers both the base and the minimum hit chance
+    ironhide_percent = settings.ironhide_percent if ironhide else 0
+    base_hit_probability = 0.75 - ironhide_percent
+    min_hit_chance = 0.4 - ironhide_percent
+
+    attack_defense_ratio = attacker_attack / (defender_defense + 1)  # add 1 to avoid division by zero
+    hit_probability = base_hit_probability * attack_defense_ratio
+    max_hit_chance = 0.9  # maximum hit chance regardless of stats
+
+    # Return the final hit probability, ensuring it's within the defined range
+    return min(max(hit_probability, min_hit_chance), max_hit_chance)
+
+
+def damage_range(attacker_attack, defender_defense):
+    # Cap the ratio between 0.5 and 1.5 for more balanced gameplay
+    attack_defense_ratio = max(0.5, min(1.5, attacker_attack / (defender_defense + 1)))
+    return attacker_attack * attack_defense_ratio * 0.9, attacker_attack * attack_defense_ratio * 1.1
+
+
+def critical_multiplier(settings, mightstone=False):
+    return settings.critical_hit_multiplier * (settings.mightstone_multiplier if mightstone else 1)
+
+
+def critical_hit_chance(settings, mightstone=False):
+    return settings.critical_hit_chance * (settings.mightstone_multiplier if mightstone else 1)
+
+
+def roll_damage(attacker_attack, defender_defense, settings, is_critical_hit=False, mightstone=False, rng=random):
+    damage_dealt = round(rng.uniform(*damage_range(attacker_attack, defender_defense)))
+    if is_critical_hit:
+        damage_dealt = round(damage_dealt * critical_multiplier(settings, mightstone))
+    return damage_dealt
+
+
+def attack_speed_modifier(attack_value):
+    # Seconds between monster attacks, capped to a minimum and maximum value
+    return max(1, min(3, 2 - attack_value * 0.05))
+
+
+def run_chance(monster_health, monster_max_health, stamina, settings, ironhide=False):
+    base_run_chance = settings.base_run_chance
+    if monster_health > monster_max_health * 0.5:
+        chance = base_run_chance
+    else:
+        # Linearly increase the run chance from base to 50% as monster health decreases from 50% to 0%
+        chance = base_run_chance + ((0.5 - base_run_chance) * ((monster_max_health * 0.5 - monster_health) / (monster_max_health * 0.5)))
+    if ironhide:
+        chance *= 2
+    # Exhausted players run at half the chance
+    if stamina == 0:
+        chance *= 0.5
+    return min(chance, 1.0)
+
+
+def equipped_charm(player):
+    inventory = getattr(player, 'inventory', None)
+    charm = inventory.equipped_charm if inventory else None
+    return charm.name if charm else None
+
+
+# Everything a fight reads from an Exemplar, so fights can run without one
+Fighter = namedtuple("Fighter", (
+    "attack", "damage", "defense", "armor", "health", "max_health", "stamina", "max_stamina",
+    "special_attack", "armed", "charm", "potions"
+))
+
+
+def fighter_from_player(player):
+    weapon = player.inventory.equipped_weapon
+    potions = {potion.name: (potion.effect_value, potion.stack) for potion in player.inventory.potions if potion.stack > 0}
+    stats = player.stats
+    return Fighter(stats.attack, stats.damage, stats.defense, stats.armor, stats.health, stats.max_health,
+                   stats.stamina, stats.max_stamina, min(4, weapon.special_attack) if weapon else 1,
+                   weapon is not None, equipped_charm(player), potions)
+
+
+# When a headless fighter drinks: health below this share of max, stamina below the cheapest attack
+PotionRules = namedtuple("PotionRules", ("health_below", "stamina_below"), defaults=(0.35, ATTACK_STAMINA_COSTS[1]))
+
+FightResult = namedtuple("FightResult", (
+    "outcome", "duration", "damage_taken", "health", "stamina", "potions", "potions_used", "swings"
+))
+
+
+def attack_level_for(stamina, max_level):
+    # Strongest attack the fighter can pay for, 0 if none
+    for level in range(max_level, 0, -1):
+        if stamina >= ATTACK_STAMINA_COSTS[level]:
+            return level
+    return 0
+
+
+def _drink(potions, potions_used, names, current, maximum):
+    # Cheapest potion first; returns the new value of the restored stat
+    for name in names:
+        effect_value, stack = potions.get(name, (0, 0))
+        if stack > 0:
+            potions[name] = (effect_value, stack - 1)
+            potions_used[name] = potions_used.get(name, 0) + 1
+            return min(current + effect_value, maximum)
+    return current
+
+
+def resolve_fight(fighter, monster, settings, rules=PotionRules(), swing_interval=1.0, max_duration=3600, rng=random):
+    """Play one fight to the end with the live battle rules.
+
+    The monster attacks as soon as the fight starts and then every attack_speed_modifier seconds;
+    the fighter swings every swing_interval seconds, drinking per rules before each swing and trying
+    to run once out of stamina and potions. outcome is 'won', 'died', 'fled' or 'timeout'.
+    """
+    mightstone = fighter.charm == "Mightstone"
+    ironhide = fighter.charm == "Ironhide"
+    health, stamina = fighter.health, fighter.stamina
+    potions = dict(fighter.potions)
+    potions_used = {}
+    monster_health = monster.health
+    damage_taken = swings = 0
+
+    monster_hit = hit_probability(monster.attack, fighter.defense, settings, ironhide)
+    monster_interval = attack_speed_modifier(monster.attack)
+    crit_chance = critical_hit_chance(settings, mightstone)
+    damage_reduction = 1 if fighter.armed else settings.unarmed_damaged_reduction
+
+    monster_next, player_next = 0.0, swing_interval
+    outcome, now = 'timeout', 0.0
+    while now <= max_duration:
+        if monster_next <= player_next:
+            now = monster_next
+            is_critical_hit = rng.random() < settings.critical_hit_chance
+            if rng.random() < monster_hit:
+                damage_dealt = roll_damage(monster.attack, fighter.defense + fighter.armor, settings, is_critical_hit, rng=rng)
+                damage_taken += damage_dealt
+                health = max(health - damage_dealt, 0)
+                if health == 0:
+                    outcome = 'died'
+                    break
+            monster_next += monster_interval
+            continue
+
+        now = player_next
+        player_next += swing_interval
+        if health < fighter.max_health * rules.health_below:
+            health = _drink(potions, potions_used, HEALTH_POTIONS, health, fighter.max_health)
+        if stamina < rules.stamina_below:
+            stamina = _drink(potions, potions_used, STAMINA_POTIONS, stamina, fighter.max_stamina)
+
+        attack_level = attack_level_for(stamina, fighter.special_attack)
+        if attack_level == 0:
+            if rng.random() < run_chance(monster_health, monster.health, stamina, settings, ironhide):
+                outcome = 'fled'
+                break
+            continue
+
+        stamina = max(stamina - ATTACK_STAMINA_COSTS[attack_level], 0)
+        swings += 1
+        is_critical_hit = rng.random() < crit_chance
+        if rng.random() < hit_probability(fighter.attack * attack_level, monster.defense, settings):
+            damage_dealt = roll_damage((fighter.attack + fighter.damage) * attack_level, monster.defense, settings, is_critical_hit, mightstone, rng)
+            monster_health = max(monster_health - math.ceil(damage_dealt * damage_reduction), 0)
+            if monster_health == 0:
+                outcome = 'won'
+                break
+
+    return FightResult(outcome, now, damage_taken, health, stamina, potions, potions_used, swings)
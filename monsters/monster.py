@@ -1,13 +1,15 @@
 # monster.py
-import discord
 import random
-from resources.loot import generate_zone_loot, loot_definitions
-from monsters.battle import create_battle_embed, footer_text_for_embed
+from resources.loot import generate_zone_loot
+from monsters.battle import create_battle_embed, footer_text_for_embed, combat_footer_text, run_chance_footer_text
 import asyncio
-from resources.item import Item
 import math
 from emojis import get_emoji
-from utils import get_server_setting
+from utils import server_settings
+from gamedata import game_data
+from monsters import engine
+from scheduler import tick_scheduler
+from renderer import embed_renderer
 
 class Monster:
     def __init__(self, name, health, max_health, attack, stamina, experience_reward, weak_against, strong_against, attack_speed, drop):
@@ -29,95 +31,25 @@ class Monster:
         return False
 
 def generate_monster_by_name(name, zone_level):
-    monster_types = [
-        ('Rabbit', 10, 1, 1, None, None, 1.5, [Item('Rabbit Body')], [1]),
-        ('Deer', 20, 2, 3, None, None, 1.6, [Item('Deer Parts'), Item('Deer Skin')], [1, 1]),
-        ('Buck', 30, 3, 4, 'longbow', 'warhammer', 1.7, [Item('Deer Parts'), Item('Deer Skin')], [2, 3]),
-        ('Wolf', 50, 6, 5, 'warhammer', 'staff', 1.8, [Item('Wolf Skin')], [1]),
-        ('Goblin', 100, 10, 10, 'longsword', 'longbow', 2, [Item('Onyx')], [1]),
-        ('Goblin Hunter', 200, 20, 20, 'dual_daggers', 'warhammer', 2.2, [Item('Onyx')], [5]),
-        ('Mega Brute', 1500, 35, 30, 'longsword', 'staff', 2.5, [Item('Onyx')], [10]),
-        ('Wisp', 2000, 45, 40, 'staff', 'longbow', 2.7, [Item('Glowing Essence')], [1]),
-        ('Mother', 3000, 55, 50, 'sword', 'hammer', 3, [Item('Goblin Crown'), Item('Onyx')], [1, 20])
-    ]
-
-    monster = next((m for m in monster_types if m[0] == name), None)
-    if not monster:
-        raise ValueError(f"No monster found with name {name}")
-
-    # Applying zone level scaling
-    health = round(monster[1] * math.sqrt(zone_level))
-    attack = round(monster[2] * math.log2(zone_level + 1))
-    stamina = round(monster[3] * math.log2(zone_level + 1))
-    experience_reward = round((attack + stamina) * 1.5)
-    attack_speed = monster[6] - (0.05 * math.log2(zone_level + 1))  # Making it slightly faster in higher zones
-    max_health = health
-    drop_items = [Item(name=item.name, description=loot_definitions.get(item.name, {}).get('description'), value=loot_definitions.get(item.name, {}).get('value', 10)) for item in monster[7]]
-    drop_quantities = monster[8] if isinstance(monster[8], list) else [monster[8]]
-    drop = list(zip(drop_items, drop_quantities))
-
-    return Monster(monster[0], health, max_health, attack, stamina, experience_reward, monster[4], monster[5], attack_speed, drop)
+    # Stat blocks are precomputed per zone; only the Monster itself, which takes damage, is new
+    stats = game_data().monster_stats(name, zone_level)
+    return Monster(stats.name, stats.health, stats.health, stats.attack, stats.defense, stats.experience_reward,
+                   stats.weak_against, stats.strong_against, stats.attack_speed, stats.drops)
 
 
 def generate_monster_list():
-    monster_names = [
-        'Rabbit',
-        'Deer',
-        'Buck',
-        'Wolf',
-        'Goblin',
-        'Goblin Hunter',
-        'Mega Brute',
-        'Wisp',
-        'Mother'
-    ]
-    return monster_names
+    return list(game_data().monster_names)
 
 def calculate_hit_probability(attacker_attack, defender_defense, guild_id, player=None):
-    # Check if player is wearing the Ironhide charm
-    if player and player.inventory.equipped_charm and player.inventory.equipped_charm.name == "Ironhide":
-        base_hit_probability = 0.75 - get_server_setting(guild_id, 'ironhide_percent')  # Decrease base hit chance
-        min_hit_chance = 0.4 - get_server_setting(guild_id, 'ironhide_percent')  # Decrease minimum hit chance
-    else:
-        base_hit_probability = 0.75  # Standard base hit chance
-        min_hit_chance = 0.4  # Standard minimum hit chance
-
-    attack_defense_ratio = attacker_attack / (defender_defense + 1)  # add 1 to avoid division by zero
-    hit_probability = base_hit_probability * attack_defense_ratio
-    max_hit_chance = 0.9  # maximum hit chance regardless of stats
-
-    # Return the final hit probability, ensuring it's within the defined range
-    return min(max(hit_probability, min_hit_chance), max_hit_chance)
+    # player is the defender, if it is a player; only their Ironhide charm matters here
+    return engine.hit_probability(attacker_attack, defender_defense, server_settings(guild_id), engine.equipped_charm(player) == "Ironhide")
 
 def calculate_damage(player, attacker_attack, defender_defense, guild_id, is_critical_hit=False):
-    attack_defense_ratio = attacker_attack / (defender_defense + 1)
-
-    # Cap the ratio between 0.5 and 1.5 for more balanced gameplay
-    attack_defense_ratio = max(0.5, min(1.5, attack_defense_ratio))
-
-    # Generate random damage within a range
-    damage = random.uniform(
-        attacker_attack * attack_defense_ratio * 0.9,  # Lower bound
-        attacker_attack * attack_defense_ratio * 1.1  # Upper bound
-    )
-
-    # Round to whole number
-    damage_dealt = round(damage)
-
-    # Apply critical hit multiplier if applicable
-    if is_critical_hit:
-        crit_multiplier = get_server_setting(guild_id, 'critical_hit_multiplier')
-        # Check if player is the actual player and has Mightstone equipped
-        if hasattr(player,
-                   'inventory') and player.inventory.equipped_charm and player.inventory.equipped_charm.name == "Mightstone":
-            crit_multiplier *= get_server_setting(guild_id, 'mightstone_multiplier')  # Increases critical hit by factor of mightstone_multiplier
-        damage_dealt = round(damage_dealt * crit_multiplier)
-
-    return damage_dealt
+    # player is the attacker; a Mightstone charm raises its critical hit multiplier
+    return engine.roll_damage(attacker_attack, defender_defense, server_settings(guild_id), is_critical_hit, engine.equipped_charm(player) == "Mightstone")
 
 def calculate_attack_speed_modifier(attack_value):
-    # Cap the attack speed to a minimum and maximum value
-    return max(1, min(3, 2 - attack_value * 0.05))
+    return engine.attack_speed_modifier(attack_value)
 
 class BattleContext:
     def __init__(self, ctx, user, player, monster, message, zone_level, update_callback=None):
@@ -132,9 +64,19 @@ class BattleContext:
         self.update_callback = update_callback
         self.is_battle_active = True
         self.rusty_spork_dropped = False
+        # The monster's attacks on tick_scheduler, once the fight has started
+        self.monster_ticks = None
+        # Footer inputs worked out once, so rebuilding the embed on every swing and tick reads nothing from disk;
+        # combat XP and the equipped charm cannot change until the fight is over
+        self.settings = server_settings(ctx.guild.id)
+        self.ironhide = engine.equipped_charm(player) == "Ironhide"
+        self.combat_footer = combat_footer_text(player)
 
     def end_battle(self):
         self.is_battle_active = False
+        # Stop the monster right away instead of at its next attack
+        if self.monster_ticks:
+            self.monster_ticks.cancel()
 
     def update_special_attacks(self):
         if self.update_callback:
@@ -147,11 +89,20 @@ class BattleContext:
             self.battle_messages.append(new_message)
             await self.update_battle_embed()
 
+    def footer_text(self):
+        if self.monster.is_defeated():
+            return self.combat_footer
+        run_chance = engine.run_chance(self.monster.health, self.monster.max_health, self.player.stats.stamina,
+                                       self.settings, self.ironhide)
+        return self.combat_footer + run_chance_footer_text(run_chance)
+
     async def update_battle_embed(self):
-        battle_embed = create_battle_embed(self.user, self.player, self.monster, footer_text_for_embed(self.ctx, self.monster, self.player), self.battle_messages)
-        await self.message.edit(embed=battle_embed)
+        # Queued on the renderer: swings and monster ticks landing together go out as one edit
+        battle_embed = create_battle_embed(self.user, self.player, self.monster, self.footer_text(), self.battle_messages)
+        embed_renderer.edit(self.message, embed=battle_embed)
 
 async def player_attack_task(battle_context, attack_level, guild_id, is_unarmed=False):
+    settings = server_settings(guild_id)
 
     hit_probability = calculate_hit_probability(battle_context.player.stats.attack * attack_level, battle_context.monster.defense, guild_id)
 
@@ -159,18 +110,18 @@ async def player_attack_task(battle_context, attack_level, guild_id, is_unarmed=
     total_player_attack = battle_context.player.stats.attack + battle_context.player.stats.damage
 
     # Adjust critical hit chance if Mightstone is equipped
-    crit_chance = get_server_setting(guild_id, 'critical_hit_chance') * get_server_setting(guild_id, 'mightstone_multiplier') if battle_context.player.inventory.equipped_charm and battle_context.player.inventory.equipped_charm.name == "Mightstone" else get_server_setting(guild_id, 'CRITICAL_HIT_CHANCE')
+    crit_chance = engine.critical_hit_chance(settings, engine.equipped_charm(battle_context.player) == "Mightstone")
     is_critical_hit = random.random() < crit_chance
 
     if random.random() < hit_probability:
         # Check if the player is unarmed and apply damage nerf
         if is_unarmed:
-            damage_reduction_multiplier = get_server_setting(guild_id, 'unarmed_damaged_reduction')
+            damage_reduction_multiplier = settings.unarmed_damaged_reduction
         else:
             damage_reduction_multiplier = 1  # No reduction
 
         # Calculate the damage
-        damage_dealt = calculate_damage(battle_context.player, total_player_attack * attack_level, battle_context.monster.defense, is_critical_hit)
+        damage_dealt = calculate_damage(battle_context.player, total_player_attack * attack_level, battle_context.monster.defense, guild_id, is_critical_hit)
         # Apply damage reduction and ensure it's at least 1 by rounding up
         damage_dealt = math.ceil(damage_dealt * damage_reduction_multiplier)
 
@@ -186,38 +137,37 @@ async def player_attack_task(battle_context, attack_level, guild_id, is_unarmed=
     else:
         update_message = f"The {battle_context.monster.name} ***evaded*** the attack of {battle_context.user.mention}!"
 
-    # Add the update message to the battle context
+    # Add the update message to the battle context, which also updates the battle embed
     await battle_context.add_battle_message(update_message)
-
-    # Update the battle embed and special attack buttons
-    await battle_context.update_battle_embed()
     battle_context.update_special_attacks()
 
-    # Attempt to edit the message with updated view
-    try:
-        await battle_context.special_attack_message.edit(view=battle_context.special_attack_options_view)
-    except discord.NotFound:
-        pass
+    # Queue the updated view; a deleted message is ignored by the renderer
+    embed_renderer.edit(battle_context.special_attack_message, view=battle_context.special_attack_options_view)
 
     # Check if monster is defeated and return control to the caller
     if battle_context.monster.is_defeated():
         return
 
 async def monster_attack_task(battle_context, guild_id):
+    """Run the monster's attacks on the shared tick scheduler until the fight is over."""
+    settings = server_settings(guild_id)
     attack_speed_modifier = calculate_attack_speed_modifier(battle_context.monster.attack)
 
     # Total defense == player's defense + armor
     total_player_defense = battle_context.player.stats.defense + battle_context.player.stats.armor
 
-    while battle_context.is_battle_active and not battle_context.monster.is_defeated() and not battle_context.player.is_defeated():
-        hit_probability = calculate_hit_probability(battle_context.monster.attack, battle_context.player.stats.defense, battle_context.player)
+    async def monster_attack_tick():
+        if not battle_context.is_battle_active or battle_context.monster.is_defeated() or battle_context.player.is_defeated():
+            return None
+
+        hit_probability = calculate_hit_probability(battle_context.monster.attack, battle_context.player.stats.defense, guild_id, battle_context.player)
 
         # Determine if it's a critical hit
-        is_critical_hit = random.random() < get_server_setting(guild_id, 'critical_hit_chance')
+        is_critical_hit = random.random() < settings.critical_hit_chance
 
         # Check if the attack hits
         if random.random() < hit_probability:
-            damage_dealt = calculate_damage(battle_context.monster, battle_context.monster.attack, total_player_defense, is_critical_hit)
+            damage_dealt = calculate_damage(battle_context.monster, battle_context.monster.attack, total_player_defense, guild_id, is_critical_hit)
             battle_context.player.stats.damage_taken += damage_dealt
             battle_context.player.stats.health = max(battle_context.player.stats.health - damage_dealt, 0)
             update_message = f"The {battle_context.monster.name} dealt {damage_dealt} damage to {battle_context.user.mention}!"
@@ -230,9 +180,12 @@ async def monster_attack_task(battle_context, guild_id):
         await battle_context.add_battle_message(update_message)
 
         if battle_context.player.is_defeated():
-            break
+            return None
+        return attack_speed_modifier
 
-        await asyncio.sleep(attack_speed_modifier)
+    # The first attack lands right away, like it always has
+    battle_context.monster_ticks = tick_scheduler.schedule(0, monster_attack_tick, name=f"{battle_context.monster.name} vs {battle_context.user.id}")
+    await battle_context.monster_ticks.wait()
 
 def generate_evasion_message(player, monster, user):
     if player.inventory.equipped_charm and player.inventory.equipped_charm.name == "Ironhide":
@@ -247,6 +200,9 @@ async def monster_battle(battle_context, guild_id):
     # Await the completion of the monster attack task
     await monster_attack
 
+    # Let the last queued embed go out before the caller replaces it with the outcome
+    await embed_renderer.flush(battle_context.message)
+
     # Check if the battle ended prematurely
     if not battle_context.is_battle_active:
         return None  # Return None to indicate that the battle ended prematurely
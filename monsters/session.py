@@ -0,0 +1,180 @@
+# session.py
+from utils import player_session, save_player_data, send_message
+from images.urls import generate_urls
+from emojis import get_emoji
+from monsters.monster import BattleContext, monster_battle, create_battle_embed
+from monsters.battle import BattleOptions, SpecialAttackOptions, LootOptions, footer_text_for_embed
+
+# Highest combat level that still earns XP in each zone; zones not listed have no cap
+ZONE_MAX_LEVELS = {
+    1: 20,
+    2: 40,
+    3: 60,
+    4: 80,
+}
+
+# BattleSession.state, in the order a fight moves through them; a fight ends in exactly one of the last three
+SETUP, FIGHTING, WON, FLED, DIED = "setup", "fighting", "won", "fled", "died"
+
+
+def update_special_attack_buttons(context):
+    if context.special_attack_options_view:
+        context.special_attack_options_view.update_button_states()
+
+
+class BattleSession:
+    """One fight against one monster, from setup to resolution, for every place a fight can start.
+
+    begin() claims the player by marking them as in battle and persisting that; callers run it before their first
+    await, so a second fight, an ambush or /autobattle arriving in the meantime sees the flag and is turned away.
+    run() then puts up the battle embed and its views, lets the monster tick until someone wins or the player
+    flees, applies the outcome (XP and loot view, or death) and persists the player a second and last time, inside
+    player_session like every other save made while the fight runs.
+
+    ctx sends the battle views; interaction receives the level-up messages and the loot or resurrect view.
+    """
+
+    def __init__(self, ctx, interaction, user, player, player_data, monster, guild_id, author_id,
+                 battle_embed=None, add_repeat_button=True):
+        self.ctx = ctx
+        self.interaction = interaction
+        self.user = user
+        self.player = player
+        self.player_data = player_data
+        self.monster = monster
+        self.guild_id = guild_id
+        self.author_id = str(author_id)
+        self.battle_embed = battle_embed
+        self.add_repeat_button = add_repeat_button
+        self.state = SETUP
+        self.context = None
+        self.begun = False
+
+    def begin(self):
+        """Mark the player as in battle and persist it; False if another fight already has them. Never awaits."""
+        if self.player_data["location"] == "battle":
+            return False
+        self.player_data["location"] = "battle"
+        save_player_data(self.guild_id, self.author_id, self.player_data)
+        self.begun = True
+        return True
+
+    async def run(self):
+        """Fight to the end and return the final state, or None if the player was already in another fight."""
+        if not self.begun and not self.begin():
+            return None
+
+        await self.setup()
+        self.state = FIGHTING
+        battle_result = await monster_battle(self.context, self.guild_id)
+
+        if battle_result is None:
+            self.state = FLED
+        else:
+            battle_outcome, loot_messages = battle_result
+            if battle_outcome[0]:
+                self.state = WON
+                await self.resolve_victory(battle_outcome, loot_messages)
+            else:
+                self.state = DIED
+                await self.resolve_death()
+
+        # Clear the battle flag along with everything the fight changed
+        self.player_data["location"] = None
+        await self.persist()
+        return self.state
+
+    async def persist(self):
+        # In the player's session, so a potion or a gathering click saving at the same moment goes before or after it
+        async with player_session(self.guild_id, self.author_id, player=self.player) as session:
+            if session.player_data is not None and session.player_data is not self.player_data:
+                # The store reloaded the player during the fight, so carry what the fight changed over to that record
+                for field in ("location", "monster_kills", "inventory"):
+                    session.player_data[field] = self.player_data[field]
+
+    async def setup(self):
+        # Repeat battles reuse the monster, so it starts again at full health
+        self.monster.health = self.monster.max_health
+
+        if self.battle_embed is None:
+            self.battle_embed = await send_message(
+                self.interaction.channel,
+                create_battle_embed(self.user, self.player, self.monster, footer_text_for_embed(self.ctx, self.monster, self.player))
+            )
+
+        self.context = BattleContext(self.ctx, self.user, self.player, self.monster, self.battle_embed,
+                                     self.player.stats.zone_level, update_special_attack_buttons)
+
+        # The special attack view goes into the context before its message exists, so ticks can update it right away
+        special_attack_options_view = SpecialAttackOptions(self.context, None, None)
+        self.context.special_attack_options_view = special_attack_options_view
+        self.context.special_attack_message = await self.ctx.send(view=special_attack_options_view)
+        self.context.battle_options_msg = await self.ctx.send(
+            view=BattleOptions(self.ctx, self.player, self.player_data, self.context, special_attack_options_view))
+
+        special_attack_options_view.battle_options_msg = self.context.battle_options_msg
+        special_attack_options_view.special_attack_message = self.context.special_attack_message
+
+    async def clear_views(self):
+        from renderer import embed_renderer
+
+        embed_renderer.discard(self.context.special_attack_message)
+        await self.context.special_attack_message.delete()
+        await self.context.battle_options_msg.delete()
+
+    def experience_for_kill(self):
+        zone_level = self.player.stats.zone_level
+        # At or above the level cap for the zone, the kill gives no XP
+        if zone_level in ZONE_MAX_LEVELS and self.player.stats.combat_level >= ZONE_MAX_LEVELS[zone_level]:
+            return 0
+        return self.monster.experience_reward
+
+    async def resolve_victory(self, battle_outcome, loot_messages):
+        experience_gained = self.experience_for_kill()
+        loothaven_effect = battle_outcome[5]
+
+        messages = await self.player.gain_experience(experience_gained, 'combat', self.interaction, self.player)
+        for msg_embed in messages or []:
+            await self.interaction.followup.send(embed=msg_embed, ephemeral=False)
+
+        self.player.stats.damage_taken = 0
+        if self.player.stats.health <= 0:
+            self.player.stats.health = self.player.stats.max_health
+        self.player_data["monster_kills"][self.monster.name] += 1
+
+        await self.clear_views()
+
+        loot_view = LootOptions(self.interaction, self.player, self.monster, self.battle_embed, self.player_data,
+                                self.author_id, battle_outcome, loot_messages, self.guild_id, self.interaction,
+                                experience_gained, loothaven_effect, self.context.rusty_spork_dropped,
+                                add_repeat_button=self.add_repeat_button)
+
+        max_cap_message = ""
+        if experience_gained == 0:
+            max_cap_message = f"\n**(Max XP cap reached for Zone {self.player.stats.zone_level})**"
+
+        battle_outcome_embed = create_battle_embed(self.user, self.player, self.monster,
+                                                   footer_text_for_embed(self.ctx, self.monster, self.player),
+                                                   f"You have **DEFEATED** the {self.monster.name}!\n\n"
+                                                   f"You dealt **{battle_outcome[1]} damage** to the monster and took **{battle_outcome[2]} damage**. "
+                                                   f"You gained {experience_gained} combat XP. {max_cap_message}\n"
+                                                   f"\n")
+        await self.battle_embed.edit(embed=battle_outcome_embed, view=loot_view)
+
+    async def resolve_death(self):
+        from stats import ResurrectOptions
+
+        self.player.stats.health = 0
+
+        new_embed = create_battle_embed(self.user, self.player, self.monster, footer_text="", messages=
+                                        f"☠️ You have been **DEFEATED** by the **{self.monster.name}**!\n"
+                                        f"{get_emoji('rip_emoji')} *Your spirit lingers, seeking renewal.* {get_emoji('rip_emoji')}\n\n"
+                                        f"__**Options for Revival:**__\n"
+                                        f"1. Use {get_emoji('Materium')} to revive without penalty.\n"
+                                        f"2. Resurrect with 2.5% penalty to all skills."
+                                        f"**Lose all items in inventory** (Keep equipped items, coppers, MTRM, potions, and charms)")
+
+        await self.clear_views()
+
+        new_embed.set_image(url=generate_urls("cemetery", "dead"))
+        await self.battle_embed.edit(embed=new_embed, view=ResurrectOptions(self.interaction, self.player_data, self.author_id))
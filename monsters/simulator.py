@@ -0,0 +1,230 @@
+# simulator.py
+import json
+import argparse
+import numpy as np
+from gamedata import game_data
+from probabilities import default_settings
+from storage.settings import ServerSettings
+from exemplars.stat_tables import BASE_STATS, combat_stats
+from monsters import engine
+
+# Fight outcomes, as stored per fight
+ACTIVE, WON, DIED, FLED = 0, 1, 2, 3
+OUTCOMES = {WON: "won", DIED: "died", FLED: "fled", ACTIVE: "timeout"}
+
+
+def _events(monster_interval, swing_interval, max_duration):
+    # The two fixed timers merged in the order engine.resolve_fight sees them: (time, is_monster_turn)
+    monster_next, player_next = 0.0, swing_interval
+    while min(monster_next, player_next) <= max_duration:
+        if monster_next <= player_next:
+            yield monster_next, True
+            monster_next += monster_interval
+        else:
+            yield player_next, False
+            player_next += swing_interval
+
+
+def _drink(needs, stat, maximum, names, potions, stacks, used):
+    # Cheapest potion first, like engine.resolve_fight; returns the restored stat
+    for name in names:
+        if name not in stacks:
+            continue
+        drinking = needs & (stacks[name] > 0)
+        stacks[name] -= drinking
+        used[name] += drinking
+        stat = np.where(drinking, np.minimum(stat + potions[name][0], maximum), stat)
+        needs = needs & ~drinking
+    return stat
+
+
+def simulate(fighter, monster, settings, fights=100000, rules=engine.PotionRules(), swing_interval=1.0,
+             max_duration=600, seed=None):
+    """Run `fights` independent copies of engine.resolve_fight at once, one NumPy step per timer event.
+
+    Returns per-fight arrays: outcome (ACTIVE means it hit max_duration), duration, damage_taken,
+    swings and potions_used by potion name.
+    """
+    rng = np.random.default_rng(seed)
+    mightstone = fighter.charm == "Mightstone"
+    ironhide = fighter.charm == "Ironhide"
+
+    health = np.full(fights, fighter.health, dtype=np.int64)
+    stamina = np.full(fights, fighter.stamina, dtype=np.int64)
+    monster_health = np.full(fights, monster.health, dtype=np.int64)
+    damage_taken = np.zeros(fights, dtype=np.int64)
+    swings = np.zeros(fights, dtype=np.int64)
+    duration = np.zeros(fights)
+    outcome = np.full(fights, ACTIVE, dtype=np.int8)
+    stacks = {name: np.full(fights, stack, dtype=np.int64) for name, (_, stack) in fighter.potions.items()}
+    potions_used = {name: np.zeros(fights, dtype=np.int64) for name in stacks}
+
+    # Everything that does not change during a fight, worked out once
+    monster_hit = engine.hit_probability(monster.attack, fighter.defense, settings, ironhide)
+    monster_low, monster_high = engine.damage_range(monster.attack, fighter.defense + fighter.armor)
+    monster_crit = engine.critical_multiplier(settings)
+    player_crit_chance = engine.critical_hit_chance(settings, mightstone)
+    player_crit = engine.critical_multiplier(settings, mightstone)
+    damage_reduction = 1 if fighter.armed else settings.unarmed_damaged_reduction
+    # Indexed by attack level; level 0 means no stamina for any attack
+    levels = range(1, fighter.special_attack + 1)
+    level_cost = np.array([0] + [engine.ATTACK_STAMINA_COSTS[level] for level in levels])
+    level_hit = np.array([0.0] + [engine.hit_probability(fighter.attack * level, monster.defense, settings) for level in levels])
+    level_range = np.array([(0.0, 0.0)] + [engine.damage_range((fighter.attack + fighter.damage) * level, monster.defense) for level in levels])
+
+    for now, is_monster_turn in _events(engine.attack_speed_modifier(monster.attack), swing_interval, max_duration):
+        active = outcome == ACTIVE
+        if not active.any():
+            break
+        duration[active] = now
+
+        if is_monster_turn:
+            is_critical_hit = rng.random(fights) < settings.critical_hit_chance
+            hits = active & (rng.random(fights) < monster_hit)
+            damage_dealt = np.rint(rng.uniform(monster_low, monster_high, fights))
+            damage_dealt = np.where(is_critical_hit, np.rint(damage_dealt * monster_crit), damage_dealt).astype(np.int64) * hits
+            damage_taken += damage_dealt
+            health = np.maximum(health - damage_dealt, 0)
+            outcome[active & (health == 0)] = DIED
+            continue
+
+        health = _drink(active & (health < fighter.max_health * rules.health_below), health, fighter.max_health,
+                        engine.HEALTH_POTIONS, fighter.potions, stacks, potions_used)
+        stamina = _drink(active & (stamina < rules.stamina_below), stamina, fighter.max_stamina,
+                         engine.STAMINA_POTIONS, fighter.potions, stacks, potions_used)
+
+        # Strongest affordable attack per fight; costs rise with the level, so the last match wins
+        attack_level = np.zeros(fights, dtype=np.int64)
+        for level in levels:
+            attack_level[stamina >= level_cost[level]] = level
+
+        # Out of stamina and potions: try to run instead
+        exhausted = active & (attack_level == 0)
+        if exhausted.any():
+            base_run_chance = settings.base_run_chance
+            half_health = monster.health * 0.5
+            run_chance = np.where(
+                monster_health > half_health, base_run_chance,
+                base_run_chance + (0.5 - base_run_chance) * ((half_health - monster_health) / half_health)
+            ) * (2 if ironhide else 1) * 0.5
+            outcome[exhausted & (rng.random(fights) < np.minimum(run_chance, 1.0))] = FLED
+
+        attacking = active & (attack_level > 0)
+        stamina = np.where(attacking, np.maximum(stamina - level_cost[attack_level], 0), stamina)
+        swings += attacking
+        is_critical_hit = rng.random(fights) < player_crit_chance
+        hits = attacking & (rng.random(fights) < level_hit[attack_level])
+        low, high = level_range[attack_level, 0], level_range[attack_level, 1]
+        damage_dealt = np.rint(low + (high - low) * rng.random(fights))
+        damage_dealt = np.where(is_critical_hit, np.rint(damage_dealt * player_crit), damage_dealt)
+        damage_dealt = np.ceil(damage_dealt * damage_reduction).astype(np.int64) * hits
+        monster_health = np.maximum(monster_health - damage_dealt, 0)
+        outcome[attacking & (monster_health == 0)] = WON
+
+    return {
+        "outcome": outcome,
+        "duration": duration,
+        "damage_taken": damage_taken,
+        "swings": swings,
+        "potions_used": potions_used,
+    }
+
+
+def expected_loot(monster, zone_level, settings, charm=None):
+    """Expected count of everything generate_zone_loot hands out for one kill."""
+    loothaven = settings.loothaven_percent if charm == "Loothaven" else 0
+
+    def doubled(chance):
+        # Loothaven doubles both the chance and the count
+        return (1 - loothaven) * min(chance, 1) + loothaven * min(chance * 2, 1) * 2
+
+    multiplier = game_data().coppers_multiplier(monster.name)
+    low, high = int(zone_level * 2 * multiplier), int(zone_level * 5 * multiplier)
+    loot = {
+        "Coppers": (low + high) / 2 * (1 + loothaven),
+        "Herbs": doubled(settings.herb_drop_percent),
+        "Materium": doubled(settings.mtrm_drop_percent * zone_level),
+        "Potions": doubled(settings.potion_drop_percent * zone_level),
+        "Rusty Spork": settings.spork_chance,
+    }
+    for name, quantity in monster.drops:
+        loot[name] = loot.get(name, 0) + quantity * (1 + loothaven)
+    return loot
+
+
+def summarize(results, monster, zone_level, settings, charm=None):
+    outcome = results["outcome"]
+    fights = outcome.size
+    won = outcome == WON
+    summary = {f"{label}_rate": float(np.mean(outcome == code)) for code, label in OUTCOMES.items()}
+    kill_times = results["duration"][won]
+    summary["time_to_kill"] = float(kill_times.mean()) if kill_times.size else None
+    summary["time_to_kill_p90"] = float(np.percentile(kill_times, 90)) if kill_times.size else None
+    summary["damage_taken"] = float(results["damage_taken"].mean())
+    summary["swings"] = float(results["swings"].mean())
+    summary["potions_used"] = {name: float(used.sum() / fights) for name, used in results["potions_used"].items()}
+    # Per fight started, so losses count against it
+    summary["experience"] = monster.experience_reward * summary["won_rate"]
+    summary["loot"] = {name: count * summary["won_rate"] for name, count in expected_loot(monster, zone_level, settings, charm).items()}
+    return summary
+
+
+def build_fighter(exemplar, combat_level, weapon_damage, special_attack, armor, charm, potions):
+    max_health, strength, stamina, attack, defense = combat_stats(exemplar, combat_level)
+    return engine.Fighter(attack, weapon_damage, defense, armor, max_health, max_health, stamina, stamina,
+                          min(4, special_attack) if special_attack else 1, special_attack > 0, charm, potions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo exemplar-vs-monster fights with the live battle rules.")
+    parser.add_argument("--monster", action="append", choices=game_data().monster_names,
+                        help="Monster to fight; repeat for several (default: every monster)")
+    parser.add_argument("--zone", type=int, action="append", help="Zone level; repeat for several (default: 1)")
+    parser.add_argument("--exemplar", default="human", choices=sorted(BASE_STATS))
+    parser.add_argument("--level", type=int, default=1, help="Combat level")
+    parser.add_argument("--weapon-damage", type=int, default=0, help="Equipped weapon damage, specialty bonus included")
+    parser.add_argument("--special-attack", type=int, default=0, help="Weapon special attack level, 0 for unarmed")
+    parser.add_argument("--armor", type=int, default=0, help="Total armor from equipped armor and shield")
+    parser.add_argument("--charm", choices=["Woodcleaver", "Stonebreaker", "Loothaven", "Mightstone", "Ironhide"])
+    parser.add_argument("--potion", action="append", default=[], metavar="NAME=COUNT", help="Potions carried, e.g. 'Health Potion=5'")
+    parser.add_argument("--settings", help="server_settings.json to use instead of probabilities.default_settings")
+    parser.add_argument("--fights", type=int, default=100000)
+    parser.add_argument("--swing-interval", type=float, default=1.0, help="Seconds between player attacks")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--json", action="store_true", help="Print the full results as JSON")
+    args = parser.parse_args()
+
+    if args.settings:
+        with open(args.settings, "r") as f:
+            settings = ServerSettings(json.load(f), None)
+    else:
+        settings = ServerSettings(default_settings, None)
+
+    data = game_data()
+    potions = {}
+    for entry in args.potion:
+        name, _, count = entry.partition("=")
+        potions[name] = (data.potions_by_name[name].effect_value, int(count or 1))
+    fighter = build_fighter(args.exemplar, args.level, args.weapon_damage, args.special_attack, args.armor, args.charm, potions)
+
+    report = []
+    for zone_level in args.zone or [1]:
+        for name in args.monster or data.monster_names:
+            monster = data.monster_stats(name, zone_level)
+            results = simulate(fighter, monster, settings, args.fights, swing_interval=args.swing_interval, seed=args.seed)
+            report.append({"monster": name, "zone": zone_level, **summarize(results, monster, zone_level, settings, args.charm)})
+
+    if args.json:
+        print(json.dumps(report, indent=4))
+        return
+    print(f"{'monster':<15}{'zone':>5}{'won':>8}{'died':>8}{'fled':>8}{'ttk':>8}{'ttk p90':>9}{'dmg taken':>11}{'potions':>9}{'xp':>8}{'coppers':>9}")
+    for row in report:
+        ttk = f"{row['time_to_kill']:.1f}" if row['time_to_kill'] is not None else "-"
+        ttk_p90 = f"{row['time_to_kill_p90']:.1f}" if row['time_to_kill_p90'] is not None else "-"
+        print(f"{row['monster']:<15}{row['zone']:>5}{row['won_rate']:>8.1%}{row['died_rate']:>8.1%}{row['fled_rate']:>8.1%}"
+              f"{ttk:>8}{ttk_p90:>9}{row['damage_taken']:>11.1f}{sum(row['potions_used'].values()):>9.2f}"
+              f"{row['experience']:>8.1f}{row['loot']['Coppers']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
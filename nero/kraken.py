@@ -2,7 +2,7 @@ import discord
 from utils import save_player_data, load_player_data, send_message, CommonResponses, refresh_player_from_data
 from exemplars.exemplars import Exemplar
 from images.urls import generate_urls
-from emojis import get_emoji
+from emojis import get_emoji, get_partial_emoji
 import asyncio
 from discord.ext import commands
 from random import choice, randint
@@ -484,7 +484,7 @@ class SteeringView(discord.ui.View):
 
         # Adjust the SteerButton initialization with new parameters
         self.add_item(SteerButton(label="⬅️", author_id=self.author_id, battle_commands=self.battle_commands, direction_change=left_direction_change, ctx=self.ctx, player_data=self.player_data))
-        self.add_item(MiddleSteerButton(emoji=get_emoji('helm'), author_id=self.author_id))
+        self.add_item(MiddleSteerButton(emoji=get_partial_emoji('helm'), author_id=self.author_id))
         self.add_item(SteerButton(label="➡️", author_id=self.author_id, battle_commands=self.battle_commands, direction_change=right_direction_change, ctx=self.ctx, player_data=self.player_data))
 
 class AimingView(discord.ui.View):
@@ -498,7 +498,7 @@ class AimingView(discord.ui.View):
         self.kraken = kraken
         self.add_item(AimButton(label="⬇️", author_id=self.author_id, battle_commands=battle_commands, angle_change=-2.5,
                       ctx=self.ctx, player_data=player_data))
-        self.add_item(FireButton(emoji=get_emoji('Cannonball'), author_id=self.author_id, kraken=self.kraken, battle_commands=battle_commands,
+        self.add_item(FireButton(emoji=get_partial_emoji('Cannonball'), author_id=self.author_id, kraken=self.kraken, battle_commands=battle_commands,
                        player=self.player, player_data=player_data, ctx=self.ctx))
         self.add_item(AimButton(label="⬆️", author_id=self.author_id, battle_commands=battle_commands, angle_change=2.5,
                                 ctx=self.ctx, player_data=player_data))
@@ -2,9 +2,10 @@ import discord
 import random
 import asyncio
 from utils import save_player_data, CommonResponses, refresh_player_from_data, get_server_setting
-from emojis import get_emoji
+from emojis import get_emoji, get_partial_emoji
 from images.urls import generate_urls
 from monsters.monster import calculate_hit_probability, calculate_damage
+from scheduler import tick_scheduler
 
 class RepairView(discord.ui.View):
 
@@ -115,7 +116,7 @@ class PartButton(discord.ui.Button, CommonResponses):
 class RepairButton(discord.ui.Button, CommonResponses):
     def __init__(self, custom_view, row, user):
         poplar_count = custom_view.player_data['shipwreck'].get('Poplar Strip', 0)
-        super().__init__(style=discord.ButtonStyle.primary, label=f"{poplar_count}", emoji=get_emoji('Poplar Strip'), disabled=True, row=row)
+        super().__init__(style=discord.ButtonStyle.primary, label=f"{poplar_count}", emoji=get_partial_emoji('Poplar Strip'), disabled=True, row=row)
         self.custom_view = custom_view
         self.user = user
 
@@ -228,7 +229,7 @@ class RepairButton(discord.ui.Button, CommonResponses):
 
 class SwordButton(discord.ui.Button, CommonResponses):
     def __init__(self, custom_view, row, user):
-        super().__init__(style=discord.ButtonStyle.secondary, emoji=get_emoji('Voltaic Sword'), row=row)
+        super().__init__(style=discord.ButtonStyle.secondary, emoji=get_partial_emoji('Voltaic Sword'), row=row)
         self.custom_view = custom_view
         self.user = user
 
@@ -304,6 +305,8 @@ class Phase2:
         self.user = user
         self.battle_ended = False
         self.interaction = interaction
+        # The Kraken's attacks on tick_scheduler, once phase 2 has started
+        self.attack_ticks = None
 
     async def enter_phase_2(self):
         # Remove the views from Phase 1
@@ -332,29 +335,32 @@ class Phase2:
         self.custom_view = RepairView(self, self.player_data, self.guild_id, self.user)
         await self.battle_commands.battle_message.edit(view=self.custom_view)
 
-        # Start the Kraken attack loop
-        asyncio.create_task(self.kraken_attack_loop())
+        # Start the Kraken attacks, each after a random delay
+        self.attack_ticks = tick_scheduler.schedule(random.randint(3, 6), self.kraken_attack_tick, name=f"Kraken vs {self.user.id}")
 
-    async def kraken_attack_loop(self):
-        while self.battle_commands.kraken.is_alive() and self.battle_commands.ship.is_sailable() and not self.battle_ended:
-            await asyncio.sleep(random.randint(3, 6))  # Random delay before Kraken attacks
+    async def kraken_attack_tick(self):
+        if not self.battle_commands.kraken.is_alive() or not self.battle_commands.ship.is_sailable() or self.battle_ended:
+            return None
 
-            if self.battle_commands.kraken_visible and not self.battle_ended:
-                part, damage = self.battle_commands.kraken.tentacle_slam(self.battle_commands.ship)
-                attack_message = f"The Kraken attacks the **{part}**, dealing **{damage} damage**!"
-                self.add_attack_message(attack_message)
+        if self.battle_commands.kraken_visible:
+            part, damage = self.battle_commands.kraken.tentacle_slam(self.battle_commands.ship)
+            attack_message = f"The Kraken attacks the **{part}**, dealing **{damage} damage**!"
+            self.add_attack_message(attack_message)
 
-                self.custom_view.enable_part_button(part)
-                self.custom_view.enable_sword_button()
-                self.custom_view.enable_repair_button()
-
-                # Update the ship's health part and ensure 0 is displayed if it reaches 0
-                if self.battle_commands.ship.get_health(part) <= 0:
-                    await self.battle_commands.battle_message.edit(embed=self.create_phase2_battle_embed())
-                    await self.handle_ship_destruction(part=part)
-                    return
+            self.custom_view.enable_part_button(part)
+            self.custom_view.enable_sword_button()
+            self.custom_view.enable_repair_button()
 
+            # Update the ship's health part and ensure 0 is displayed if it reaches 0
+            if self.battle_commands.ship.get_health(part) <= 0:
                 await self.battle_commands.battle_message.edit(embed=self.create_phase2_battle_embed())
+                await self.handle_ship_destruction(part=part)
+                return None
+
+            await self.battle_commands.battle_message.edit(embed=self.create_phase2_battle_embed())
+
+        # Random delay before the Kraken attacks again
+        return random.randint(3, 6)
 
     def add_attack_message(self, new_message):
         if len(self.attack_messages) >= 5:
@@ -396,6 +402,8 @@ class Phase2:
 
     async def end_battle(self):
         self.battle_ended = True
+        if self.attack_ticks:
+            self.attack_ticks.cancel()
         self.custom_view.disable_all_buttons()
         #await interaction.edit_original_response(view=self.custom_view)  # Update the view to reflect button disable state
         await self.battle_commands.battle_message.edit(view=None)  # Remove the button views
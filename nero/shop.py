@@ -1,5 +1,5 @@
 import discord
-from emojis import get_emoji
+from emojis import get_emoji, get_partial_emoji
 from utils import CommonResponses, save_player_data, load_player_data
 from nero.options import ResetButton
 from images.urls import generate_urls
@@ -67,7 +67,7 @@ class DisplayItemsSelect(discord.ui.Select, CommonResponses):
                 label=f"{item.name} {self.zone_rarity.get(getattr(item, 'zone_level', ''), '')} - {format(item.value, ',')} Coppers",
                 # Conditionally construct value with or without zone_level
                 value=f"{item.name}:{getattr(item, 'zone_level', 'None')}",
-                emoji=get_emoji(item.name)
+                emoji=get_partial_emoji(item.name)
             )
             for item in items
         ]
@@ -1,6 +1,6 @@
 import discord
 from utils import CommonResponses, save_player_data, refresh_player_from_data, get_server_setting
-from emojis import get_emoji
+from emojis import get_emoji, get_partial_emoji
 from images.urls import generate_urls
 from discord.ext import commands
 from discord import Embed, ButtonStyle
@@ -284,7 +284,7 @@ class UnveilParchmentView(discord.ui.View):
         self.unveil_button = discord.ui.Button(
             label="Reveal Secret",
             style=ButtonStyle.blurple,
-            emoji=get_emoji('Materium'),
+            emoji=get_partial_emoji('Materium'),
             custom_id="unveil_parchment",
             disabled=not enough_materium
         )
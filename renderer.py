@@ -0,0 +1,155 @@
+# renderer.py
+import asyncio
+import logging
+import discord
+
+logger = logging.getLogger(__name__)
+
+# Edits of the same message requested within this many seconds go out as one
+FRAME_WINDOW = 0.15
+
+# First wait after a 429, doubled on every further 429 up to the maximum
+RETRY_BACKOFF = 1.0
+MAX_BACKOFF = 16.0
+
+
+class _Frame:
+    """Changes for one message waiting to be sent; later values for the same field replace earlier ones."""
+
+    def __init__(self, edit):
+        self.edit = edit
+        self.changes = {}
+        self.send_now = asyncio.Event()
+        # Set once a rate-limited frame has taken over this one's changes
+        self.absorbed = False
+        self.future = asyncio.get_running_loop().create_future()
+        # Nobody has to await the edit, so make sure an unawaited failure is not reported twice
+        self.future.add_done_callback(lambda done: done.cancelled() or done.exception())
+
+
+class EmbedRenderer:
+    """Coalesces edits of the same message that arrive within one frame into a single edit.
+
+    Only the newest embed and view of a frame are sent, superseded states are dropped. A 429 holds the
+    frame open for a backoff, so whatever is requested in the meantime goes out with the retry. Frames of
+    one message are sent one after another, in the order they closed.
+    """
+
+    def __init__(self, window=FRAME_WINDOW):
+        self.window = window
+        self.frames = {}
+        # The last frame of each message that closed; it only finishes after every frame before it
+        self.in_flight = {}
+        # Edits requested vs. edits actually sent, to see how much coalescing saves
+        self.requested = 0
+        self.sent = 0
+        self.rate_limited = 0
+
+    def edit(self, message, **changes):
+        """Queue changes (embed=, view=, content=) for message; await the result to know it was sent."""
+        return self.render(message.id, message.edit, **changes)
+
+    def render(self, key, edit, **changes):
+        """Like edit, for anything that edits one message through the coroutine function `edit`."""
+        self.requested += 1
+        frame = self.frames.get(key)
+        if frame is None:
+            frame = self.frames[key] = _Frame(edit)
+            asyncio.create_task(self._run(key, frame))
+        frame.edit = edit
+        frame.changes.update(changes)
+        return frame.future
+
+    async def flush(self, message):
+        """Send whatever is waiting for message now and wait until it and every edit before it are done."""
+        frame = self.frames.get(message.id)
+        if frame is not None:
+            frame.send_now.set()
+        waiting = [future for future in (frame and frame.future, self.in_flight.get(message.id)) if future]
+        if waiting:
+            await asyncio.wait(waiting)
+
+    def discard(self, message):
+        # For a message about to be deleted or replaced; its waiting changes are dropped unsent
+        frame = self.frames.pop(message.id, None)
+        if frame is not None and not frame.future.done():
+            frame.future.set_result(None)
+
+    def metrics(self):
+        return {
+            "pending": len(self.frames),
+            "requested": self.requested,
+            "sent": self.sent,
+            "rate_limited": self.rate_limited,
+        }
+
+    async def _run(self, key, frame):
+        try:
+            await asyncio.wait_for(frame.send_now.wait(), self.window)
+        except asyncio.TimeoutError:
+            pass
+
+        # A discarded or absorbed frame has nothing left to send
+        if frame.absorbed or frame.future.done():
+            return
+        # Requests from here on start the next frame, which waits for this one so edits land in order
+        if self.frames.get(key) is frame:
+            del self.frames[key]
+        previous = self.in_flight.get(key)
+        self.in_flight[key] = frame.future
+        try:
+            if previous is not None:
+                await asyncio.wait([previous])
+            await self._send(key, frame)
+        finally:
+            if self.in_flight.get(key) is frame.future:
+                del self.in_flight[key]
+
+    async def _send(self, key, frame):
+        backoff = RETRY_BACKOFF
+        while not frame.future.done():
+            if self.frames.get(key) is frame:
+                del self.frames[key]
+            try:
+                await frame.edit(**frame.changes)
+            except discord.HTTPException as e:
+                if e.status == 429 and backoff <= MAX_BACKOFF:
+                    self.rate_limited += 1
+                    logger.warning(f"Edit of message {key} rate limited, retrying in {backoff:.0f}s")
+                    self._reopen(key, frame)
+                    await asyncio.sleep(backoff)
+                    backoff *= 2
+                    continue
+                # A message deleted mid-fight is expected, anything else is worth a log line
+                if not isinstance(e, discord.NotFound):
+                    logger.error(f"Edit of message {key} failed: {e}")
+                frame.future.set_exception(e)
+            except Exception as e:
+                logger.error(f"Edit of message {key} failed: {e}")
+                frame.future.set_exception(e)
+            else:
+                self.sent += 1
+                frame.future.set_result(None)
+            return
+
+    def _reopen(self, key, frame):
+        # Put a rate-limited frame back so newer changes join its retry; a newer frame that is already
+        # waiting hands over its changes (they win) and is settled along with this one
+        newer = self.frames.get(key)
+        if newer is not None and newer is not frame:
+            frame.changes.update(newer.changes)
+            newer.absorbed = True
+            frame.future.add_done_callback(lambda done: _settle(newer.future, done))
+        self.frames[key] = frame
+
+
+def _settle(future, done):
+    if future.done():
+        return
+    if done.exception() is not None:
+        future.set_exception(done.exception())
+    else:
+        future.set_result(None)
+
+
+embed_renderer = EmbedRenderer()
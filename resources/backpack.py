@@ -8,7 +8,7 @@ from images.urls import generate_urls
 from citadel.crafting import Armor
 import io
 from resources.backpackimage import generate_backpack_image
-from emojis import get_emoji
+from emojis import get_partial_emoji
 
 ZONE_LEVEL_TO_RARITY = {
             1: "Common",
@@ -336,7 +336,7 @@ class UnequipTypeSelect(discord.ui.Select, CommonResponses):
                 option = discord.SelectOption(
                     label=armor.name,
                     value=armor_type,
-                    emoji=get_emoji(ZONE_LEVEL_TO_EMOJI[armor.zone_level])
+                    emoji=get_partial_emoji(ZONE_LEVEL_TO_EMOJI[armor.zone_level])
                 )
                 self.options.append(option)
 
@@ -482,7 +482,7 @@ class EquipTypeSelect(discord.ui.Select, CommonResponses):
                 discord.SelectOption(
                     label=self.get_item_label(item, player),  # Change here for Charm
                     value=f"{item.name}",
-                    emoji=get_emoji(item.name)
+                    emoji=get_partial_emoji(item.name)
                 )
                 for item in items
             ]
@@ -491,7 +491,7 @@ class EquipTypeSelect(discord.ui.Select, CommonResponses):
                 discord.SelectOption(
                     label=self.get_item_label(item, player),  # Change here for other types
                     value=f"{item.name} ({ZONE_LEVEL_TO_RARITY[item.zone_level]})",
-                    emoji=get_emoji(ZONE_LEVEL_TO_EMOJI[item.zone_level])
+                    emoji=get_partial_emoji(ZONE_LEVEL_TO_EMOJI[item.zone_level])
                 )
                 for item in items
             ]
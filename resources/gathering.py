@@ -0,0 +1,101 @@
+# gathering.py
+import math
+from collections import namedtuple
+import numpy as np
+from resources.materium import Materium
+from emojis import get_emoji
+from gamedata import game_data
+from exemplars.level_curve import LEVEL_CURVE
+from monsters.session import ZONE_MAX_LEVELS
+
+# Most attempts one /mine or /chop resolves at once
+MAX_GATHERING_BATCH = 50
+
+# herbs holds a count per entry of game_data().herbs
+GatheringBatch = namedtuple("GatheringBatch", ("attempts", "successes", "herbs", "materium", "ambushed"))
+
+
+def herb_drop_weights(zone_level):
+    # Base weights, in game_data().herbs order
+    weights = [40, 40, 10, 10]
+
+    # Increase the weights of the last two herbs based on zone_level
+    increase_per_zone = 5
+    weights[2] += (zone_level - 1) * increase_per_zone
+    weights[3] += (zone_level - 1) * increase_per_zone
+
+    # Decrease the weights of the first two herbs to maintain total weight
+    total_increase = (zone_level - 1) * 2 * increase_per_zone
+    weights[0] -= total_increase // 2
+    weights[1] -= total_increase // 2
+    return weights
+
+
+def mtrm_drop_rate(zone_level, settings):
+    # Adjust the drop rate based on zone level and cap at 1
+    return min(settings.mtrm_drop_percent * zone_level, 1)
+
+
+def roll_gathering_batch(count, stamina, success_probability, zone_level, settings, rng=None):
+    """Resolve up to `count` gathering attempts with the same odds as that many button clicks.
+
+    Only successes cost stamina, so the batch ends at the success that spends the last point, or at the
+    first ambush, whichever comes first. Drops are drawn for all successes at once.
+    """
+    rng = rng or np.random.default_rng()
+
+    hits = rng.random(count) < success_probability
+    exhausted = np.flatnonzero(np.cumsum(hits) >= stamina)
+    attempts = int(exhausted[0]) + 1 if exhausted.size else count
+
+    # Every attempt rolls for an ambush, and only the first one matters
+    attack_percent = min(settings.attack_percent, 1)
+    first_ambush = int(rng.geometric(attack_percent)) if attack_percent > 0 else count + 1
+    ambushed = first_ambush <= attempts
+    if ambushed:
+        attempts = first_ambush
+
+    successes = int(hits[:attempts].sum())
+    weights = np.array(herb_drop_weights(zone_level), dtype=float)
+    herbs = rng.multinomial(rng.binomial(successes, min(settings.herb_drop_percent, 1)), weights / weights.sum())
+    materium = int(rng.binomial(successes, mtrm_drop_rate(zone_level, settings)))
+    return GatheringBatch(attempts, successes, tuple(int(n) for n in herbs), materium, ambushed)
+
+
+def rewarded_successes(successes, skill_level, skill_experience, experience_per_success, zone_level):
+    # Successes that still earn XP; the one that reaches the zone's level cap is the last
+    level_cap = ZONE_MAX_LEVELS.get(zone_level)
+    if level_cap is None:
+        return successes
+    if skill_level >= level_cap:
+        return 0
+    experience_to_cap = LEVEL_CURVE.level_start_xp(level_cap) - skill_experience
+    return min(successes, max(math.ceil(experience_to_cap / experience_per_success), 0))
+
+
+async def apply_gathering_batch(player, batch, item, skill, experience_per_success, interaction):
+    """Add a batch's gains to the player; returns (experience gained, level-up embeds, summary text)."""
+    data = game_data()
+    if batch.successes:
+        player.inventory.add_item_to_inventory(item, amount=batch.successes)
+    player.stats.stamina -= batch.successes
+
+    found = []
+    for herb, quantity in zip(data.herbs, batch.herbs):
+        if quantity:
+            player.inventory.add_item_to_inventory(herb, amount=quantity)
+            found.append(f"{get_emoji(herb.name)} **{quantity} {herb.name}**")
+    if batch.materium:
+        player.inventory.add_item_to_inventory(Materium(), amount=batch.materium)
+        found.append(f"{get_emoji('Materium')} **{batch.materium} Materium**")
+
+    rewarded = rewarded_successes(batch.successes, getattr(player.stats, f"{skill}_level"),
+                                  getattr(player.stats, f"{skill}_experience"), experience_per_success,
+                                  player.stats.zone_level)
+    experience_gained = rewarded * experience_per_success
+    messages = await player.gain_experience(experience_gained, skill, interaction) if experience_gained else None
+
+    summary = f"**{batch.successes} {item.name}** from {batch.attempts} attempts, **+{experience_gained:,} XP**"
+    if found:
+        summary += "\nYou also found " + ", ".join(found) + "!"
+    return experience_gained, messages or [], summary
@@ -21,11 +21,3 @@ class Herb:
         )
         herb.stack = data["stack"]
         return herb
-
-HERB_TYPES = [
-    Herb("Ranarr", 25), # for Stamina Potion
-    Herb("Spirit Weed", 25), # for Health Potion
-    Herb("Snapdragon", 350), # for Super Stamina Potion
-    Herb("Bloodweed", 350), # for Super Health Potion
-]
-
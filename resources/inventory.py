@@ -1,3 +1,4 @@
+import copy
 from resources.materium import Materium
 from resources.herb import Herb
 from resources.potion import Potion
@@ -145,6 +146,8 @@ class Inventory:
             existing_item.stack += amount
         else:
             if len(item_list) < self.limit:
+                # Store a copy so shared templates (herb types, recipe results, loot) never alias between inventories
+                item = copy.copy(item)
                 item.stack = amount
                 item_list.append(item)
             else:
@@ -1,10 +1,9 @@
 import random
-from resources.herb import HERB_TYPES
-from resources.potion import POTION_LIST
 from resources.materium import Materium
 from resources.item import Item
 from emojis import get_emoji
-from utils import get_server_setting
+from utils import server_settings
+from gamedata import game_data
 
 class Loot:
     def __init__(self, name, rarity, value):
@@ -31,74 +30,23 @@ class Loot:
         loot.stack = data["stack"]
         return loot
 
-loot_definitions = {
-    'Rabbit Body': {
-        'description': 'A furry rabbit body, warm to the touch. Can be used for citadel soft armors.',
-        'value': 10
-    },
-    'Deer Parts': {
-        'description': 'Various parts of a deer. Some are useful for making tools and weapons.',
-        'value': 20
-    },
-    'Deer Skin': {
-        'description': 'Tough deer skin. Can be used for citadel sturdy armors.',
-        'value': 30
-    },
-    'Wolf Skin': {
-        'description': 'A skin of a wild wolf. Known for its durability and strength.',
-        'value': 50
-    },
-    'Onyx': {
-        'description': 'A precious black gemstone. Used in citadel magical items and potent elixirs.',
-        'value': 100
-    },
-    'Glowing Essence': {
-        'description': 'An ethereal essence that glows faintly. Used in powerful magical rituals and citadel.',
-        'value': 200
-    },
-    'Goblin Crown': {
-        'description': 'A powerful relic obtained from the Goblin Mother. Used to create powerful Charms.',
-        'value': 5000
-    }
-}
-
-item_emoji_mapping = {
-    'Onyx': 'onyx_emoji',
-    'Deer Skin': 'deer_skin_emoji',
-    'Deer Parts': 'deer_part_emoji',
-    'Rabbit Body': 'rabbit_body_emoji',
-    'Glowing Essence': 'glowing_essence_emoji',
-    'Wolf Skin': 'wolf_skin_emoji',
-    'Goblin Crown': 'goblin_crown_emoji'
-}
-
-monster_difficulty_multiplier = {
-    'Rabbit': 0.5,
-    'Deer': 1,
-    'Buck': 1.5,
-    'Wolf': 2,
-    'Goblin': 5,
-    'Goblin Hunter': 10,
-    'Mega Brute': 20,
-    'Wisp': 20,
-    'Mother': 30
-}
-
 def generate_zone_loot(player, zone_level, guild_id, monster_drop=None, name=None):
     loot_messages = []
     loot = []
     rusty_spork_dropped = False
+    settings = server_settings(guild_id)
+    data = game_data()
 
     # Check if the player has the Loothaven charm equipped
-    loothaven_effect = (player.inventory.equipped_charm and player.inventory.equipped_charm.name == "Loothaven") and random.random() < get_server_setting(guild_id, 'loothaven_percent')
+    loothaven_effect = (player.inventory.equipped_charm and player.inventory.equipped_charm.name == "Loothaven") and random.random() < settings.loothaven_percent
 
     # Doubling the drop rates if Loothaven charm is active
-    herb_drop_chance = get_server_setting(guild_id, 'herb_drop_percent') * (2 if loothaven_effect else 1)
-    materium_drop_chance = get_server_setting(guild_id, 'mtrm_drop_percent') * zone_level * (2 if loothaven_effect else 1)
-    potion_drop_chance = get_server_setting(guild_id, 'potion_drop_percent') * zone_level * (2 if loothaven_effect else 1)
+    herb_drop_chance = settings.herb_drop_percent * (2 if loothaven_effect else 1)
+    materium_drop_chance = settings.mtrm_drop_percent * zone_level * (2 if loothaven_effect else 1)
+    potion_drop_chance = settings.potion_drop_percent * zone_level * (2 if loothaven_effect else 1)
 
     # Coppers drop
-    monster_multiplier = monster_difficulty_multiplier.get(name, 1)  # Get the multiplier for the monster or default to 1
+    monster_multiplier = data.coppers_multiplier(name)  # Get the multiplier for the monster or default to 1
     coppers_dropped = random.randint(int(zone_level * 2 * monster_multiplier), int(zone_level * 5 * monster_multiplier))
     if loothaven_effect:
         coppers_dropped *= 2  # Double the coppers if Loothaven effect is active
@@ -121,7 +69,7 @@ def generate_zone_loot(player, zone_level, guild_id, monster_drop=None, name=Non
         herb_weights[0] -= total_increase // 2
         herb_weights[1] -= total_increase // 2
 
-        herb_dropped = random.choices(HERB_TYPES, weights=herb_weights, k=1)[0]
+        herb_dropped = random.choices(data.herbs, weights=herb_weights, k=1)[0]
         herb_count = 2 if loothaven_effect else 1
         for _ in range(herb_count):
             loot.append(('herb', herb_dropped))
@@ -138,7 +86,7 @@ def generate_zone_loot(player, zone_level, guild_id, monster_drop=None, name=Non
     # Potion drops
     if random.random() < potion_drop_chance:
         # Base weights
-        potion_weights = [40, 40, 10, 10][:len(POTION_LIST)]
+        potion_weights = [40, 40, 10, 10][:len(data.potions)]
 
         # Adjust the weights based on zone level and Loothaven charm effect
         increase_per_zone_potion = (zone_level - 1) * 5 * (2 if loothaven_effect else 1)
@@ -150,7 +98,7 @@ def generate_zone_loot(player, zone_level, guild_id, monster_drop=None, name=Non
         potion_weights[0] -= total_increase_potion // 2
         potion_weights[1] -= total_increase_potion // 2
 
-        potion_dropped = random.choices(POTION_LIST, weights=potion_weights, k=1)[0]
+        potion_dropped = random.choices(data.potions, weights=potion_weights, k=1)[0]
         potion_count = 2 if loothaven_effect else 1
         for _ in range(potion_count):
             loot.append(('potion', potion_dropped))
@@ -160,10 +108,8 @@ def generate_zone_loot(player, zone_level, guild_id, monster_drop=None, name=Non
     if monster_drop:
         for drop, quantity in monster_drop:  # Iterate over each drop item and its quantity
             if isinstance(drop, str):
-                # If the 'drop' is a string, try to find it in the loot_definitions dictionary
-                # If it's not found, instantiate an Item with default parameters
-                item_data = loot_definitions.get(drop, {})
-                item = Item(drop, description=item_data.get('description'), value=item_data.get('value', 10))
+                # Monster drops are loot names; each roll gets its own Item built from the loot definition
+                item = data.new_loot_item(drop)
             elif isinstance(drop, Item):
                 # Use the drop directly if it's already an instance of Item
                 item = drop
@@ -175,28 +121,15 @@ def generate_zone_loot(player, zone_level, guild_id, monster_drop=None, name=Non
 
             loot.append(('items', [(item, final_quantity)]))
 
-            # Custom pluralization rules
-            if final_quantity > 1:
-                if item.name == "Onyx":
-                    item_name_plural = "Onyx"
-                elif item.name == "Rabbit Body":
-                    item_name_plural = "Rabbit Bodies"
-                elif item.name == "Glowing Essence":
-                    item_name_plural = "Glowing Essence"
-                elif item.name == "Deer Parts":
-                    item_name_plural = "Deer Parts"
-                else:
-                    item_name_plural = item.name + "s"
-            else:
-                item_name_plural = item.name
+            item_name_plural = data.loot_plural(item.name, final_quantity)
 
             loot_messages.append(
-                f"{get_emoji(item_emoji_mapping.get(item.name, ''))} You found **{final_quantity} {item_name_plural}**!")
+                f"{get_emoji(data.loot_emoji(item.name))} You found **{final_quantity} {item_name_plural}**!")
 
         # Rusty Spork drop logic
-        if random.random() < get_server_setting(guild_id, 'spork_chance'):
+        if random.random() < settings.spork_chance:
             rusty_spork_dropped = True
-            spork_dropped = Item("Rusty Spork", description="A rusty and useless trinket", value=get_server_setting(guild_id, 'spork_value'))
+            spork_dropped = Item("Rusty Spork", description="A rusty and useless trinket", value=settings.spork_value)
             spork_count = 2 if loothaven_effect else 1
             for _ in range(spork_count):
                 loot.append(('items', [(spork_dropped, 1)]))  # Each drop is 1 item, even if doubled
@@ -207,7 +140,26 @@ def generate_zone_loot(player, zone_level, guild_id, monster_drop=None, name=Non
         return loot, loot_messages, loothaven_effect, rusty_spork_dropped
 
 
-
-
-
-
+def loot_slots_needed(inventory, loot):
+    """Inventory slots the loot from generate_zone_loot would take up; coppers and Materium take none."""
+    new_items = [item for loot_type, loot_items in loot if loot_type in ('herb', 'items', 'gem', 'loot')
+                 for item in (loot_items if isinstance(loot_items, list) else [loot_items])]
+
+    required_slots = 0
+    for item in new_items:
+        # 'items' entries are (Item, quantity) pairs
+        item_name = item[0].name if isinstance(item, tuple) else item.name
+        if not inventory.has_item(item_name):
+            required_slots += 1
+    return required_slots
+
+
+def add_loot_to_inventory(inventory, loot):
+    for loot_type, loot_items in loot:
+        if loot_type == 'coppers':
+            inventory.add_coppers(loot_items)
+        elif loot_type == 'items':  # For items with quantity
+            for item, quantity in loot_items:
+                inventory.add_item_to_inventory(item, amount=quantity)
+        else:
+            inventory.add_item_to_inventory(loot_items)
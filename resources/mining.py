@@ -2,19 +2,19 @@ import random
 from discord import Embed
 import asyncio
 import discord
-import json
 import numpy as np
 from discord.ext import commands
 from discord.commands import Option
-from resources.ore import ORE_TYPES, Ore
-from resources.herb import HERB_TYPES
+from resources.ore import Ore
 from resources.materium import Materium
-from stats import ResurrectOptions
-from utils import load_player_data, save_player_data, send_message, CommonResponses, refresh_player_from_data, get_server_setting
-from monsters.monster import create_battle_embed, monster_battle, generate_monster_by_name, footer_text_for_embed
-from monsters.battle import BattleOptions, LootOptions
+from utils import player_session, CommonResponses, refresh_player_from_data, server_settings, aserver_settings
+from monsters.monster import generate_monster_by_name
+from monsters.session import BattleSession, DIED
 from images.urls import generate_urls
-from emojis import get_emoji
+from exemplars.level_curve import LEVEL_CURVE
+from emojis import get_emoji, get_partial_emoji
+from gamedata import game_data
+from resources.gathering import MAX_GATHERING_BATCH, herb_drop_weights, mtrm_drop_rate, roll_gathering_batch, apply_gathering_batch
 
 
 # Mining experience points for each ore type
@@ -30,9 +30,6 @@ ore_emoji_mapping = {
     "Iron Ore": 'iron_emoji'
 }
 
-with open("level_data.json", "r") as f:
-    LEVEL_DATA = json.load(f)
-
 def generate_random_monster(ore_type):
     monster_chances = {}
     if ore_type == "Iron Ore":
@@ -48,45 +45,28 @@ def generate_random_monster(ore_type):
     return np.random.choice(monsters, p=probabilities)
 
 def attempt_herb_drop(zone_level, guild_id):
-    if random.random() < get_server_setting(guild_id, 'herb_drop_percent'):
-        # Base weights
-        weights = [40, 40, 10, 10]
-
-        # Increase the weights of the last two herbs based on zone_level
-        increase_per_zone = 5
-        weights[2] += (zone_level - 1) * increase_per_zone
-        weights[3] += (zone_level - 1) * increase_per_zone
-
-        # Decrease the weights of the first two herbs to maintain total weight
-        total_increase = (zone_level - 1) * 2 * increase_per_zone
-        weights[0] -= total_increase // 2
-        weights[1] -= total_increase // 2
-
-        herb_dropped = random.choices(HERB_TYPES, weights=weights, k=1)[0]
+    if random.random() < server_settings(guild_id).herb_drop_percent:
+        weights = herb_drop_weights(zone_level)
+        herb_dropped = random.choices(game_data().herbs, weights=weights, k=1)[0]
         return herb_dropped
 
     return None
 
 # Function to handle MTRM drop
 def attempt_mtrm_drop(zone_level, guild_id):
-    base_mtrm_drop_rate = get_server_setting(guild_id, 'mtrm_drop_percent')
-    mtrm_drop_rate = min(base_mtrm_drop_rate * zone_level, 1)  # Adjust the drop rate based on zone level and cap at 1
-
-    if random.random() < mtrm_drop_rate:
+    if random.random() < mtrm_drop_rate(zone_level, server_settings(guild_id)):
         mtrm_dropped = Materium()  # Create a Materium object
         return mtrm_dropped
     return None
 
 def footer_text_for_mining_embed(ctx, player, player_level, zone_level, ore_type):
     guild_id = ctx.guild.id
-    author_id = str(ctx.user.id)
-    player_data = load_player_data(guild_id, author_id)
 
     # Use the provided MiningCog method to calculate the success probability
     probability = MiningCog.calculate_probability(player, player_level, zone_level, ore_type, ctx.guild_id)
     success_percentage = probability * 100  # Convert to percentage for display
 
-    mining_level = player_data["stats"]["mining_level"]
+    mining_level = player.stats.mining_level
 
     # Check if the player has the Stonebreaker charm equipped
     if player.inventory.equipped_charm and player.inventory.equipped_charm.name == "Stonebreaker":
@@ -94,7 +74,7 @@ def footer_text_for_mining_embed(ctx, player, player_level, zone_level, ore_type
         if success_percentage >= 100:
             footer_text = f"⛏️ Mining Level:\u00A0\u00A0{mining_level}\u00A0\u00A0\u00A0\u00A0|\u00A0\u00A0\u00A0\u00A0✅ Success Rate: 100% (Max)"
         else:
-            adjusted_percentage = min(success_percentage + get_server_setting(guild_id, 'stonebreaker_percent') * 100, 100)
+            adjusted_percentage = min(success_percentage + server_settings(guild_id).stonebreaker_percent * 100, 100)
             charm_boost = round(adjusted_percentage - success_percentage)
             footer_text = f"⛏️ Mining Level:\u00A0\u00A0{mining_level}\u00A0\u00A0\u00A0\u00A0|\u00A0\u00A0\u00A0\u00A0✅ Success Rate:\u00A0\u00A0{success_percentage:.1f}% (+{charm_boost}%)"
     else:
@@ -128,9 +108,7 @@ class MineButton(discord.ui.View, CommonResponses):
 
     def create_potion_button(self, potion_name):
         stack_count = self.player.get_potion_stack(potion_name)
-        emoji_str = get_emoji(potion_name)
-        emoji_id = int(emoji_str.split(':')[2].strip('>'))
-        emoji = discord.PartialEmoji(name=potion_name, id=emoji_id)
+        emoji = get_partial_emoji(potion_name)
         button_label = f" {stack_count:,}" if stack_count else ""
         button = discord.ui.Button(
             label=button_label,
@@ -172,20 +150,13 @@ class MineButton(discord.ui.View, CommonResponses):
         # Defer the interaction first
         await interaction.response.defer()
 
-        # Refresh player object from the latest player data
-        self.player, self.player_data = await refresh_player_from_data(interaction)
-
-        # Use the potion and check if it was used successfully
-        potion_used = self.use_potion_logic(self.player, potion_name)
+        # Drunk and saved in the player's session, so a fight or another click saving meanwhile is not overwritten
+        async with player_session(self.guild_id, self.author_id) as session:
+            self.player, self.player_data = session.player, session.player_data
+            potion_used = self.use_potion_logic(self.player, potion_name)
 
         if potion_used:
 
-            # Update player_data with the new stamina value
-            self.player_data["stats"]["stamina"] = self.player.stats.stamina
-
-            # Save any changes to player data
-            save_player_data(self.guild_id, self.author_id, self.player_data)
-
             # Update the button label to show new stack count
             self.update_potion_button_label(button, potion_name)
 
@@ -296,7 +267,7 @@ class MineButton(discord.ui.View, CommonResponses):
             button.disabled = False
             return
 
-        selected_ore = next((ore for ore in ORE_TYPES if ore.name == self.ore_type), None)
+        selected_ore = game_data().ores_by_name.get(self.ore_type)
         if not selected_ore:
             await interaction.followup.send(f"Invalid ore type selected.", ephemeral=True)
             return
@@ -329,34 +300,31 @@ class MineButton(discord.ui.View, CommonResponses):
             ore_emoji = get_emoji(ore_emoji_mapping.get(self.ore_type, "🪨"))
             message = f"{ore_emoji} **Successfully mined 1 {self.ore_type}!**"
 
-            # Update inventory and decrement stamina
-            mined_ore = Ore(name=self.ore_type)
-            self.player.inventory.add_item_to_inventory(mined_ore, amount=1)
-            self.player.stats.stamina -= 1
-
-            # Gain mining experience, passing 0 if the player has reached the cap
-            messages = await self.player.gain_experience(exp_gain, "mining", interaction)
-            # Ensure messages is iterable if it's None
-            messages = messages or []
-
-            # Attempt herb drop
-            herb_dropped = attempt_herb_drop(zone_level, self.guild_id)
-            if herb_dropped:
-                self.player.inventory.add_item_to_inventory(herb_dropped, amount=1)
-                message += f"\n{get_emoji(herb_dropped.name)} You also **found some {herb_dropped.name}!**"
-
-            # Attempt MTRM drop
-            mtrm_dropped = attempt_mtrm_drop(zone_level, self.guild_id)
-            if mtrm_dropped:
-                self.player.inventory.add_item_to_inventory(mtrm_dropped, amount=1)
-                message += f"\n{get_emoji('Materium')} You also **found some Materium!**"
-
-            self.player_data["stats"][
-                "mining_experience"] = self.player.stats.mining_experience
-            self.player_data["stats"]["mining_level"] = self.player.stats.mining_level
-            self.player_data["stats"]["stamina"] = self.player.stats.stamina
-            self.player_data["stats"]["strength"] = self.player.stats.strength
-            save_player_data(self.guild_id, self.author_id, self.player_data)
+            # Reloaded, changed and saved in one session, so a fight or potion saved since the click is kept
+            async with player_session(self.guild_id, self.author_id) as session:
+                self.player, self.player_data = session.player, session.player_data
+
+                # Update inventory and decrement stamina
+                mined_ore = Ore(name=self.ore_type)
+                self.player.inventory.add_item_to_inventory(mined_ore, amount=1)
+                self.player.stats.stamina -= 1
+
+                # Gain mining experience, passing 0 if the player has reached the cap
+                messages = await self.player.gain_experience(exp_gain, "mining", interaction)
+                # Ensure messages is iterable if it's None
+                messages = messages or []
+
+                # Attempt herb drop
+                herb_dropped = attempt_herb_drop(zone_level, self.guild_id)
+                if herb_dropped:
+                    self.player.inventory.add_item_to_inventory(herb_dropped, amount=1)
+                    message += f"\n{get_emoji(herb_dropped.name)} You also **found some {herb_dropped.name}!**"
+
+                # Attempt MTRM drop
+                mtrm_dropped = attempt_mtrm_drop(zone_level, self.guild_id)
+                if mtrm_dropped:
+                    self.player.inventory.add_item_to_inventory(mtrm_dropped, amount=1)
+                    message += f"\n{get_emoji('Materium')} You also **found some Materium!**"
 
             # Clear previous fields and add new ones
             self.embed.clear_fields()
@@ -379,8 +347,7 @@ class MineButton(discord.ui.View, CommonResponses):
                 formatted_current_experience = "{:,}".format(current_experience)
                 self.embed.add_field(name="Max Level", value=f"📊  {formatted_current_experience}", inline=True)
             else:
-                next_level_experience_needed = LEVEL_DATA.get(str(current_mining_level), {}).get("total_experience")
-                xp_remaining = next_level_experience_needed - current_experience
+                xp_remaining = LEVEL_CURVE.xp_to_next(current_mining_level, current_experience)
                 formatted_xp_remaining = "{:,}".format(xp_remaining)
                 self.embed.add_field(name=f"XP to Level {next_level}",
                                      value=f"📊 {formatted_xp_remaining}",
@@ -433,8 +400,7 @@ class MineButton(discord.ui.View, CommonResponses):
                 formatted_current_experience = "{:,}".format(current_experience)
                 self.embed.add_field(name="Max Level", value=f"📊  {formatted_current_experience}", inline=True)
             else:
-                next_level_experience_needed = LEVEL_DATA.get(str(current_mining_level), {}).get("total_experience")
-                xp_remaining = next_level_experience_needed - current_experience
+                xp_remaining = LEVEL_CURVE.xp_to_next(current_mining_level, current_experience)
                 formatted_xp_remaining = "{:,}".format(xp_remaining)
                 self.embed.add_field(name=f"XP to Level {next_level}",
                                      value=f"📊 {formatted_xp_remaining}",
@@ -461,141 +427,25 @@ class MineButton(discord.ui.View, CommonResponses):
             await interaction.message.edit(embed=self.embed, view=self)
 
         # Monster encounter set in probabilities.py
-        if np.random.rand() <= get_server_setting(interaction.guild_id, 'attack_percent') and self.player_data["location"] != "battle":
+        if np.random.rand() <= (await aserver_settings(interaction.guild_id)).attack_percent and self.player_data["location"] != "battle":
             # Refresh player object from the latest player data
             self.player, self.player_data = await refresh_player_from_data(interaction)
 
-            self.player_data["location"] = "battle"
-            save_player_data(self.guild_id, self.author_id, self.player_data)
-
             monster_name = generate_random_monster(self.ore_type)
             monster = generate_monster_by_name(monster_name, self.player.stats.zone_level)
 
+            # A fight that started while the player was reloaded wins; otherwise claim the player before warning them
+            session = BattleSession(self.ctx, interaction, interaction.user, self.player, self.player_data, monster,
+                                    self.guild_id, self.author_id, add_repeat_button=False)
+            if not session.begin():
+                return
+
             # Send the warning message in the channel mentioning the user
             warning_message = f"LOOK OUT {interaction.user.mention}!"
             await interaction.followup.send(warning_message)
 
-            battle_embed = await send_message(interaction.channel,
-                                              create_battle_embed(interaction.user, self.player, monster,
-                                                                  footer_text_for_embed(self.ctx, monster, self.player)))
-
-            from monsters.monster import BattleContext
-            from monsters.battle import SpecialAttackOptions
-
-            def update_special_attack_buttons(context):
-                if context.special_attack_options_view:
-                    context.special_attack_options_view.update_button_states()
-
-            battle_context = BattleContext(self.ctx, interaction.user, self.player, monster, battle_embed,
-                                           self.player.stats.zone_level,
-                                           update_special_attack_buttons)
-
-            special_attack_options_view = SpecialAttackOptions(battle_context, None, None)
-            battle_context.special_attack_options_view = special_attack_options_view
-
-            special_attack_message = await self.ctx.send(view=special_attack_options_view)
-            battle_context.special_attack_message = special_attack_message
-
-            battle_options_msg = await self.ctx.send(
-                view=BattleOptions(self.ctx, self.player, self.player_data, battle_context, special_attack_options_view))
-            battle_context.battle_options_msg = battle_options_msg
-
-            special_attack_options_view.battle_options_msg = battle_options_msg
-            special_attack_options_view.special_attack_message = special_attack_message
-
-            battle_result = await monster_battle(battle_context, self.guild_id)
-
-            if battle_result is None:
-                # Save the player's current stats
-                self.player_data["stats"].update(self.player.stats.__dict__)
-                save_player_data(self.guild_id, self.author_id, self.player_data)
-
-            else:
-                # Unpack the battle outcome and loot messages
-                battle_outcome, loot_messages = battle_result
-                if battle_outcome[0]:
-
-                    # Check if the player is at or above the level cap for their current zone
-                    if zone_level in zone_max_levels and self.player.stats.combat_level >= zone_max_levels[zone_level]:
-                        # Player is at or has exceeded the level cap for their zone; set XP gain to 0
-                        experience_gained = 0
-                    else:
-                        # Player is below the level cap; award XP from the monster
-                        experience_gained = monster.experience_reward
-
-                    loothaven_effect = battle_outcome[5]  # Get the Loothaven effect status
-                    messages = await self.player.gain_experience(experience_gained, 'combat', interaction, self.player)
-                    # Ensure messages is iterable if it's None
-                    messages = messages or []
-                    for msg_embed in messages:
-                        await interaction.followup.send(embed=msg_embed, ephemeral=False)
-
-                    self.player_data["stats"]["stamina"] = self.player.stats.stamina
-                    self.player_data["stats"]["combat_level"] = self.player.stats.combat_level
-                    self.player_data["stats"]["combat_experience"] = self.player.stats.combat_experience
-                    self.player.stats.damage_taken = 0
-                    self.player_data["stats"].update(self.player.stats.__dict__)
-
-                    if self.player.stats.health <= 0:
-                        self.player.stats.health = self.player.stats.max_health
-
-                    # Increment the count of the defeated monster
-                    self.player_data["monster_kills"][monster.name] += 1
-
-                    # Save the player data after common actions
-                    save_player_data(self.guild_id, self.author_id, self.player_data)
-
-                    # Clear the previous views
-                    await battle_context.special_attack_message.delete()
-                    await battle_options_msg.delete()
-
-                    loot_view = LootOptions(interaction, self.player, monster, battle_embed, self.player_data, self.author_id, battle_outcome,
-                                            loot_messages, self.guild_id, interaction, experience_gained, loothaven_effect, battle_context.rusty_spork_dropped, add_repeat_button=False)
-
-                    # Send max XP cap message if experience gained is 0
-                    max_cap_message = ""
-                    if experience_gained == 0:
-                        max_cap_message = f"\n**(Max XP cap reached for Zone {self.player.stats.zone_level})**"
-
-                    await battle_embed.edit(
-                        embed=create_battle_embed(interaction.user, self.player, monster, footer_text_for_embed(self.ctx, monster, self.player),
-                                                  f"You have **DEFEATED** the {monster.name}!\n\n"
-                                                  f"You dealt **{battle_outcome[1]} damage** to the monster and took **{battle_outcome[2]} damage**. "
-                                                  f"You gained {experience_gained} combat XP. {max_cap_message}\n"
-                                                  f"\n"),
-                        view=loot_view
-                    )
-
-                else:
-
-                    button.disabled = True
-                    # The player is defeated
-                    self.player.stats.health = 0  # Set player's health to 0
-                    self.player_data["stats"]["health"] = 0
-
-                    # Create a new embed with the defeat message
-                    new_embed = create_battle_embed(interaction.user, self.player, monster, footer_text= "", messages=
-
-                                                    f"☠️ You have been **DEFEATED** by the **{monster.name}**!\n"
-                                                    f"{get_emoji('rip_emoji')} *Your spirit lingers, seeking renewal.* {get_emoji('rip_emoji')}\n\n"
-                                                    f"__**Options for Revival:**__\n"
-                                                    f"1. Use {get_emoji('Materium')} to revive without penalty.\n"
-                                                    f"2. Resurrect with 2.5% penalty to all skills."
-                                                    f"**Lose all items in inventory** (Keep equipped items, coppers, MTRM, potions, and charms)")
-
-                    # Clear the previous views
-                    await battle_context.special_attack_message.delete()
-                    await battle_options_msg.delete()
-
-                    # Add the "dead.png" image to the embed
-                    new_embed.set_image(
-                        url=generate_urls("cemetery", "dead"))
-                    # Update the message with the new embed and view
-                    await battle_embed.edit(embed=new_embed, view=ResurrectOptions(interaction, self.player_data, self.author_id))
-
-            # Clear the battle flag after the battle ends
-            self.player_data["location"] = None
-            save_player_data(self.guild_id, self.author_id, self.player_data)
+            if await session.run() == DIED:
+                button.disabled = True
 
 class MiningCog(commands.Cog, CommonResponses):
     def __init__(self, bot):
@@ -624,14 +474,15 @@ class MiningCog(commands.Cog, CommonResponses):
 
         # Check if the player has the Stonebreaker charm equipped
         if player.inventory.equipped_charm and player.inventory.equipped_charm.name == "Stonebreaker":
-            probability += get_server_setting(guild_id, 'stonebreaker_percent')  # Increase probability by if Stonebreaker is equipped
+            probability += server_settings(guild_id).stonebreaker_percent  # Increase probability by if Stonebreaker is equipped
 
         return min(1, probability)  # Ensure it doesn't exceed 100%
 
     @commands.slash_command(description="Mine some Ore!")
     async def mine(self, ctx,
                    ore_type: Option(str, "Type of ore to mine", choices=['Iron Ore', 'Coal', 'Carbon'],
-                                     required=True)):
+                                     required=True),
+                   count: Option(int, "Attempts to make at once", min_value=1, max_value=MAX_GATHERING_BATCH, default=1)):
 
         # Refresh player object from the latest player data
         player, player_data = await refresh_player_from_data(ctx)
@@ -680,6 +531,41 @@ class MiningCog(commands.Cog, CommonResponses):
                 ephemeral=True)
             return
 
+        # Several attempts are resolved right here: one save, and the result goes out with the command's response
+        batch_summary = None
+        level_up_messages = []
+        ambush = None
+        if count > 1:
+            settings = await aserver_settings(ctx.guild.id)
+
+            # Rolled, applied and saved in the player's session, as /autobattle does, so nothing saved meanwhile is lost
+            async with player_session(ctx.guild.id, ctx.author.id) as session:
+                player, player_data = session.player, session.player_data
+
+                if player_data["location"] == "battle":
+                    await CommonResponses.ongoing_battle_response(ctx)
+                    return
+
+                if player.inventory.total_items_count() >= player.inventory.limit and not player.inventory.has_item(ore_type):
+                    await ctx.respond(f"Inventory is full. Please make some room before mining {ore_type}.", ephemeral=True)
+                    return
+
+                if player.stats.stamina <= 0:
+                    await ctx.respond("You are too tired to mine any ore.", ephemeral=True)
+                    return
+
+                success_prob = self.calculate_probability(player, player.stats.mining_level, player.stats.zone_level, ore_type, ctx.guild.id)
+                batch = roll_gathering_batch(count, player.stats.stamina, success_prob, player.stats.zone_level, settings)
+                _, level_up_messages, batch_summary = await apply_gathering_batch(player, batch, Ore(name=ore_type), "mining",
+                                                                                  MINING_EXPERIENCE[ore_type], ctx)
+                if batch.ambushed:
+                    # Claimed while the player is still held, before the response goes out
+                    monster = generate_monster_by_name(generate_random_monster(ore_type), player.stats.zone_level)
+                    ambush = BattleSession(ctx, ctx, ctx.author, player, player_data, monster, ctx.guild.id, str(ctx.author.id),
+                                           add_repeat_button=False)
+                    if not ambush.begin():
+                        ambush = None
+
         # Rarity and Color Mapping
         rarity_mapping = {
             1: "Common",
@@ -725,8 +611,7 @@ class MiningCog(commands.Cog, CommonResponses):
             formatted_current_experience = "{:,}".format(current_experience)
             embed.add_field(name="Max Level", value=f"📊  {formatted_current_experience}", inline=True)
         else:
-            next_level_experience_needed = LEVEL_DATA.get(str(current_mining_level), {}).get("total_experience")
-            xp_remaining = next_level_experience_needed - current_experience
+            xp_remaining = LEVEL_CURVE.xp_to_next(current_mining_level, current_experience)
             formatted_xp_remaining = "{:,}".format(xp_remaining)
             embed.add_field(name=f"XP to Level {next_level}",
                             value=f"📊 {formatted_xp_remaining}",
@@ -739,8 +624,19 @@ class MiningCog(commands.Cog, CommonResponses):
         # Create the view and send the response
         view = MineButton(ctx, player, ore_type, player_data, ctx.guild.id, str(ctx.author.id), embed)
 
+        if batch_summary:
+            embed.description = f"{ore_emoji} {batch_summary}"
+            view.mine_messages.append(embed.description)
+
         await ctx.respond(embed=embed, view=view)
 
+        for msg_embed in level_up_messages:
+            await ctx.followup.send(embed=msg_embed, ephemeral=False)
+
+        if ambush:
+            await ctx.followup.send(f"LOOK OUT {ctx.author.mention}!")
+            await ambush.run()
+
 
 def setup(bot):
     bot.add_cog(MiningCog(bot))
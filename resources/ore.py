@@ -17,12 +17,6 @@ class Ore:
         ore.stack = data["stack"]
         return ore
 
-ORE_TYPES = [
-    Ore("Iron Ore"),
-    Ore("Coal"),
-    Ore("Carbon")
-]
-
 class Gem:
     def __init__(self, name, rarity, value):
         self.name = name
@@ -47,12 +41,3 @@ class Gem:
         )
         gem.stack = data["stack"]
         return gem
-
-GEM_TYPES = [
-    Gem("Sapphire", 1, 50),
-    Gem("Emerald", 2, 125),
-    Gem("Ruby", 3, 250),
-    Gem("Diamond", 4, 600),
-    Gem("Black Opal", 5, 1200),
-]
-
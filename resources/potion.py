@@ -1,5 +1,4 @@
 from resources.item import Item
-from resources.herb import Herb
 
 class Potion(Item):
     def __init__(self, name, effect_stat, effect_value, value=0, description=""):
@@ -38,43 +37,3 @@ class Potion(Item):
             value=self.value,
             description=self.description
         )
-
-HERB_TYPES = [
-    Herb("Ranarr", 25),
-    Herb("Spirit Weed", 25),
-    Herb("Bloodweed", 350),
-    Herb("Snapdragon", 350)
-]
-
-POTION_LIST = [
-    Potion(
-        name='Health Potion',
-        effect_stat='health',
-        effect_value=50,
-        value=10,
-        description="Restores 50 health",
-    ),
-    Potion(
-        name='Stamina Potion',
-        effect_stat='stamina',
-        effect_value=50,
-        value=10,
-        description="Restores 50 stamina",
-    ),
-    Potion(
-        name='Super Health Potion',
-        effect_stat='health',
-        effect_value=250,
-        value=20,
-        description="Restores 250 health",
-    ),
-    Potion(
-        name='Super Stamina Potion',
-        effect_stat='stamina',
-        effect_value=20,
-        value=20,
-        description="Restores 250 stamina",
-    ),
-]
-
-POTION_NAME_TO_INSTANCE = {potion.name: potion for potion in POTION_LIST}
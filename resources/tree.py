@@ -16,10 +16,3 @@ class Tree:
         )
         trees.stack = data["stack"]
         return trees
-
-TREE_TYPES = [
-    Tree("Pine"),
-    Tree("Yew"),
-    Tree("Ash"),
-    Tree("Poplar")
-]
@@ -0,0 +1,156 @@
+# scheduler.py
+import asyncio
+import heapq
+import itertools
+import logging
+
+logger = logging.getLogger(__name__)
+
+# A tick firing this many seconds after it was due is logged
+LAG_WARNING = 0.5
+
+
+class TickHandle:
+    """One recurring job on the TickScheduler; the owner can pause, resume, cancel or wait for it."""
+
+    def __init__(self, scheduler, tick, name):
+        self.scheduler = scheduler
+        self.tick = tick
+        self.name = name
+        self.due = None
+        self.paused = False
+        self.cancelled = False
+        self.pending_delay = None
+        self.done = asyncio.get_running_loop().create_future()
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self, delay=None):
+        # Picks up where it left off unless a new delay is given
+        if not self.paused or self.done.done():
+            return
+        self.paused = False
+        delay = self.pending_delay if delay is None else delay
+        self.pending_delay = None
+        if delay is not None:
+            self.scheduler._push(self, delay)
+
+    def cancel(self):
+        self.cancelled = True
+        self.scheduler._finish(self)
+
+    async def wait(self):
+        # Returns once the job stops; re-raises whatever a tick raised
+        await asyncio.shield(self.done)
+
+
+class TickScheduler:
+    """Runs the recurring ticks of every active fight from one heap and one task.
+
+    schedule(delay, tick) calls the coroutine function `tick` after `delay` seconds; whatever number it
+    returns is the delay until its next call, counted from when it finished, and None ends the job.
+    Ticks of different jobs run concurrently, ticks of the same job never overlap.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.order = itertools.count()
+        self.handles = set()
+        self.wakeup = None
+        self.task = None
+        # Ticks fired, and how late they fired against their due time
+        self.ticks = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.wakeup = asyncio.Event()
+            self.task = asyncio.create_task(self._run())
+
+    def schedule(self, delay, tick, name=None):
+        self.start()
+        handle = TickHandle(self, tick, name)
+        self.handles.add(handle)
+        self._push(handle, delay)
+        return handle
+
+    def metrics(self):
+        return {
+            "active": len(self.handles),
+            "ticks": self.ticks,
+            "last_lag": self.last_lag,
+            "max_lag": self.max_lag,
+        }
+
+    def _push(self, handle, delay):
+        handle.due = asyncio.get_running_loop().time() + delay
+        heapq.heappush(self.heap, (handle.due, next(self.order), handle))
+        # Only the earliest entry can change how long the run loop sleeps
+        if self.heap[0][2] is handle:
+            self.wakeup.set()
+
+    def _finish(self, handle, error=None):
+        self.handles.discard(handle)
+        if not handle.done.done():
+            if error is None:
+                handle.done.set_result(None)
+            else:
+                handle.done.set_exception(error)
+                # Nobody may be waiting on this job, so make sure the failure is not reported twice
+                handle.done.exception()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self.wakeup.clear()
+            if not self.heap:
+                await self.wakeup.wait()
+                continue
+
+            due, _, handle = self.heap[0]
+            delay = due - loop.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self.heap)
+            # Cancelled and rescheduled jobs leave stale entries behind
+            if handle.cancelled or handle.due != due:
+                continue
+            if handle.paused:
+                # Came due while paused, so it fires as soon as it is resumed
+                handle.pending_delay = 0
+                continue
+
+            lag = loop.time() - due
+            self.ticks += 1
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            if lag > LAG_WARNING:
+                logger.warning(f"Tick for {handle.name} fired {lag * 1000:.0f} ms late")
+            asyncio.create_task(self._fire(handle))
+
+    async def _fire(self, handle):
+        try:
+            delay = await handle.tick()
+        except Exception as e:
+            logger.error(f"Tick for {handle.name} failed: {e}")
+            self._finish(handle, e)
+            return
+
+        if handle.cancelled:
+            return
+        if delay is None:
+            self._finish(handle)
+        elif handle.paused:
+            handle.pending_delay = delay
+        else:
+            self._push(handle, delay)
+
+
+tick_scheduler = TickScheduler()
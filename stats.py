@@ -1,40 +1,24 @@
-import json
 import math
 import discord
 from discord import Embed
 from discord.ext import commands
-from utils import load_player_data, load_all_player_data, save_player_data, CommonResponses, refresh_player_from_data, get_server_setting
+from utils import load_player_data, atop_players, aplayer_rank, save_player_data, CommonResponses, refresh_player_from_data, get_server_setting
 from exemplars.exemplars import Exemplar
-from emojis import get_emoji
+from storage.leaderboards import MONSTER_NAMES, leaderboard_index
+from exemplars.level_curve import LEVEL_CURVE
+from emojis import get_emoji, get_partial_emoji
 from images.urls import generate_urls
 import copy
 import asyncio
+import time
 
-def load_level_data():
-    with open('level_data.json', 'r') as f:
-        return json.load(f)
-
-def experience_needed_to_next_level(current_level, current_exp, level_data):
-    if str(current_level) in level_data:
-        return level_data[str(current_level)]['total_experience'] - current_exp
-    return None
-
-def create_progress_bar(current_exp, current_level, level_data):
+def create_progress_bar(current_exp, current_level):
     bar_length = 16  # Fixed bar length
-    current_level_str = str(current_level)
-    next_level_str = str(int(current_level) + 1)
 
-    if next_level_str not in level_data:
+    if int(current_level) >= LEVEL_CURVE.max_level:
         return "Max Level Reached", "N/A"
 
-    exp_needed_this_level = level_data[current_level_str]['experience_needed']
-    exp_needed_to_next_level = experience_needed_to_next_level(current_level, current_exp, level_data)
-
-    # Calculate experience earned since the last level
-    exp_earned_this_level = exp_needed_this_level - exp_needed_to_next_level
-
-    # Calculate progress as the ratio of exp_earned_this_level to exp_needed_this_level
-    progress = exp_earned_this_level / exp_needed_this_level
+    progress = LEVEL_CURVE.progress_fraction(int(current_level), current_exp)
 
     # Calculate the number of filled and empty symbols needed
     filled_length = round(bar_length * progress)
@@ -99,7 +83,6 @@ class StatsDropdown(discord.ui.Select, CommonResponses):
 
     @staticmethod
     def create_level_progress_embed(stats, zone_level):
-        level_data = load_level_data()
         embed_color = color_mapping.get(zone_level, 0x969696)
         embed = discord.Embed(title="__Level Progress__", color=embed_color)
 
@@ -127,13 +110,13 @@ class StatsDropdown(discord.ui.Select, CommonResponses):
                 embed.add_field(name="Status", value="📊 Max Level!", inline=True)
             else:
                 next_level = int(level) + 1
-                exp_needed = experience_needed_to_next_level(level, current_exp, level_data)
+                exp_needed = LEVEL_CURVE.xp_to_next(level, current_exp)
                 formatted_exp_needed = "{:,}".format(exp_needed)
                 embed.add_field(name=f"🔼 XP to Lvl {next_level}", value=formatted_exp_needed, inline=True)
                 embed.add_field(name="📊 Total XP", value=formatted_current_exp, inline=True)
 
             # Add progress bar for each skill
-            progress_bar, progress_percentage = create_progress_bar(current_exp, level, level_data)
+            progress_bar, progress_percentage = create_progress_bar(current_exp, level)
             embed.add_field(name=f"Progress: **{progress_percentage}%**", value=f"{progress_bar}\n\u200B", inline=False)
 
         return embed
@@ -271,7 +254,8 @@ class LeaderboardDropdown(discord.ui.Select, CommonResponses):
                                  value="monster_kills", emoji=f"{get_emoji('kraken')}"),
             discord.SelectOption(label="Three-Eyed-Snake", description="View Three-Eyed-Snake game leaderboard",
                                  value="three_eyed_snake", emoji="🎲"),
-            discord.SelectOption(label="Rich List", description="View the rich list leaderboard", value="rich_list", emoji="💰")
+            discord.SelectOption(label="Rich List", description="View the rich list leaderboard", value="rich_list", emoji="💰"),
+            discord.SelectOption(label="My Rank", description="See where you stand on any leaderboard", value="my_rank", emoji="📍")
         ]
         super().__init__(placeholder="Choose a category...", min_values=1, max_values=1, options=options)
 
@@ -290,12 +274,119 @@ class LeaderboardDropdown(discord.ui.Select, CommonResponses):
             self.view.add_item(ThreeEyedSnakeDropdown(self.author_id, self.guild_id))
         elif selected_value == "rich_list":
             self.view.add_item(RichListDropdown(self.author_id, self.guild_id))
+        elif selected_value == "my_rank":
+            self.view.add_item(MyRankDropdown(self.author_id, self.guild_id))
 
         # Add the ResetButton back to the view
         self.view.add_item(ResetButton(self.author_id, self.guild_id))
 
         await interaction.response.edit_message(view=self.view)
 
+# Leaderboards list this many players per page, down to LEADERBOARD_DEPTH
+LEADERBOARD_PAGE_SIZE = 10
+LEADERBOARD_DEPTH = 100
+
+# Seconds a built page is reused; a save that changes the top of that leaderboard drops it sooner
+LEADERBOARD_PAGE_TTL = 30
+
+# (guild_id, metric, page) -> (index version, built at, ranked players, rows); each row is
+# (rank, player_id, display name, avatar url, detail, value) so member lookups are paid once per page
+leaderboard_pages = {}
+
+def ordinal(number):
+    suffix = "th" if 10 <= number % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(number % 10, "th")
+    return f"{number}{suffix}"
+
+async def leaderboard_page(guild, metric, page, detail=None):
+    key = (str(guild.id), metric, page)
+    cached = leaderboard_pages.get(key)
+    if (cached is not None and cached[0] == leaderboard_index.version(guild.id, metric)
+            and time.monotonic() - cached[1] < LEADERBOARD_PAGE_TTL):
+        return cached[2], cached[3]
+
+    # Players with nothing to show are left off the board
+    leaders = [(player_id, value) for player_id, value in await atop_players(guild.id, metric, LEADERBOARD_DEPTH) if value > 0]
+    # Nothing after this awaits, so the rows always match the version they are cached under
+    version = leaderboard_index.version(guild.id, metric)
+    rows = leaderboard_rows(guild, leaders, page, detail)
+
+    leaderboard_pages[key] = (version, time.monotonic(), len(leaders), rows)
+    return len(leaders), rows
+
+def leaderboard_rows(guild, leaders, page, detail=None):
+    # Ranked values from the index and names from the gateway's member cache only; no player record is read
+    start = page * LEADERBOARD_PAGE_SIZE
+    rows = []
+    for rank, (player_id, value) in enumerate(leaders[start:start + LEADERBOARD_PAGE_SIZE], start + 1):
+        member = guild.get_member(int(player_id))
+        player_name = member.display_name if member else "Unknown Player"
+        avatar_url = member.avatar.url if member and member.avatar else None
+        rows.append((rank, player_id, player_name, avatar_url, detail(value) if detail else None, value))
+    return rows
+
+class LeaderboardPager(discord.ui.View, CommonResponses):
+    def __init__(self, author_id, guild, metric, title, color, format_value, thumbnail_url=None, detail=None):
+        super().__init__(timeout=None)
+        self.author_id = author_id
+        self.guild = guild
+        self.metric = metric
+        self.title = title
+        self.color = color
+        # format_value(value, detail) -> field text; detail(value) derives anything extra a row shows from the ranked value
+        self.format_value = format_value
+        self.thumbnail_url = thumbnail_url
+        self.detail = detail
+        self.page = 0
+
+        self.previous_button = discord.ui.Button(label="Prev", style=discord.ButtonStyle.secondary)
+        self.previous_button.callback = self.previous_page
+        self.next_button = discord.ui.Button(label="Next", style=discord.ButtonStyle.secondary)
+        self.next_button.callback = self.next_page
+        self.add_item(self.previous_button)
+        self.add_item(self.next_button)
+
+    async def render(self):
+        total, rows = await leaderboard_page(self.guild, self.metric, self.page, self.detail)
+        pages = max(math.ceil(total / LEADERBOARD_PAGE_SIZE), 1)
+
+        embed = discord.Embed(title=self.title, color=self.color)
+        medals = ["🥇", "🥈", "🥉"]
+        for rank, player_id, player_name, avatar_url, detail, value in rows:
+            place = medals[rank - 1] if rank <= 3 else ordinal(rank)
+            embed.add_field(name=f"{place} - {player_name}", value=self.format_value(value, detail), inline=False)
+
+        # Top player's avatar on each page, falling back to the leaderboard's own image
+        thumbnail_url = rows[0][3] if rows and rows[0][3] else self.thumbnail_url
+        if thumbnail_url:
+            embed.set_thumbnail(url=thumbnail_url)
+        embed.set_footer(text=f"Page {self.page + 1}/{pages}")
+
+        self.previous_button.disabled = self.page == 0
+        self.next_button.disabled = self.page >= pages - 1
+        return embed, total
+
+    async def send(self, interaction, empty_message):
+        embed, total = await self.render()
+        if not total:
+            await interaction.response.send_message(empty_message, ephemeral=True)
+            return
+        await interaction.response.send_message(embed=embed, view=self, ephemeral=True)
+
+    async def change_page(self, interaction, step):
+        if str(interaction.user.id) != self.author_id:
+            await self.nero_unauthorized_user_response(interaction)
+            return
+
+        self.page = max(self.page + step, 0)
+        embed, total = await self.render()
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    async def previous_page(self, interaction):
+        await self.change_page(interaction, -1)
+
+    async def next_page(self, interaction):
+        await self.change_page(interaction, 1)
+
 class SkillsDropdown(discord.ui.Select, CommonResponses):
     def __init__(self, author_id, guild_id):
         self.author_id = author_id
@@ -312,39 +403,15 @@ class SkillsDropdown(discord.ui.Select, CommonResponses):
             await self.nero_unauthorized_user_response(interaction)
             return
 
-        # Load player data
-        player_data = load_all_player_data(self.guild_id)
-
-        # Sort players based on selected skill's experience
         skill = self.values[0]
-        sorted_players = sorted(player_data.items(), key=lambda x: x[1]['stats'][f'{skill}_experience'], reverse=True)
-
-        # Check if there are players with data
-        if not sorted_players or all(data['stats'][f'{skill}_experience'] == 0 for _, data in sorted_players):
-            await interaction.response.send_message("No leaders yet in this category.", ephemeral=True)
-            return
-
-        # Create embed to display leaderboard
         skill_emoji = "⚔️" if skill == "combat" else "🪓" if skill == "woodcutting" else "⛏️"
-        embed = discord.Embed(title=f"{skill_emoji} __Top 5 {skill.capitalize()} Leaders__ {skill_emoji}",
-                              color=discord.Color.blue())
 
-        medals = ["🥇", "🥈", "🥉"]
-        for index, (player_id, data) in enumerate(sorted_players[:5]):
-            if data['stats'][f'{skill}_experience'] == 0:
-                continue
-            player = interaction.guild.get_member(int(player_id))
-            player_name = player.display_name
-            level = data['stats'][f'{skill}_level']
-            experience = "{:,}".format(data['stats'][f'{skill}_experience'])
-            rank = medals[index] if index < 3 else f"{index + 1}th"
-            embed.add_field(name=f"{rank} - {player_name}", value=f"Level: {level}  |  XP: {experience}", inline=False)
-
-            if index == 0 and player and player.avatar:  # Set thumbnail for the first-place player
-                embed.set_thumbnail(url=player.avatar.url)
-
-        # Send the embed as an ephemeral message
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        pager = LeaderboardPager(self.author_id, interaction.guild, f'stats.{skill}_experience',
+                                 title=f"{skill_emoji} __{skill.capitalize()} Leaders__ {skill_emoji}",
+                                 color=discord.Color.blue(),
+                                 format_value=lambda experience, level: f"Level: {level}  |  XP: {experience:,}",
+                                 detail=LEVEL_CURVE.level_for_xp)
+        await pager.send(interaction, "No leaders yet in this category.")
 
 class MonsterKillsDropdown(discord.ui.Select, CommonResponses):
     def __init__(self, author_id, guild_id):
@@ -370,42 +437,15 @@ class MonsterKillsDropdown(discord.ui.Select, CommonResponses):
             await self.nero_unauthorized_user_response(interaction)
             return
 
-        # Load player data
-        player_data = load_all_player_data(self.guild_id)
-
         # Select the monster
         monster = self.values[0]
 
-        # Sort players based on the selected monster's kill count
-        sorted_players = sorted(player_data.items(), key=lambda x: x[1]['monster_kills'].get(monster, 0), reverse=True)
-
-        # Check if there are players with data
-        if not sorted_players or all(data['monster_kills'].get(monster, 0) == 0 for _, data in sorted_players):
-            await interaction.response.send_message(f"The {monster.capitalize()} has yet to be slain.", ephemeral=True)
-            return
-
-        # Create embed to display leaderboard
-        embed = discord.Embed(title=f"Top 5 {monster.title()} Slayers", color=discord.Color.green())
-
-        medals = ["🥇", "🥈", "🥉"]
-        for index, (player_id, data) in enumerate(sorted_players[:5]):
-            if data['monster_kills'].get(monster, 0) == 0:
-                continue
-            player = interaction.guild.get_member(int(player_id))
-            player_name = player.display_name if player else "Unknown Player"
-            kill_count = "{:,}".format(data['monster_kills'][monster])  # Format with commas
-            rank = medals[index] if index < 3 else f"{index + 1}th"
-            embed.add_field(name=f"{rank} - {player_name}", value=f"Kills: {kill_count}", inline=False)
-
-            if index == 0:
-                if player and player.avatar:
-                    embed.set_thumbnail(url=player.avatar.url)
-                else:
-                    # Set default thumbnail to the monster image
-                    embed.set_thumbnail(url=generate_urls('monsters', monster.title()))
-
-        # Send the embed as an ephemeral message
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        pager = LeaderboardPager(self.author_id, interaction.guild, f'monster_kills.{monster}',
+                                 title=f"{monster.title()} Slayers",
+                                 color=discord.Color.green(),
+                                 format_value=lambda kills, detail: f"Kills: {kills:,}",
+                                 thumbnail_url=generate_urls('monsters', monster.title()))
+        await pager.send(interaction, f"The {monster.capitalize()} has yet to be slain.")
 
 class ThreeEyedSnakeDropdown(discord.ui.Select, CommonResponses):
     def __init__(self, author_id, guild_id):
@@ -414,7 +454,7 @@ class ThreeEyedSnakeDropdown(discord.ui.Select, CommonResponses):
         options = [
             discord.SelectOption(label="Games Played", value="total_games", emoji="🎲"),
             discord.SelectOption(label="Games Won", value="games_won", emoji="🏆"),
-            discord.SelectOption(label="Coppers Won", value="coppers_won", emoji=get_emoji('coppers_emoji'))
+            discord.SelectOption(label="Coppers Won", value="coppers_won", emoji=get_partial_emoji('coppers_emoji'))
         ]
         super().__init__(placeholder="Choose a category...", min_values=1, max_values=1, options=options)
 
@@ -423,60 +463,31 @@ class ThreeEyedSnakeDropdown(discord.ui.Select, CommonResponses):
             await self.nero_unauthorized_user_response(interaction)
             return
 
-        # Load player data
-        player_data = load_all_player_data(self.guild_id)
-
         # Select the category
         category = self.values[0]
-
-        # Sort players based on the selected category
-        sorted_players = sorted(player_data.items(), key=lambda x: x[1]['dice_stats'].get(category, 0), reverse=True)
-
-        # Filter out negative coppers if category is 'coppers_won'
-        if category == 'coppers_won':
-            sorted_players = [(id, data) for id, data in sorted_players if data['dice_stats'].get(category, 0) > 0]
-
-        # Check if there are players with data
-        if not sorted_players:
-            await interaction.response.send_message(f"No leaders yet for {category.replace('_', ' ').capitalize()}.",
-                                                    ephemeral=True)
-            return
-
-        # Create embed to display leaderboard
         category_title = category.replace('_', ' ').title()
         stat_label = "Games Played" if category == "total_games" else category_title
         emoji = "🎲" if category == "total_games" else "🏆" if category == "games_won" else get_emoji('coppers_emoji')
-        title = f"{emoji} __Top 5 {category_title} Leaders__ {emoji}"
-        embed = discord.Embed(title=title, color=discord.Color.orange())
 
-        medals = ["🥇", "🥈", "🥉"]
-        for index, (player_id, data) in enumerate(sorted_players[:5]):
-            player = interaction.guild.get_member(int(player_id))
-            player_name = player.display_name if player else "Unknown Player"
-            stat_count = "{:,}".format(data['dice_stats'][category])
-            rank = medals[index] if index < 3 else f"{index + 1}th"
-
-            # Format the label differently for 'Coppers Won' category
-            if category == 'coppers_won':
-                label = f"{emoji} {stat_count}"
-            else:
-                label = f"{stat_label}: {stat_count}"
-
-            embed.add_field(name=f"{rank} - {player_name}", value=label, inline=False)
-
-            if index == 0 and player and player.avatar:
-                embed.set_thumbnail(url=player.avatar.url)
+        # Format the label differently for 'Coppers Won' category
+        if category == 'coppers_won':
+            format_value = lambda count, detail: f"{emoji} {count:,}"
+        else:
+            format_value = lambda count, detail: f"{stat_label}: {count:,}"
 
-        # Send the embed as an ephemeral message
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        pager = LeaderboardPager(self.author_id, interaction.guild, f'dice_stats.{category}',
+                                 title=f"{emoji} __{category_title} Leaders__ {emoji}",
+                                 color=discord.Color.orange(),
+                                 format_value=format_value)
+        await pager.send(interaction, f"No leaders yet for {category.replace('_', ' ').capitalize()}.")
 
 class RichListDropdown(discord.ui.Select, CommonResponses):
     def __init__(self, author_id, guild_id):
         self.author_id = author_id
         self.guild_id = guild_id
         options = [
-            discord.SelectOption(label="Coppers", value="coppers", emoji=get_emoji('coppers_emoji')),
-            discord.SelectOption(label="Materium", value="materium", emoji=get_emoji('Materium'))
+            discord.SelectOption(label="Coppers", value="coppers", emoji=get_partial_emoji('coppers_emoji')),
+            discord.SelectOption(label="Materium", value="materium", emoji=get_partial_emoji('Materium'))
         ]
         super().__init__(placeholder="Choose a category...", min_values=1, max_values=1, options=options)
 
@@ -485,45 +496,60 @@ class RichListDropdown(discord.ui.Select, CommonResponses):
             await self.nero_unauthorized_user_response(interaction)
             return
 
-        # Load player data
-        player_data = load_all_player_data(self.guild_id)
-
-        # Initialize player objects and sort based on the selected category
-        sorted_players = []
-        for player_id, data in player_data.items():
-            player = Exemplar(data["exemplar"], data["stats"], self.guild_id, data["inventory"])
-            sorted_players.append((player_id, player))
-
         # Select the category
         category = self.values[0]
+        emoji = get_emoji('coppers_emoji') if category == 'coppers' else get_emoji('Materium')
 
-        sorted_players.sort(key=lambda x: getattr(x[1].inventory, category, 0), reverse=True)
+        pager = LeaderboardPager(self.author_id, interaction.guild, f'inventory.{category}',
+                                 title=f"{emoji} __{category.capitalize()} Leaders__ {emoji}",
+                                 color=discord.Color.orange(),
+                                 format_value=lambda amount, detail: f"{emoji} {amount:,}")
+        await pager.send(interaction, f"No leaders yet for {category.capitalize()}.")
+
+# Every leaderboard a player can look up their own rank on, as (label, metric)
+RANK_METRICS = (
+    [("⚔️ Combat XP", "stats.combat_experience"), ("🪓 Woodcutting XP", "stats.woodcutting_experience"), ("⛏️ Mining XP", "stats.mining_experience")] +
+    [(f"{monster} Kills", f"monster_kills.{monster}") for monster in MONSTER_NAMES] +
+    [("🎲 Total Games", "dice_stats.total_games"), ("🎲 Games Won", "dice_stats.games_won"),
+     ("🎲 Games Lost", "dice_stats.games_lost"), ("🎲 Coppers Won", "dice_stats.coppers_won")] +
+    [("💰 Coppers", "inventory.coppers"), ("💰 Materium", "inventory.materium")]
+)
+
+class MyRankDropdown(discord.ui.Select, CommonResponses):
+    def __init__(self, author_id, guild_id):
+        self.author_id = author_id
+        self.guild_id = guild_id
+        self.labels = {metric: label for label, metric in RANK_METRICS}
+        options = [discord.SelectOption(label=label, value=metric) for label, metric in RANK_METRICS]
+        super().__init__(placeholder="Choose a leaderboard...", min_values=1, max_values=1, options=options)
 
-        # Filter out players with 0 value and limit to top 5
-        sorted_players = [(pid, p) for pid, p in sorted_players if getattr(p.inventory, category, 0) > 0][:5]
+    async def callback(self, interaction: discord.Interaction):
+        if str(interaction.user.id) != self.author_id:
+            await self.nero_unauthorized_user_response(interaction)
+            return
 
-        # Check if there are players with data
-        if not sorted_players:
-            await interaction.response.send_message(f"No leaders yet for {category.capitalize()}.", ephemeral=True)
+        metric = self.values[0]
+        ranking = await aplayer_rank(self.guild_id, self.author_id, metric)
+        if ranking is None:
+            await interaction.response.send_message("You aren't on the leaderboards yet.", ephemeral=True)
             return
 
-        # Create embed to display leaderboard
-        emoji = get_emoji('coppers_emoji') if category == 'coppers' else get_emoji('Materium')
-        title = f"{emoji} __Top 5 {category.capitalize()} Leaders__ {emoji}"
-        embed = discord.Embed(title=title, color=discord.Color.orange())
+        rank, total, neighbours = ranking
+        embed = discord.Embed(title=f"📍 Your {self.labels[metric]} Rank",
+                              description=f"You are **#{rank:,}** of {total:,} players.",
+                              color=discord.Color.blue())
 
-        medals = ["🥇", "🥈", "🥉"]
-        for index, (player_id, player) in enumerate(sorted_players):
-            guild_member = interaction.guild.get_member(int(player_id))
-            player_name = guild_member.display_name if guild_member else "Unknown Player"
-            stat_count = "{:,}".format(getattr(player.inventory, category))
-            rank = medals[index] if index < 3 else f"{index + 1}th"
-            embed.add_field(name=f"{rank} - {player_name}", value=f"{emoji} {stat_count}", inline=False)
+        for neighbour_rank, player_id, value in neighbours:
+            if player_id == self.author_id:
+                player_name = f"➡️ {interaction.user.display_name}"
+            else:
+                member = interaction.guild.get_member(int(player_id))
+                player_name = member.display_name if member else "Unknown Player"
+            embed.add_field(name=f"#{neighbour_rank:,} - {player_name}", value=f"{value:,}", inline=False)
 
-            if index == 0 and guild_member and guild_member.avatar:
-                embed.set_thumbnail(url=guild_member.avatar.url)
+        if interaction.user.avatar:
+            embed.set_thumbnail(url=interaction.user.avatar.url)
 
-        # Send the embed as an ephemeral message
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
 class ResetButton(discord.ui.Button, CommonResponses):
@@ -559,7 +585,7 @@ class ResurrectOptions(discord.ui.View, CommonResponses):
             custom_id="use_mtrm",
             label="MTRM",
             style=discord.ButtonStyle.primary,
-            emoji=get_emoji('Materium'),
+            emoji=get_partial_emoji('Materium'),
             disabled=self.player.inventory.materium == 0
         )
         mtrm_button.callback = self.use_mtrm_callback  # Link callback function
@@ -816,16 +842,8 @@ async def apply_penalty(player_data, guild_id):
     return levels_decreased, zone_level_decreased
 
 def recalculate_level(updated_exp):
-    with open("level_data.json", "r") as f:
-        LEVEL_DATA = json.load(f)
-    # Find the correct level range based on the player's total experience
-    for level, level_data in LEVEL_DATA.items():
-        if updated_exp <= level_data["total_experience"]:
-            new_level = int(level)
-            break
-    else:
-        new_level = len(LEVEL_DATA)
-    return new_level
+    # Same rule as Exemplar.set_level, so a death penalty lands on the level XP gains would give
+    return LEVEL_CURVE.level_for_xp(updated_exp)
 
 def setup(bot):
     bot.add_cog(StatsCog(bot))
\ No newline at end of file
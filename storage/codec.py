@@ -0,0 +1,153 @@
+# codec.py
+import json
+import os
+import logging
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+# Format for newly written player files: 'json' (compact) or 'msgpack'; either is readable regardless
+PLAYER_CODEC = os.getenv('PLAYER_CODEC', 'json')
+
+# Inventory sections holding item dicts, with fields in the order their class's to_dict produces them
+ITEM_SCHEMAS = {
+    'items': ('name', 'description', 'value', 'stack'),
+    'trees': ('name', 'stack'),
+    'herbs': ('name', 'value', 'stack'),
+    'ore': ('name', 'stack'),
+    'potions': ('name', 'effect_stat', 'effect_value', 'value', 'description', 'stack'),
+    'weapons': ('name', 'description', 'value', 'stack', 'wtype', 'attack_modifier', 'special_attack', 'zone_level'),
+    'armors': ('name', 'description', 'value', 'stack', 'defense_modifier', 'armor_type', 'zone_level'),
+    'shields': ('name', 'description', 'value', 'stack', 'defense_modifier', 'zone_level'),
+    'charms': ('name', 'description', 'value', 'stack'),
+}
+
+# Equipped slots holding a single item of a section
+EQUIPPED_SLOTS = {
+    'equipped_weapon': 'weapons',
+    'equipped_shield': 'shields',
+    'equipped_charm': 'charms',
+}
+
+# Item fields every from_dict treats as optional, so a null is simply left out
+NULLABLE_FIELDS = ('description', 'value')
+
+# First bytes of a JSON document; anything else is taken to be msgpack
+JSON_PREFIXES = (b'{', b' ', b'\n', b'\r', b'\t')
+
+
+def _map_items(player_data, convert):
+    # Returns a shallow copy with convert(item, schema) applied to every item in the inventory
+    inventory = player_data.get('inventory') if isinstance(player_data, dict) else None
+    if not isinstance(inventory, dict):
+        return player_data
+
+    inventory = dict(inventory)
+    for section, schema in ITEM_SCHEMAS.items():
+        if isinstance(inventory.get(section), list):
+            inventory[section] = [convert(item, schema) for item in inventory[section]]
+    for slot, section in EQUIPPED_SLOTS.items():
+        if inventory.get(slot) is not None:
+            inventory[slot] = convert(inventory[slot], ITEM_SCHEMAS[section])
+    if isinstance(inventory.get('equipped_armor'), dict):
+        inventory['equipped_armor'] = {
+            slot: convert(armor, ITEM_SCHEMAS['armors']) if armor is not None else None
+            for slot, armor in inventory['equipped_armor'].items()
+        }
+    return {**player_data, 'inventory': inventory}
+
+
+def _drop_nulls(item, schema):
+    if not isinstance(item, dict):
+        return item
+    return {field: value for field, value in item.items() if value is not None or field not in NULLABLE_FIELDS}
+
+
+def _to_row(item, schema):
+    # Items with exactly the schema's fields become a positional list; anything unexpected stays a map
+    if isinstance(item, dict) and 'name' in item and item.keys() <= set(schema):
+        return [item.get(field) for field in schema]
+    return _drop_nulls(item, schema)
+
+
+def _from_row(item, schema):
+    if isinstance(item, list):
+        return dict(zip(schema, item))
+    if isinstance(item, dict):
+        item = dict(item)
+        for field in NULLABLE_FIELDS:
+            if field in schema:
+                item.setdefault(field, None)
+    return item
+
+
+def encode_json(player_data):
+    from utils import ExemplarJSONEncoder
+
+    return json.dumps(_map_items(player_data, _drop_nulls), separators=(',', ':'), cls=ExemplarJSONEncoder).encode()
+
+
+def encode_msgpack(player_data):
+    from utils import ExemplarJSONEncoder
+
+    return msgpack.packb(_map_items(player_data, _to_row), default=ExemplarJSONEncoder().default, use_bin_type=True)
+
+
+CODECS = {
+    'json': encode_json,
+    'msgpack': encode_msgpack,
+}
+
+
+def encode_player(player_data, codec=None):
+    codec = codec or PLAYER_CODEC
+    if codec == 'msgpack' and msgpack is None:
+        logger.warning("msgpack is not installed, writing player data as JSON instead.")
+        codec = 'json'
+    return CODECS[codec](player_data)
+
+
+def decode_player(raw):
+    """Decode a player record written by any codec, including the old indented JSON."""
+    if raw[:1] in JSON_PREFIXES:
+        player_data = json.loads(raw)
+    elif msgpack is None:
+        raise RuntimeError("Player data is stored as msgpack but msgpack is not installed")
+    else:
+        player_data = msgpack.unpackb(raw, raw=False)
+    return _map_items(player_data, _from_row)
+
+
+if __name__ == "__main__":
+    # Bytes on disk and per-record encode/decode time for each codec against the old indented encoder
+    import sys
+    import timeit
+    from utils import ExemplarJSONEncoder
+
+    sample_path = sys.argv[1] if len(sys.argv) > 1 else 'server/949340107830362173/player_data.json'
+    with open(sample_path, 'r') as f:
+        sample_players = list(json.load(f).values())
+
+    candidates = {
+        'json indent=4 (old)': (lambda data: json.dumps(data, indent=4, cls=ExemplarJSONEncoder).encode(), json.loads),
+        'json compact': (encode_json, decode_player),
+    }
+    if msgpack is not None:
+        candidates['msgpack rows'] = (encode_msgpack, decode_player)
+    else:
+        print("msgpack is not installed; skipping the binary codec.")
+
+    rounds = 500
+    for name, (encode, decode) in candidates.items():
+        encoded = [encode(player_data) for player_data in sample_players]
+        # Every codec has to give back exactly what the old format did
+        assert all(decode(raw) == json.loads(json.dumps(player_data)) for raw, player_data in zip(encoded, sample_players)), name
+        encode_time = timeit.timeit(lambda: [encode(player_data) for player_data in sample_players], number=rounds)
+        decode_time = timeit.timeit(lambda: [decode(raw) for raw in encoded], number=rounds)
+        per_record = rounds * len(sample_players)
+        print(f"{name:<22}{sum(map(len, encoded)):>9} bytes"
+              f"{encode_time / per_record * 1e6:>10.1f} us encode{decode_time / per_record * 1e6:>10.1f} us decode")
@@ -0,0 +1,78 @@
+# journal.py
+import json
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def diff_records(previous, current, path=()):
+    """Ops that turn previous into current: ["set", path, value] for changed fields, ["del", path] for removed ones."""
+    ops = []
+    for field, value in current.items():
+        if field not in previous:
+            ops.append(["set", [*path, field], value])
+        elif previous[field] != value:
+            # Descend into nested sections so a mining click records stats.mining_experience, not all of stats
+            if isinstance(value, dict) and isinstance(previous[field], dict):
+                ops.extend(diff_records(previous[field], value, (*path, field)))
+            else:
+                ops.append(["set", [*path, field], value])
+    for field in previous:
+        if field not in current:
+            ops.append(["del", [*path, field]])
+    return ops
+
+
+def apply_ops(record, ops):
+    # Every op carries the new value rather than an increment, so replaying a journal twice is harmless
+    for op in ops:
+        kind, path = op[0], op[1]
+        if not path:
+            # An empty path replaces (or deletes) the whole record
+            record = op[2] if kind == "set" else None
+            continue
+
+        if record is None:
+            record = {}
+        target = record
+        for field in path[:-1]:
+            target = target.setdefault(field, {})
+        if kind == "set":
+            target[path[-1]] = op[2]
+        else:
+            target.pop(path[-1], None)
+    return record
+
+
+def encode_entry(player_id, ops):
+    from utils import ExemplarJSONEncoder
+
+    return json.dumps({"player": player_id, "ops": ops}, separators=(',', ':'), cls=ExemplarJSONEncoder)
+
+
+def append_entries(journal_path, lines):
+    # One write and one fsync for the whole batch
+    with open(journal_path, 'a') as f:
+        f.write(''.join(f'{line}\n' for line in lines))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def read_entries(journal_path):
+    """Yield (player_id, encoded entry) for every complete line; a torn final line from a crash is skipped."""
+    try:
+        with open(journal_path, 'r') as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return
+
+    for line_number, line in enumerate(lines, 1):
+        if not line:
+            continue
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            logger.warning(f"Skipping unreadable entry on line {line_number} of {journal_path}.")
+            continue
+        yield entry["player"], line
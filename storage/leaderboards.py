@@ -0,0 +1,136 @@
+# leaderboards.py
+from bisect import bisect_left, insort
+
+MONSTER_NAMES = ['Rabbit', 'Deer', 'Buck', 'Wolf', 'Goblin', 'Goblin Hunter', 'Mega Brute', 'Wisp', 'Mother', 'Kraken']
+
+# Every value a leaderboard can rank by, as "<section>.<field>" of a player record
+LEADERBOARD_METRICS = (
+    ['stats.combat_experience', 'stats.mining_experience', 'stats.woodcutting_experience'] +
+    [f'monster_kills.{monster}' for monster in MONSTER_NAMES] +
+    ['dice_stats.total_games', 'dice_stats.games_won', 'dice_stats.games_lost', 'dice_stats.coppers_won'] +
+    ['inventory.coppers', 'inventory.materium']
+)
+
+
+def metric_value(player_data, metric):
+    # Works on raw records (plain dicts) as well as hydrated ones (Inventory object)
+    section, field = metric.split('.', 1)
+    container = player_data.get(section) or {}
+    if isinstance(container, dict):
+        return container.get(field, 0) or 0
+    return getattr(container, field, 0) or 0
+
+
+def field_value(player_data, path):
+    # Any dotted path into a record (e.g. "stats.combat_level"), through plain dicts and hydrated objects; None if missing
+    value = player_data
+    for part in path.split('.'):
+        value = value.get(part) if isinstance(value, dict) else getattr(value, part, None)
+        if value is None:
+            return None
+    return value
+
+
+def project(player_data, fields):
+    return {field: field_value(player_data, field) for field in fields}
+
+# Only changes within this many places bump a metric's version, so caches of the top of a board survive churn below it
+VERSIONED_DEPTH = 100
+
+
+class LeaderboardIndex:
+    """Per-guild rankings for every leaderboard metric, kept sorted as players are saved so top-K never touches disk."""
+
+    def __init__(self):
+        # guild_id (str) -> metric -> sorted list of (-value, player_id); best first, ties broken by player ID
+        self.rankings = {}
+        # guild_id (str) -> player_id -> {metric: value} as currently ranked
+        self.values = {}
+        # (guild_id (str), metric) -> counter bumped whenever the top VERSIONED_DEPTH places change
+        self.versions = {}
+
+    def is_built(self, guild_id):
+        return str(guild_id) in self.rankings
+
+    def build(self, guild_id, scanned):
+        """(Re)build a guild from scan_players(guild_id, LEADERBOARD_METRICS) output."""
+        guild_key = str(guild_id)
+        values = {
+            str(player_id): {metric: fields.get(metric) or 0 for metric in LEADERBOARD_METRICS}
+            for player_id, fields in scanned.items()
+        }
+        self.values[guild_key] = values
+        self.rankings[guild_key] = {
+            metric: sorted((-player_values[metric], player_id) for player_id, player_values in values.items())
+            for metric in LEADERBOARD_METRICS
+        }
+        for metric in LEADERBOARD_METRICS:
+            self._bump(guild_key, metric, 0)
+
+    def version(self, guild_id, metric):
+        return self.versions.get((str(guild_id), metric), 0)
+
+    def _bump(self, guild_key, metric, position):
+        if position < VERSIONED_DEPTH:
+            self.versions[(guild_key, metric)] = self.versions.get((guild_key, metric), 0) + 1
+
+    @staticmethod
+    def _discard(ranking, entry):
+        # Returns where the entry was, or len(ranking) if it was not ranked
+        position = bisect_left(ranking, entry)
+        if position < len(ranking) and ranking[position] == entry:
+            del ranking[position]
+            return position
+        return len(ranking)
+
+    def update(self, guild_id, player_id, player_data):
+        # Guilds nobody has asked about yet are left alone; their first query builds them from storage
+        guild_key, player_id = str(guild_id), str(player_id)
+        rankings = self.rankings.get(guild_key)
+        if rankings is None:
+            return
+
+        previous = self.values[guild_key].get(player_id)
+        current = {metric: metric_value(player_data, metric) for metric in LEADERBOARD_METRICS}
+        for metric, value in current.items():
+            ranking = rankings[metric]
+            old_position = len(ranking)
+            if previous is not None:
+                if previous[metric] == value:
+                    continue
+                old_position = self._discard(ranking, (-previous[metric], player_id))
+            insort(ranking, (-value, player_id))
+            self._bump(guild_key, metric, min(old_position, bisect_left(ranking, (-value, player_id))))
+        self.values[guild_key][player_id] = current
+
+    def remove(self, guild_id, player_id):
+        guild_key, player_id = str(guild_id), str(player_id)
+        rankings = self.rankings.get(guild_key)
+        previous = self.values.get(guild_key, {}).pop(player_id, None)
+        if rankings is None or previous is None:
+            return
+        for metric, value in previous.items():
+            self._bump(guild_key, metric, self._discard(rankings[metric], (-value, player_id)))
+
+    def top(self, guild_id, metric, limit=5):
+        return [(player_id, -value) for value, player_id in self.rankings[str(guild_id)][metric][:limit]]
+
+    def rank(self, guild_id, metric, player_id, radius=2):
+        """(rank, total, [(rank, player_id, value), ...] for the player and up to `radius` either side), or None if unranked."""
+        guild_key, player_id = str(guild_id), str(player_id)
+        player_values = self.values[guild_key].get(player_id)
+        if player_values is None:
+            return None
+
+        # The player's own entry is in the list, so a binary search finds their exact position
+        ranking = self.rankings[guild_key][metric]
+        position = bisect_left(ranking, (-player_values[metric], player_id))
+        start = max(position - radius, 0)
+        neighbours = [
+            (start + offset + 1, neighbour_id, -value)
+            for offset, (value, neighbour_id) in enumerate(ranking[start:position + radius + 1])
+        ]
+        return position + 1, len(ranking), neighbours
+
+
+leaderboard_index = LeaderboardIndex()
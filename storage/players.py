@@ -0,0 +1,255 @@
+# players.py
+import json
+import os
+import threading
+import time
+import logging
+from storage.codec import encode_player, decode_player
+from storage.journal import diff_records, apply_ops, encode_entry, append_entries, read_entries
+from storage.leaderboards import project
+from storage.writer import atomic_write
+
+logger = logging.getLogger(__name__)
+
+# Fold a guild's journal into the player files once it grows past this size...
+COMPACT_BYTES = 256 * 1024
+# ...or when its oldest uncompacted entry is this many seconds old
+COMPACT_INTERVAL = 60
+
+# Guilds that have been migrated and had their journal replayed in this process
+_prepared_guilds = set()
+
+# guild_id (str) -> {player_id: [encoded journal entries not yet folded into the player file]}
+_pending = {}
+
+# guild_id (str) -> time.monotonic() of the first entry appended since the last compaction
+_pending_since = {}
+
+# guild_id (str) -> {player_id: [entries a compaction in progress is folding into the player files]}
+_compacting = {}
+
+# The storage executor appends and compacts while the event loop can still read or delete players directly,
+# so the state above and the journal files only change under this lock
+_lock = threading.RLock()
+
+
+def players_dir(guild_id):
+    return f'server/{guild_id}/players'
+
+
+def player_path(guild_id, player_id):
+    return f'{players_dir(guild_id)}/{player_id}.json'
+
+
+def journal_path(guild_id):
+    return f'server/{guild_id}/journal.log'
+
+
+def compacting_journal_path(guild_id):
+    return f'{journal_path(guild_id)}.compacting'
+
+
+def write_player_file(file_path, player_data):
+    atomic_write(file_path, encode_player(player_data))
+
+
+def read_player_file(guild_id, player_id):
+    try:
+        with open(player_path(guild_id, player_id), 'rb') as f:
+            return decode_player(f.read())
+    except FileNotFoundError:
+        return None
+
+
+def migrate_guild(guild_id):
+    """Split the legacy server/<guild_id>/player_data.json into one file per player."""
+    directory = players_dir(guild_id)
+    os.makedirs(directory, exist_ok=True)
+
+    legacy_path = f'server/{guild_id}/player_data.json'
+    if os.path.exists(legacy_path):
+        with open(legacy_path, 'r') as f:
+            all_player_data = json.load(f)
+
+        for player_id, player_info in all_player_data.items():
+            file_path = player_path(guild_id, player_id)
+            # A shard written after an interrupted migration is newer than the legacy record
+            if not os.path.exists(file_path):
+                write_player_file(file_path, player_info)
+
+        # Keep the original around instead of deleting it, but make sure it is never read again
+        os.replace(legacy_path, f'{legacy_path}.migrated')
+        logger.info(f"Migrated {len(all_player_data)} players for guild ID {guild_id} to {directory}.")
+
+
+def prepare_guild(guild_id):
+    # Runs once per guild per process: migrate the old layout, then replay whatever the journal holds
+    guild_key = str(guild_id)
+    with _lock:
+        if guild_key in _prepared_guilds:
+            return
+
+        migrate_guild(guild_key)
+
+        # A compaction cut short by a crash leaves its entries in the rotated journal, older than the live one
+        replayed = _pending.setdefault(guild_key, {})
+        for path in (compacting_journal_path(guild_key), journal_path(guild_key)):
+            for player_id, line in read_entries(path):
+                replayed.setdefault(player_id, []).append(line)
+        if replayed:
+            logger.info(f"Replaying journal entries for {len(replayed)} players in guild ID {guild_key}.")
+            compact_guild(guild_key)
+
+        _prepared_guilds.add(guild_key)
+
+
+def _pending_lines(guild_key, player_id):
+    # Copied under the lock; entries being compacted are older than the ones appended since
+    with _lock:
+        return [*_compacting.get(guild_key, {}).get(player_id, ()), *_pending.get(guild_key, {}).get(player_id, ())]
+
+
+def _apply_lines(player_data, lines):
+    for line in lines:
+        player_data = apply_ops(player_data, json.loads(line)["ops"])
+    return player_data
+
+
+def _apply_pending(guild_key, player_id, player_data):
+    return _apply_lines(player_data, _pending_lines(guild_key, player_id))
+
+
+def read_player(guild_id, player_id):
+    guild_key = str(guild_id)
+    prepare_guild(guild_key)
+    return _apply_pending(guild_key, str(player_id), read_player_file(guild_key, player_id))
+
+
+def _iter_players(guild_id):
+    # One record at a time, so a scan only ever holds a single decoded player
+    guild_key = str(guild_id)
+    prepare_guild(guild_key)
+    directory = players_dir(guild_key)
+    player_ids = {file_name[:-len('.json')] for file_name in os.listdir(directory) if file_name.endswith('.json')}
+    with _lock:
+        player_ids.update(_compacting.get(guild_key, {}))
+        player_ids.update(_pending.get(guild_key, {}))
+
+    for player_id in player_ids:
+        player_data = _apply_pending(guild_key, player_id, read_player_file(guild_key, player_id))
+        if player_data is not None:
+            yield player_id, player_data
+
+
+def read_all_players(guild_id):
+    return dict(_iter_players(guild_id))
+
+
+def scan_players(guild_id, fields):
+    """{player_id: {field: value}} for every player, keeping only the requested dotted fields."""
+    return {player_id: project(player_data, fields) for player_id, player_data in _iter_players(guild_id)}
+
+
+def _append(guild_key, entries):
+    # The journal and _pending change together, so a compaction never truncates entries it has not folded
+    with _lock:
+        append_entries(journal_path(guild_key), [line for _, line in entries])
+        pending = _pending.setdefault(guild_key, {})
+        for player_id, line in entries:
+            pending.setdefault(player_id, []).append(line)
+        _pending_since.setdefault(guild_key, time.monotonic())
+
+
+def write_players(guild_id, changes):
+    """Record (player_id, snapshot, previous snapshot or None) changes as one journal append."""
+    guild_key = str(guild_id)
+    prepare_guild(guild_key)
+
+    entries = []
+    for player_id, player_data, previous in changes:
+        # Without a known previous state the whole record is written
+        ops = diff_records(previous, player_data) if previous is not None else [["set", [], player_data]]
+        if ops:
+            entries.append((str(player_id), encode_entry(str(player_id), ops)))
+    if entries:
+        _append(guild_key, entries)
+
+
+def write_player(guild_id, player_id, player_data):
+    write_players(guild_id, [(player_id, player_data, None)])
+
+
+def delete_player(guild_id, player_id):
+    guild_key = str(guild_id)
+    prepare_guild(guild_key)
+    _append(guild_key, [(str(player_id), encode_entry(str(player_id), [["del", []]]))])
+
+
+def _rotate(guild_key):
+    # Swap the pending entries out and move them to the rotated journal in one step, so appends from here on
+    # start a fresh journal that the end of this compaction will not touch
+    with _lock:
+        compacting = _pending.get(guild_key, {})
+        atomic_write(compacting_journal_path(guild_key), ''.join(f'{line}\n' for lines in compacting.values() for line in lines))
+        open(journal_path(guild_key), 'w').close()
+        _compacting[guild_key] = compacting
+        _pending[guild_key] = {}
+        _pending_since.pop(guild_key, None)
+    return compacting
+
+
+def _restore(guild_key):
+    # A failed compaction puts its entries back ahead of anything appended since; both journals still hold them
+    with _lock:
+        compacting = _compacting.pop(guild_key, {})
+        pending = _pending.setdefault(guild_key, {})
+        for player_id, lines in compacting.items():
+            pending[player_id] = lines + pending.get(player_id, [])
+        if compacting:
+            _pending_since[guild_key] = time.monotonic()
+
+
+def compact_guild(guild_id):
+    """Fold the journal into the per-player files, then drop the folded entries."""
+    guild_key = str(guild_id)
+    compacting = _rotate(guild_key)
+    try:
+        # Readers apply the entries being folded on top of whichever version of a file they see, which is safe
+        # because replaying an entry twice is harmless
+        for player_id, lines in compacting.items():
+            player_data = _apply_lines(read_player_file(guild_key, player_id), lines)
+            if player_data is None:
+                try:
+                    os.remove(player_path(guild_key, player_id))
+                except FileNotFoundError:
+                    pass
+            else:
+                write_player_file(player_path(guild_key, player_id), player_data)
+    except Exception:
+        _restore(guild_key)
+        raise
+
+    # Only drop the rotated journal once every player file is up to date; a crash before this replays it
+    with _lock:
+        os.remove(compacting_journal_path(guild_key))
+        _compacting.pop(guild_key, None)
+
+
+def compact(force=False):
+    with _lock:
+        due = list(_pending_since.items())
+    for guild_key, since in due:
+        try:
+            size = os.path.getsize(journal_path(guild_key))
+        except FileNotFoundError:
+            size = 0
+        if force or size >= COMPACT_BYTES or time.monotonic() - since >= COMPACT_INTERVAL:
+            compact_guild(guild_key)
+
+
+if __name__ == "__main__":
+    # Migrate every guild and fold its journal up front instead of lazily on first access
+    logging.basicConfig(level=logging.INFO)
+    for guild_id in os.listdir('server'):
+        if os.path.isdir(f'server/{guild_id}'):
+            prepare_guild(guild_id)
@@ -0,0 +1,94 @@
+# settings.py
+import json
+import os
+import time
+import logging
+from probabilities import default_settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds a cached snapshot is trusted before server_settings.json's mtime is checked for outside edits
+MTIME_CHECK_INTERVAL = 2
+
+
+class ServerSettings:
+    """Read-only snapshot of a guild's settings; every key in probabilities.default_settings is an attribute."""
+
+    __slots__ = tuple(default_settings) + ('mtime', 'checked_at')
+
+    def __init__(self, settings, mtime):
+        for name, default in default_settings.items():
+            value = settings.get(name, default)
+            # The /settings modal stores floats, so coerce back to the type of the default (e.g. tent_health)
+            try:
+                value = type(default)(value)
+            except (TypeError, ValueError):
+                logger.error(f"Invalid value {value!r} for setting {name}, using default {default}.")
+                value = default
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, 'mtime', mtime)
+        object.__setattr__(self, 'checked_at', time.monotonic())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Server settings are read-only; use save_server_settings to change them")
+
+    def get(self, setting_name, default=None):
+        return getattr(self, setting_name, default)
+
+
+# guild_id (str) -> ServerSettings
+_snapshots = {}
+
+
+def settings_path(guild_id):
+    return f'server/{guild_id}/server_settings.json'
+
+
+def read_server_settings(guild_id):
+    file_path = settings_path(guild_id)
+    try:
+        mtime = os.stat(file_path).st_mtime_ns
+        with open(file_path, 'r') as f:
+            settings = json.load(f)
+    except FileNotFoundError:
+        logger.error(f"Settings file not found for guild ID {guild_id}, using defaults.")
+        return ServerSettings({}, None)
+    except json.JSONDecodeError:
+        logger.error(f"JSON decoding error in settings file for guild ID {guild_id}, using defaults.")
+        return ServerSettings({}, None)
+    return ServerSettings(settings, mtime)
+
+
+def _is_fresh(snapshot, guild_id):
+    if time.monotonic() - snapshot.checked_at < MTIME_CHECK_INTERVAL:
+        return True
+    try:
+        mtime = os.stat(settings_path(guild_id)).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    if mtime != snapshot.mtime:
+        return False
+    object.__setattr__(snapshot, 'checked_at', time.monotonic())
+    return True
+
+
+def server_settings(guild_id):
+    guild_key = str(guild_id)
+    snapshot = _snapshots.get(guild_key)
+    if snapshot is None or not _is_fresh(snapshot, guild_key):
+        snapshot = _snapshots[guild_key] = read_server_settings(guild_key)
+    return snapshot
+
+
+async def aserver_settings(guild_id):
+    from storage.store import run_in_storage_executor
+
+    guild_key = str(guild_id)
+    snapshot = _snapshots.get(guild_key)
+    if snapshot is None or not _is_fresh(snapshot, guild_key):
+        snapshot = _snapshots[guild_key] = await run_in_storage_executor(read_server_settings, guild_key)
+    return snapshot
+
+
+def invalidate_server_settings(guild_id):
+    _snapshots.pop(str(guild_id), None)
@@ -0,0 +1,164 @@
+# sqlite_backend.py
+import json
+import os
+import sqlite3
+import threading
+import logging
+from storage.leaderboards import LEADERBOARD_METRICS, MONSTER_NAMES, metric_value
+
+logger = logging.getLogger(__name__)
+
+DATABASE_PATH = 'server/players.db'
+
+# Leaderboard metrics stored as real columns on the players table, so the leaderboard index loads without decoding records
+METRIC_COLUMNS = {
+    'stats.combat_experience': 'combat_experience',
+    'stats.mining_experience': 'mining_experience',
+    'stats.woodcutting_experience': 'woodcutting_experience',
+    'dice_stats.total_games': 'total_games',
+    'dice_stats.games_won': 'games_won',
+    'dice_stats.games_lost': 'games_lost',
+    'dice_stats.coppers_won': 'coppers_won',
+    'inventory.coppers': 'coppers',
+    'inventory.materium': 'materium',
+}
+
+# Each thread (event loop, storage executor) gets its own connection; with WAL readers never block the writer
+_local = threading.local()
+
+
+def create_schema(conn):
+    columns = ', '.join(f'{column} INTEGER NOT NULL DEFAULT 0' for column in METRIC_COLUMNS.values())
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS players (
+            guild_id TEXT NOT NULL,
+            player_id TEXT NOT NULL,
+            {columns},
+            data TEXT NOT NULL,
+            PRIMARY KEY (guild_id, player_id)
+        )''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS monster_kills (
+            guild_id TEXT NOT NULL,
+            player_id TEXT NOT NULL,
+            monster TEXT NOT NULL,
+            kills INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (guild_id, player_id, monster)
+        )''')
+    # Rankings come from the in-memory leaderboard index, so per-metric indexes would only slow down every save
+    for column in METRIC_COLUMNS.values():
+        conn.execute(f'DROP INDEX IF EXISTS players_{column}')
+    conn.execute('DROP INDEX IF EXISTS monster_kills_rank')
+
+
+def connection():
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
+        conn = sqlite3.connect(DATABASE_PATH)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        with conn:
+            create_schema(conn)
+        _local.conn = conn
+    return conn
+
+
+def read_player(guild_id, player_id):
+    row = connection().execute(
+        'SELECT data FROM players WHERE guild_id = ? AND player_id = ?', (str(guild_id), str(player_id))
+    ).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def read_all_players(guild_id):
+    rows = connection().execute('SELECT player_id, data FROM players WHERE guild_id = ?', (str(guild_id),))
+    return {player_id: json.loads(data) for player_id, data in rows}
+
+
+def scan_players(guild_id, fields):
+    # SQLite pulls the paths out and hands back one small JSON array per player; the full record is never decoded in Python
+    paths = ['$' + ''.join(f'."{part}"' for part in field.split('.')) for field in fields]
+    rows = connection().execute(
+        f'SELECT player_id, json_array({", ".join("json_extract(data, ?)" for _ in paths)}) FROM players WHERE guild_id = ?',
+        (*paths, str(guild_id)))
+    return {player_id: dict(zip(fields, json.loads(values))) for player_id, values in rows}
+
+
+def _upsert(conn, guild_id, player_id, player_data):
+    from utils import ExemplarJSONEncoder
+
+    columns = list(METRIC_COLUMNS.values())
+    values = [metric_value(player_data, metric) for metric in METRIC_COLUMNS]
+    data = json.dumps(player_data, cls=ExemplarJSONEncoder)
+
+    # Upsert touches only this player's row; nothing else in the guild is rewritten
+    conn.execute(
+        f'''INSERT INTO players (guild_id, player_id, {', '.join(columns)}, data)
+            VALUES (?, ?, {', '.join('?' for _ in columns)}, ?)
+            ON CONFLICT (guild_id, player_id) DO UPDATE SET
+            {', '.join(f'{column} = excluded.{column}' for column in columns)}, data = excluded.data''',
+        [guild_id, player_id, *values, data])
+    conn.executemany(
+        '''INSERT INTO monster_kills (guild_id, player_id, monster, kills) VALUES (?, ?, ?, ?)
+           ON CONFLICT (guild_id, player_id, monster) DO UPDATE SET kills = excluded.kills''',
+        [(guild_id, player_id, monster, metric_value(player_data, f'monster_kills.{monster}')) for monster in MONSTER_NAMES])
+
+
+def write_player(guild_id, player_id, player_data):
+    conn = connection()
+    with conn:
+        _upsert(conn, str(guild_id), str(player_id), player_data)
+
+
+def write_players(guild_id, changes):
+    # WAL already journals for us, so a batch is simply one transaction; the previous snapshot is not needed
+    conn = connection()
+    with conn:
+        for player_id, player_data, previous in changes:
+            _upsert(conn, str(guild_id), str(player_id), player_data)
+
+
+def delete_player(guild_id, player_id):
+    conn = connection()
+    with conn:
+        conn.execute('DELETE FROM players WHERE guild_id = ? AND player_id = ?', (str(guild_id), str(player_id)))
+        conn.execute('DELETE FROM monster_kills WHERE guild_id = ? AND player_id = ?', (str(guild_id), str(player_id)))
+
+
+def scan_leaderboards(guild_id):
+    """scan_players(guild_id, LEADERBOARD_METRICS), read from the metric columns and monster_kills instead of the JSON."""
+    guild_key = str(guild_id)
+    conn = connection()
+    scanned = {}
+    rows = conn.execute(f'SELECT player_id, {", ".join(METRIC_COLUMNS.values())} FROM players WHERE guild_id = ?', (guild_key,))
+    for player_id, *values in rows:
+        fields = scanned[player_id] = dict.fromkeys(LEADERBOARD_METRICS, 0)
+        fields.update(zip(METRIC_COLUMNS, values))
+    for player_id, monster, kills in conn.execute(
+            'SELECT player_id, monster, kills FROM monster_kills WHERE guild_id = ?', (guild_key,)):
+        if player_id in scanned:
+            scanned[player_id][f'monster_kills.{monster}'] = kills
+    return scanned
+
+
+def migrate_json_to_sqlite():
+    """Copy every guild's JSON player data (legacy player_data.json, per-player shards and journal) into the database."""
+    from storage import players as json_backend
+
+    for guild_id in os.listdir('server'):
+        guild_dir = f'server/{guild_id}'
+        if not os.path.isdir(guild_dir):
+            continue
+
+        # Goes through the JSON backend so legacy files are split and journals replayed first
+        all_player_data = json_backend.read_all_players(guild_id)
+
+        for player_id, player_data in all_player_data.items():
+            write_player(guild_id, player_id, player_data)
+        logger.info(f"Migrated {len(all_player_data)} players for guild ID {guild_id} into {DATABASE_PATH}.")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    migrate_json_to_sqlite()
@@ -0,0 +1,361 @@
+# store.py
+import asyncio
+import atexit
+import logging
+import os
+import weakref
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from resources.inventory import Inventory
+from storage.leaderboards import LEADERBOARD_METRICS, leaderboard_index, project
+from storage.writer import group_writer
+
+# PLAYER_STORAGE_BACKEND=sqlite keeps players in server/players.db instead of per-player JSON files
+if os.environ.get("PLAYER_STORAGE_BACKEND") == "sqlite":
+    from storage import sqlite_backend as backend
+else:
+    from storage import players as backend
+
+logger = logging.getLogger(__name__)
+
+# How many players stay hydrated in memory before the least recently used ones are evicted
+MAX_CACHED_PLAYERS = 1000
+
+# Seconds between background sweeps for anything a commit missed, and journal compaction
+FLUSH_INTERVAL = 5
+
+
+# Every disk read, write and (de)serialization runs here instead of on the event loop.
+# A single worker keeps writes to the same file in order.
+storage_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="storage")
+
+
+async def run_in_storage_executor(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(storage_executor, func, *args)
+
+
+class LazyInventory:
+    """Raw inventory data that only becomes an Inventory on first use, so bulk loads skip building every item object."""
+
+    __slots__ = ('_data', '_inventory')
+
+    def __init__(self, data):
+        object.__setattr__(self, '_data', data)
+        object.__setattr__(self, '_inventory', None)
+
+    def hydrate(self):
+        if self._inventory is None:
+            object.__setattr__(self, '_inventory', Inventory.from_dict(self._data))
+            object.__setattr__(self, '_data', None)
+        return self._inventory
+
+    def to_dict(self):
+        # Untouched inventories go back out exactly as they came in
+        return self._inventory.to_dict() if self._inventory is not None else dict(self._data)
+
+    def __getattr__(self, name):
+        return getattr(self.hydrate(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.hydrate(), name, value)
+
+
+def hydrate_player(player_data):
+    # Bring a record into the shape handlers expect: a live Inventory and a plain stats dict
+    inventory = player_data.get("inventory")
+    if isinstance(inventory, dict):
+        player_data["inventory"] = Inventory.from_dict(inventory)
+    elif isinstance(inventory, LazyInventory):
+        player_data["inventory"] = inventory.hydrate()
+    stats = player_data.get("stats")
+    if stats is not None and not isinstance(stats, dict):
+        player_data["stats"] = dict(vars(stats))
+    return player_data
+
+
+def hydrate_all_lazily(all_player_data):
+    # Stats stay plain dicts; inventories wait until something actually reads them
+    for player_id, player_data in all_player_data.items():
+        if isinstance(player_data.get("inventory"), dict):
+            player_data["inventory"] = LazyInventory(player_data["inventory"])
+    return all_player_data
+
+
+def snapshot_player(player_data):
+    # Plain-data copy taken on the event loop, so the executor can encode it while handlers keep mutating the live record
+    snapshot = {}
+    for field, value in player_data.items():
+        if isinstance(value, (Inventory, LazyInventory)):
+            value = value.to_dict()
+        elif isinstance(value, dict):
+            value = dict(value)
+        snapshot[field] = value
+    return snapshot
+
+
+class PlayerStore:
+    """Write-back cache of hydrated player records shared by every handler in the process."""
+
+    def __init__(self, max_players=MAX_CACHED_PLAYERS):
+        self.max_players = max_players
+        self.records = OrderedDict()
+        # Plain-data copy of what the backend last stored for each cached player, so flushes can send only the delta
+        self.persisted = {}
+        self.dirty = set()
+        # Snapshots of a cached player handed to the executor and not yet confirmed, per player
+        self.writing = Counter()
+        self.flush_task = None
+        # Per-player locks for read-modify-write sessions; an entry goes away once nobody holds or waits on it
+        self.locks = weakref.WeakValueDictionary()
+
+    @staticmethod
+    def key(guild_id, player_id):
+        return str(guild_id), str(player_id)
+
+    def lock(self, guild_id, player_id):
+        key = self.key(guild_id, player_id)
+        lock = self.locks.get(key)
+        if lock is None:
+            lock = self.locks[key] = asyncio.Lock()
+        return lock
+
+    def get(self, guild_id, player_id):
+        key = self.key(guild_id, player_id)
+        player_data = self.records.get(key)
+        if player_data is not None:
+            self.records.move_to_end(key)
+            return player_data
+
+        loaded = self._read_hydrated(key)
+        if loaded is None:
+            return None
+
+        player_data, self.persisted[key] = loaded
+        self._insert(key, player_data)
+        return player_data
+
+    async def aget(self, guild_id, player_id):
+        key = self.key(guild_id, player_id)
+        player_data = self.records.get(key)
+        if player_data is not None:
+            self.records.move_to_end(key)
+            return player_data
+
+        loaded = await run_in_storage_executor(self._read_hydrated, key)
+        if loaded is None:
+            return None
+
+        # Another handler may have loaded (and changed) this player while we were waiting on the executor
+        cached = self.records.get(key)
+        if cached is not None:
+            return cached
+
+        player_data, self.persisted[key] = loaded
+        self._insert(key, player_data)
+        return player_data
+
+    @staticmethod
+    def _read_hydrated(key):
+        player_data = backend.read_player(*key)
+        if player_data is None:
+            return None
+        player_data = hydrate_player(player_data)
+        return player_data, snapshot_player(player_data)
+
+    def get_all(self, guild_id):
+        all_player_data = backend.read_all_players(str(guild_id))
+        return self._overlay_cached(guild_id, hydrate_all_lazily(all_player_data))
+
+    async def aget_all(self, guild_id):
+        all_player_data = await run_in_storage_executor(lambda: hydrate_all_lazily(backend.read_all_players(str(guild_id))))
+        return self._overlay_cached(guild_id, all_player_data)
+
+    def scan(self, guild_id, fields):
+        return self._overlay_cached(guild_id, backend.scan_players(str(guild_id), fields), fields)
+
+    async def ascan(self, guild_id, fields):
+        scanned = await run_in_storage_executor(backend.scan_players, str(guild_id), fields)
+        return self._overlay_cached(guild_id, scanned, fields)
+
+    def _overlay_cached(self, guild_id, all_player_data, fields=None):
+        # Players already in memory may hold changes that have not reached disk yet
+        guild_key = str(guild_id)
+        for (cached_guild, player_id), player_data in self.records.items():
+            if cached_guild == guild_key:
+                all_player_data[player_id] = player_data if fields is None else project(player_data, fields)
+        return all_player_data
+
+    @staticmethod
+    def _scan_leaderboards(guild_id):
+        # The SQLite backend keeps every leaderboard metric in its own column, so it can skip the records entirely
+        if hasattr(backend, 'scan_leaderboards'):
+            return backend.scan_leaderboards(str(guild_id))
+        return backend.scan_players(str(guild_id), LEADERBOARD_METRICS)
+
+    def top_players(self, guild_id, metric, limit=5):
+        if not leaderboard_index.is_built(guild_id):
+            scanned = self._overlay_cached(guild_id, self._scan_leaderboards(guild_id), LEADERBOARD_METRICS)
+            leaderboard_index.build(guild_id, scanned)
+        return leaderboard_index.top(guild_id, metric, limit)
+
+    async def atop_players(self, guild_id, metric, limit=5):
+        await self.load_leaderboards(guild_id)
+        return leaderboard_index.top(guild_id, metric, limit)
+
+    async def arank(self, guild_id, metric, player_id, radius=2):
+        await self.load_leaderboards(guild_id)
+        return leaderboard_index.rank(guild_id, metric, player_id, radius)
+
+    async def load_leaderboards(self, guild_id):
+        # One projected scan per guild per process; saves keep the index current after that
+        if not leaderboard_index.is_built(guild_id):
+            scanned = await run_in_storage_executor(self._scan_leaderboards, guild_id)
+            scanned = self._overlay_cached(guild_id, scanned, LEADERBOARD_METRICS)
+            # Another query may have built it while we were scanning, with saves applied since
+            if not leaderboard_index.is_built(guild_id):
+                leaderboard_index.build(guild_id, scanned)
+
+    def put(self, guild_id, player_id, player_data):
+        key = self.key(guild_id, player_id)
+        self._insert(key, hydrate_player(player_data))
+        self.dirty.add(key)
+        leaderboard_index.update(guild_id, player_id, player_data)
+        return self.commit(guild_id)
+
+    def commit(self, guild_id):
+        """Flush the guild's dirty players at the end of the current commit window; await the result for durability."""
+        try:
+            return group_writer.schedule(('players', str(guild_id)), lambda: self.aflush(guild_id))
+        except RuntimeError:
+            # No running event loop (scripts, interpreter shutdown), so write right away
+            self.flush(guild_id)
+            return None
+
+    def _forget(self, key):
+        self.records.pop(key, None)
+        self.persisted.pop(key, None)
+        self.dirty.discard(key)
+
+    def remove(self, guild_id, player_id):
+        key = self.key(guild_id, player_id)
+        self._forget(key)
+        leaderboard_index.remove(*key)
+        backend.delete_player(*key)
+
+    async def aremove(self, guild_id, player_id):
+        key = self.key(guild_id, player_id)
+        self._forget(key)
+        leaderboard_index.remove(*key)
+        await run_in_storage_executor(backend.delete_player, *key)
+
+    def _evictable(self, key):
+        # A lock only lives while a session holds or waits on it, and that session keeps using the cached record;
+        # a flush in flight still has to record what it wrote. Evicting either would leave two diverging copies.
+        return key not in self.locks and key not in self.writing
+
+    def _insert(self, key, player_data):
+        self.records[key] = player_data
+        self.records.move_to_end(key)
+
+        excess = len(self.records) - self.max_players
+        if excess <= 0:
+            return
+        # Least recently used first; players in use stay, even if that leaves the cache over its size for a while
+        evicted_keys = []
+        for candidate in self.records:
+            if len(evicted_keys) == excess:
+                break
+            if candidate != key and self._evictable(candidate):
+                evicted_keys.append(candidate)
+
+        for evicted_key in evicted_keys:
+            evicted_data = self.records.pop(evicted_key)
+            previous = self.persisted.pop(evicted_key, None)
+            if evicted_key in self.dirty:
+                # Queue it behind any in-flight flush instead of writing on the event loop
+                self.dirty.discard(evicted_key)
+                batches = {evicted_key[0]: [(evicted_key[1], snapshot_player(evicted_data), previous)]}
+                storage_executor.submit(self._write_batches, batches)
+
+    def _collect(self, guild_id=None):
+        # Take dirty players off the dirty list and snapshot them, grouped by guild
+        batches = {}
+        for key in list(self.dirty):
+            if guild_id is not None and key[0] != str(guild_id):
+                continue
+            self.dirty.discard(key)
+            player_data = self.records.get(key)
+            if player_data is not None:
+                batches.setdefault(key[0], []).append((key[1], snapshot_player(player_data), self.persisted.get(key)))
+                self.writing[key] += 1
+        return batches
+
+    @staticmethod
+    def _write_batches(batches):
+        # One backend call per guild; returns the keys that could not be written
+        failed = []
+        for guild_key, changes in batches.items():
+            try:
+                backend.write_players(guild_key, changes)
+            except Exception as e:
+                logger.error(f"Failed to save {len(changes)} players for guild ID {guild_key}: {e}")
+                failed.extend((guild_key, player_id) for player_id, _, _ in changes)
+        return failed
+
+    def _committed(self, batches, failed):
+        failed = set(failed)
+        for guild_key, changes in batches.items():
+            for player_id, snapshot, _ in changes:
+                key = (guild_key, player_id)
+                self.writing[key] -= 1
+                if self.writing[key] <= 0:
+                    del self.writing[key]
+                if key not in self.records:
+                    continue
+                if key in failed:
+                    # Back on the dirty list so the next flush retries
+                    self.dirty.add(key)
+                else:
+                    self.persisted[key] = snapshot
+
+    def flush(self, guild_id=None):
+        batches = self._collect(guild_id)
+        if batches:
+            self._committed(batches, self._write_batches(batches))
+
+    async def aflush(self, guild_id=None):
+        batches = self._collect(guild_id)
+        if batches:
+            try:
+                failed = await run_in_storage_executor(self._write_batches, batches)
+            except BaseException:
+                # Cancelled while the executor may or may not have written it, so treat the whole batch as failed
+                self._committed(batches, [(guild_key, player_id) for guild_key, changes in batches.items() for player_id, _, _ in changes])
+                raise
+            self._committed(batches, failed)
+
+    @staticmethod
+    def _compact():
+        # Backends with a journal fold it into their base files from time to time
+        if hasattr(backend, 'compact'):
+            try:
+                backend.compact()
+            except Exception as e:
+                logger.error(f"Journal compaction failed: {e}")
+
+    async def flush_loop(self):
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            await self.aflush()
+            await run_in_storage_executor(self._compact)
+
+    def start(self):
+        # on_ready fires again after reconnects, so only ever run one flush loop
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_task = asyncio.create_task(self.flush_loop())
+
+
+player_store = PlayerStore()
+
+# Whatever is still dirty when the process exits gets written out
+atexit.register(player_store.flush)
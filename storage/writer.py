@@ -0,0 +1,58 @@
+# writer.py
+import asyncio
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Saves for the same guild that arrive within this many seconds share one commit
+COMMIT_WINDOW = 0.05
+
+
+def atomic_write(file_path, data):
+    """Replace file_path with data (str or bytes) so readers only ever see the old or the new contents."""
+    temp_path = f'{file_path}.tmp'
+    with open(temp_path, 'wb' if isinstance(data, bytes) else 'w') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, file_path)
+
+
+class GroupCommitWriter:
+    """Coalesces commit requests for the same group that arrive within one window into a single commit."""
+
+    def __init__(self, window=COMMIT_WINDOW):
+        self.window = window
+        self.waiting = {}
+        # Requests received vs. commits actually run, to see how much coalescing saves
+        self.requests = 0
+        self.commits = 0
+
+    def schedule(self, group, commit):
+        """Run the coroutine function `commit` once at the end of this group's window; await the result for durability."""
+        loop = asyncio.get_running_loop()
+        self.requests += 1
+        future = self.waiting.get(group)
+        if future is None:
+            future = self.waiting[group] = loop.create_future()
+            # Nobody has to await durability, so make sure an unawaited failure is not reported twice
+            future.add_done_callback(lambda done: done.cancelled() or done.exception())
+            asyncio.create_task(self._run(group, commit, future))
+        return future
+
+    async def _run(self, group, commit, future):
+        await asyncio.sleep(self.window)
+        # Requests from here on start the next window; commit reads the latest state, so nothing is lost
+        del self.waiting[group]
+        self.commits += 1
+        try:
+            await commit()
+        except Exception as e:
+            logger.error(f"Commit for {group} failed: {e}")
+            future.set_exception(e)
+        else:
+            future.set_result(None)
+
+
+group_writer = GroupCommitWriter()
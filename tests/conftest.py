@@ -0,0 +1,6 @@
+# conftest.py
+import os
+import sys
+
+# The bot runs from the repository root and imports its modules top-level (utils, monsters.battle, ...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,86 @@
+# test_battle_footers.py
+import asyncio
+import builtins
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("discord")
+
+from monsters.monster import BattleContext
+from resources.mining import footer_text_for_mining_embed
+from resources.woodcutting import footer_text_for_woodcutting_embed
+from renderer import embed_renderer
+from storage import settings as server_settings_module
+from storage import store
+from storage.settings import ServerSettings
+
+# No server/<guild_id> folder exists for this guild, so settings come from a seeded snapshot and stay fresh
+GUILD_ID = 424243
+
+
+class FakeMessage:
+    id = 2000
+
+    def __init__(self):
+        self.edits = []
+
+    async def edit(self, **changes):
+        self.edits.append(changes)
+
+
+def make_player(charm=None):
+    stats = SimpleNamespace(zone_level=1, combat_level=12, combat_experience=4000, mining_level=9,
+                            woodcutting_level=7, health=40, max_health=50, stamina=30, max_stamina=50)
+    inventory = SimpleNamespace(equipped_charm=SimpleNamespace(name=charm) if charm else None)
+    return SimpleNamespace(stats=stats, inventory=inventory)
+
+
+@pytest.fixture
+def no_disk(monkeypatch):
+    """Fail the test on any player record read or file open from here on."""
+    monkeypatch.setitem(server_settings_module._snapshots, str(GUILD_ID), ServerSettings({}, None))
+    reads = []
+
+    def refuse(*args, **kwargs):
+        reads.append(args)
+        raise AssertionError(f"Footer code read from disk: {args!r}")
+
+    monkeypatch.setattr(store.backend, "read_player", refuse)
+    monkeypatch.setattr(builtins, "open", refuse)
+    return reads
+
+
+def test_battle_embed_updates_read_nothing(no_disk):
+    ctx = SimpleNamespace(guild=SimpleNamespace(id=GUILD_ID))
+    player = make_player("Ironhide")
+    monster = SimpleNamespace(name="Rat", health=20, max_health=20, is_defeated=lambda: monster.health <= 0)
+    message = FakeMessage()
+
+    async def fight():
+        context = BattleContext(ctx, SimpleNamespace(name="Tester"), player, monster, message, 1)
+        for damage in (5, 5, 5, 5):
+            monster.health -= damage
+            player.stats.stamina -= 1
+            await context.update_battle_embed()
+        await embed_renderer.flush(message)
+
+    asyncio.run(fight())
+
+    assert no_disk == []
+    # Swings inside one frame go out as a single edit showing the last state
+    assert len(message.edits) == 1
+    assert message.edits[0]["embed"].footer.text.startswith("⚔️ Combat: 12")
+
+
+def test_gathering_footers_read_nothing(no_disk):
+    ctx = SimpleNamespace(guild=SimpleNamespace(id=GUILD_ID), guild_id=GUILD_ID)
+    for charm in (None, "Stonebreaker", "Woodcleaver"):
+        player = make_player(charm)
+        for _ in range(3):
+            mining_footer = footer_text_for_mining_embed(ctx, player, player.stats.mining_level, 1, "Iron Ore")
+            woodcutting_footer = footer_text_for_woodcutting_embed(ctx, player, player.stats.woodcutting_level, 1, "Pine")
+
+        assert "Mining Level:\u00A0\u00A09" in mining_footer
+        assert "Woodcut Level:\u00A0\u00A07" in woodcutting_footer
+
+    assert no_disk == []
@@ -0,0 +1,165 @@
+# test_battle_session.py
+import asyncio
+from collections import Counter
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("discord")
+
+import stats
+import utils
+from monsters import session
+from monsters.session import BattleSession, WON, DIED
+from storage import settings as server_settings_module
+from storage.settings import ServerSettings
+from storage.store import hydrate_player
+
+# No server/<guild_id> folder exists for this guild, so settings come from a seeded snapshot and stay fresh
+GUILD_ID = 424242
+
+
+class FakeMessage:
+    def __init__(self, message_id):
+        self.id = message_id
+        self.edits = []
+        self.deleted = False
+
+    async def edit(self, **changes):
+        self.edits.append(changes)
+
+    async def delete(self):
+        self.deleted = True
+
+
+class FakeChannel:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, **kwargs):
+        message = FakeMessage(1000 + len(self.sent))
+        self.sent.append(message)
+        return message
+
+
+def make_player():
+    stats = SimpleNamespace(zone_level=1, combat_level=5, combat_experience=0, health=50, max_health=50,
+                            stamina=50, max_stamina=50, damage_taken=0)
+
+    async def gain_experience(experience, skill, interaction, player=None):
+        return []
+
+    return SimpleNamespace(stats=stats, inventory=None, gain_experience=gain_experience)
+
+
+@pytest.fixture
+def saves(monkeypatch):
+    """Every save a session makes, as (location, stats) at the time of the call."""
+    calls = []
+    records = {}
+
+    def put(guild_id, player_id, player_data):
+        hydrate_player(player_data)
+        records[str(player_id)] = player_data
+        calls.append((player_data["location"], dict(player_data["stats"])))
+
+    async def aget(guild_id, player_id):
+        return records.get(str(player_id))
+
+    channel = FakeChannel()
+
+    async def send_message(target, embed):
+        return await channel.send(embed=embed)
+
+    monkeypatch.setattr(utils.player_store, "put", put)
+    monkeypatch.setattr(utils.player_store, "aget", aget)
+    monkeypatch.setattr(session, "send_message", send_message)
+    # The views need a live gateway; the session only has to hand them its state
+    monkeypatch.setattr(session, "SpecialAttackOptions", lambda context, *args: SimpleNamespace(update_button_states=lambda: None))
+    monkeypatch.setattr(session, "BattleOptions", lambda *args: None)
+    monkeypatch.setattr(session, "LootOptions", lambda *args, **kwargs: None)
+    monkeypatch.setattr(stats, "ResurrectOptions", lambda *args: None)
+    monkeypatch.setitem(server_settings_module._snapshots, str(GUILD_ID), ServerSettings({}, None))
+    return calls
+
+
+def make_session(monkeypatch, battle_outcome, player_data=None):
+    async def monster_battle(context, guild_id):
+        await asyncio.sleep(0)
+        # The monster's ticks would have changed the player while the fight ran
+        context.player.stats.health = 0 if not battle_outcome[0] else 30
+        context.monster.health = 0 if battle_outcome[0] else context.monster.max_health
+        return battle_outcome, []
+
+    monkeypatch.setattr(session, "monster_battle", monster_battle)
+
+    channel = FakeChannel()
+    ctx = SimpleNamespace(guild=SimpleNamespace(id=GUILD_ID), guild_id=GUILD_ID, send=channel.send)
+    interaction = SimpleNamespace(channel=channel, followup=SimpleNamespace(send=channel.send))
+    player = make_player()
+    if player_data is None:
+        player_data = {"location": None, "stats": dict(vars(player.stats)), "monster_kills": Counter()}
+    monster = SimpleNamespace(name="Rat", health=1, max_health=20, experience_reward=15,
+                              is_defeated=lambda: monster.health <= 0)
+
+    return BattleSession(ctx, interaction, SimpleNamespace(name="Tester"), player, player_data, monster, GUILD_ID, 1)
+
+
+def run_fight(monkeypatch, battle_outcome):
+    battle = make_session(monkeypatch, battle_outcome)
+    return asyncio.run(battle.run()), battle.player_data
+
+
+def test_victory_persists_twice(monkeypatch, saves):
+    state, player_data = run_fight(monkeypatch, (True, 20, 20, None, None, False))
+
+    assert state == WON
+    assert [location for location, _ in saves] == ["battle", None]
+    assert saves[-1][1]["health"] == 30
+    assert player_data["monster_kills"]["Rat"] == 1
+
+
+def test_death_persists_twice(monkeypatch, saves):
+    state, player_data = run_fight(monkeypatch, (False, 0, 50, None, None, False))
+
+    assert state == DIED
+    assert [location for location, _ in saves] == ["battle", None]
+    assert saves[-1][1]["health"] == 0
+    assert player_data["monster_kills"]["Rat"] == 0
+
+
+def test_second_fight_on_the_same_player_is_rejected(monkeypatch, saves):
+    first = make_session(monkeypatch, (True, 20, 20, None, None, False))
+    second = make_session(monkeypatch, (True, 20, 20, None, None, False), first.player_data)
+
+    async def both_fights():
+        fight = asyncio.create_task(first.run())
+        await asyncio.sleep(0)
+        # The first fight has claimed the player and is waiting on Discord
+        assert first.player_data["location"] == "battle"
+        rejected = await second.run()
+        return await fight, rejected
+
+    state, rejected = asyncio.run(both_fights())
+
+    assert (state, rejected) == (WON, None)
+    assert [location for location, _ in saves] == ["battle", None]
+    assert first.player_data["monster_kills"]["Rat"] == 1
+
+
+def test_last_save_waits_for_a_session_on_the_player(monkeypatch, saves):
+    battle = make_session(monkeypatch, (True, 20, 20, None, None, False))
+
+    async def potion_during_fight():
+        assert battle.begin()
+        # A potion is being applied in its own session when the fight ends
+        async with utils.player_session(GUILD_ID, 1, player=battle.player) as potion:
+            fight = asyncio.create_task(battle.run())
+            for _ in range(5):
+                await asyncio.sleep(0)
+            assert not fight.done()
+            potion.player.stats.stamina = 40
+        return await fight
+
+    assert asyncio.run(potion_during_fight()) == WON
+    assert [location for location, _ in saves] == ["battle", None, None]
+    assert saves[-1][1]["stamina"] == 40
@@ -0,0 +1,77 @@
+# test_leaderboard_pages.py
+import asyncio
+import builtins
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("discord")
+
+import stats
+from exemplars.level_curve import LEVEL_CURVE
+from storage import store
+from storage.leaderboards import LEADERBOARD_METRICS, leaderboard_index
+
+GUILD_ID = 424245
+METRIC = 'stats.mining_experience'
+
+
+class FakeGuild:
+    id = GUILD_ID
+
+    def __init__(self, members):
+        self.members = members
+        self.lookups = 0
+
+    def get_member(self, member_id):
+        self.lookups += 1
+        return self.members.get(member_id)
+
+
+@pytest.fixture
+def guild(monkeypatch):
+    monkeypatch.setattr(leaderboard_index, "rankings", {})
+    monkeypatch.setattr(leaderboard_index, "values", {})
+    monkeypatch.setattr(leaderboard_index, "versions", {})
+    monkeypatch.setattr(stats, "leaderboard_pages", {})
+
+    # 25 miners, best first, plus one who never mined and stays off the board
+    scanned = {str(player_id): {metric: 0 for metric in LEADERBOARD_METRICS} for player_id in range(1, 27)}
+    for player_id in range(1, 26):
+        scanned[str(player_id)][METRIC] = (26 - player_id) * 1000
+    leaderboard_index.build(GUILD_ID, scanned)
+
+    def refuse(*args, **kwargs):
+        raise AssertionError(f"Leaderboard page read from disk: {args!r}")
+
+    for name in ("read_player", "read_all_players", "scan_players"):
+        monkeypatch.setattr(store.backend, name, refuse)
+    monkeypatch.setattr(builtins, "open", refuse)
+
+    members = {1: SimpleNamespace(display_name="Ore Baron", avatar=SimpleNamespace(url="https://example.com/1.png"))}
+    return FakeGuild(members)
+
+
+def test_pages_come_from_the_index_and_member_cache(guild):
+    async def build_pages():
+        return [await stats.leaderboard_page(guild, METRIC, page, LEVEL_CURVE.level_for_xp) for page in range(3)]
+
+    pages = asyncio.run(build_pages())
+
+    assert [total for total, _ in pages] == [25, 25, 25]
+    assert [len(rows) for _, rows in pages] == [10, 10, 5]
+
+    rank, player_id, player_name, avatar_url, level, experience = pages[0][1][0]
+    assert (rank, player_id, player_name, avatar_url) == (1, "1", "Ore Baron", "https://example.com/1.png")
+    assert (level, experience) == (LEVEL_CURVE.level_for_xp(25000), 25000)
+    assert pages[2][1][-1][:3] == (25, "25", "Unknown Player")
+
+
+def test_cached_pages_skip_member_lookups(guild):
+    async def build_twice():
+        await stats.leaderboard_page(guild, METRIC, 0, LEVEL_CURVE.level_for_xp)
+        lookups = guild.lookups
+        await stats.leaderboard_page(guild, METRIC, 0, LEVEL_CURVE.level_for_xp)
+        return lookups
+
+    assert asyncio.run(build_twice()) == 10
+    assert guild.lookups == 10
@@ -0,0 +1,122 @@
+# test_player_journal.py
+import threading
+import pytest
+
+pytest.importorskip("discord")
+
+import utils  # noqa: F401 (encode_entry looks up the JSON encoder there)
+from storage import players
+
+GUILD_ID = "424244"
+
+
+@pytest.fixture(autouse=True)
+def guild_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(players, "_prepared_guilds", set())
+    monkeypatch.setattr(players, "_pending", {})
+    monkeypatch.setattr(players, "_pending_since", {})
+    monkeypatch.setattr(players, "_compacting", {})
+    players.prepare_guild(GUILD_ID)
+
+
+def reload_guild():
+    # What a restarted process sees: only the files on disk
+    players._prepared_guilds.clear()
+    players._pending.clear()
+    players._pending_since.clear()
+    players._compacting.clear()
+
+
+def test_save_during_compaction_is_kept(monkeypatch):
+    players.write_player(GUILD_ID, "1", {"stats": {"n": 1}})
+    write_player_file = players.write_player_file
+
+    def write_and_save(file_path, player_data):
+        # Another save lands while the compaction is folding the journal into the player files
+        write_player_file(file_path, player_data)
+        players.write_player(GUILD_ID, "1", {"stats": {"n": 2}})
+
+    monkeypatch.setattr(players, "write_player_file", write_and_save)
+    players.compact_guild(GUILD_ID)
+    monkeypatch.setattr(players, "write_player_file", write_player_file)
+
+    assert players.read_player(GUILD_ID, "1") == {"stats": {"n": 2}}
+    reload_guild()
+    assert players.read_player(GUILD_ID, "1") == {"stats": {"n": 2}}
+
+
+def test_failed_compaction_keeps_entries(monkeypatch):
+    players.write_player(GUILD_ID, "1", {"stats": {"n": 1}})
+    write_player_file = players.write_player_file
+
+    def fail(file_path, player_data):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(players, "write_player_file", fail)
+    with pytest.raises(OSError):
+        players.compact_guild(GUILD_ID)
+    monkeypatch.setattr(players, "write_player_file", write_player_file)
+
+    players.write_player(GUILD_ID, "2", {"stats": {"n": 2}})
+    assert players.read_player(GUILD_ID, "1") == {"stats": {"n": 1}}
+
+    # The next compaction folds both the failed one's entries and the newer ones
+    players.compact_guild(GUILD_ID)
+    reload_guild()
+    assert players.read_player(GUILD_ID, "1") == {"stats": {"n": 1}}
+    assert players.read_player(GUILD_ID, "2") == {"stats": {"n": 2}}
+
+
+def test_interrupted_compaction_is_replayed(monkeypatch):
+    players.write_player(GUILD_ID, "1", {"stats": {"n": 1}})
+    write_player_file = players.write_player_file
+
+    def crash(file_path, player_data):
+        raise SystemExit
+
+    monkeypatch.setattr(players, "write_player_file", crash)
+    with pytest.raises(SystemExit):
+        players.compact_guild(GUILD_ID)
+    monkeypatch.setattr(players, "write_player_file", write_player_file)
+
+    # The process died with the entries only in the rotated journal
+    reload_guild()
+    assert players.read_player(GUILD_ID, "1") == {"stats": {"n": 1}}
+
+
+def test_concurrent_saves_reads_and_compactions():
+    saved = {}
+    done = threading.Event()
+    errors = []
+
+    def save():
+        for n in range(200):
+            player_id = str(n % 10)
+            players.write_players(GUILD_ID, [(player_id, {"stats": {"n": n}}, players.read_player(GUILD_ID, player_id))])
+            saved[player_id] = n
+        done.set()
+
+    def keep_compacting():
+        while not done.is_set():
+            try:
+                players.compact_guild(GUILD_ID)
+            except Exception as e:
+                errors.append(e)
+
+    def keep_reading():
+        while not done.is_set():
+            try:
+                players.read_all_players(GUILD_ID)
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=target) for target in (save, keep_compacting, keep_reading)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    reload_guild()
+    assert {player_id: players.read_player(GUILD_ID, player_id)["stats"]["n"] for player_id in saved} == saved
@@ -0,0 +1,90 @@
+# test_player_store.py
+import asyncio
+import threading
+from types import SimpleNamespace
+import pytest
+from storage import store
+from storage.store import PlayerStore
+
+GUILD_ID = "424247"
+
+
+@pytest.fixture
+def disk(monkeypatch):
+    """In-memory backend: {player_id: record} for this guild, with writes that can be held back."""
+    records = {str(player_id): {"stats": {"n": player_id}} for player_id in range(10)}
+    release = threading.Event()
+    release.set()
+
+    def read_player(guild_id, player_id):
+        record = records.get(str(player_id))
+        return {field: dict(value) for field, value in record.items()} if record else None
+
+    def write_players(guild_id, changes):
+        release.wait()
+        for player_id, player_data, previous in changes:
+            records[player_id] = player_data
+
+    monkeypatch.setattr(store.backend, "read_player", read_player)
+    monkeypatch.setattr(store.backend, "write_players", write_players)
+    return SimpleNamespace(records=records, release=release)
+
+
+def cached(player_store):
+    return [player_id for _, player_id in player_store.records]
+
+
+def test_least_recently_used_player_is_evicted(disk):
+    player_store = PlayerStore(max_players=2)
+    for player_id in range(3):
+        player_store.get(GUILD_ID, player_id)
+
+    assert cached(player_store) == ["1", "2"]
+
+
+def test_player_in_a_session_is_not_evicted(disk):
+    player_store = PlayerStore(max_players=2)
+
+    async def session_outlives_other_loads():
+        lock = player_store.lock(GUILD_ID, 0)
+        async with lock:
+            record = await player_store.aget(GUILD_ID, 0)
+            for player_id in range(1, 4):
+                await player_store.aget(GUILD_ID, player_id)
+            # Still the object the session is changing, so its save is the one the store keeps
+            assert player_store.records[(GUILD_ID, "0")] is record
+            assert cached(player_store) == ["0", "3"]
+
+    asyncio.run(session_outlives_other_loads())
+
+    # Once the session is over the player is an ordinary eviction candidate again
+    player_store.get(GUILD_ID, 4)
+    assert cached(player_store) == ["3", "4"]
+
+
+def test_player_with_a_write_in_flight_is_not_evicted(disk):
+    player_store = PlayerStore(max_players=2)
+
+    async def load_during_flush():
+        record = await player_store.aget(GUILD_ID, 0)
+        record["stats"]["n"] = 100
+        player_store.dirty.add((GUILD_ID, "0"))
+
+        disk.release.clear()
+        flush = asyncio.create_task(player_store.aflush(GUILD_ID))
+        await asyncio.sleep(0)
+        try:
+            for player_id in range(1, 4):
+                # The single storage worker is busy with the flush, so load these directly
+                player_store.get(GUILD_ID, player_id)
+            assert (GUILD_ID, "0") in player_store.records
+        finally:
+            disk.release.set()
+        await flush
+        assert player_store.persisted[(GUILD_ID, "0")]["stats"] == {"n": 100}
+
+    asyncio.run(load_during_flush())
+
+    player_store.get(GUILD_ID, 4)
+    assert cached(player_store) == ["3", "4"]
+    assert disk.records["0"]["stats"] == {"n": 100}
@@ -0,0 +1,47 @@
+# test_renderer.py
+import asyncio
+import pytest
+
+pytest.importorskip("discord")
+
+from renderer import EmbedRenderer
+
+
+class SlowMessage:
+    """A message whose edits take as long as the delay given for their content."""
+    id = 3000
+
+    def __init__(self, delays):
+        self.delays = delays
+        self.started = []
+        self.finished = []
+
+    async def edit(self, content):
+        self.started.append(content)
+        await asyncio.sleep(self.delays[content])
+        self.finished.append(content)
+
+
+def test_frames_of_one_message_are_sent_in_order():
+    message = SlowMessage({"first": 0.2, "second": 0})
+
+    async def two_frames():
+        renderer = EmbedRenderer(window=0.01)
+        first = renderer.edit(message, content="first")
+        await asyncio.sleep(0.05)
+        # The first frame is still being sent when the second one closes
+        assert message.started == ["first"]
+        second = renderer.edit(message, content="second")
+        await asyncio.sleep(0.05)
+        assert message.started == ["first"]
+
+        await renderer.flush(message)
+        # flush returns only once every edit of the message is done, not just the newest one
+        assert first.done() and second.done()
+        assert renderer.in_flight == {}
+        return renderer.metrics()
+
+    metrics = asyncio.run(two_frames())
+
+    assert message.finished == ["first", "second"]
+    assert metrics["sent"] == 2
@@ -0,0 +1,70 @@
+# test_simulator.py
+import random
+from types import SimpleNamespace
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from gamedata import game_data
+from probabilities import default_settings
+from storage.settings import ServerSettings
+from monsters import engine
+from monsters.simulator import simulate, build_fighter, OUTCOMES
+
+FIGHTS = 5000
+SEED = 7
+
+
+def carried_potions():
+    potions = game_data().potions_by_name
+    return {name: (potions[name].effect_value, 2) for name in ("Health Potion", "Stamina Potion")}
+
+
+@pytest.mark.parametrize("monster_name, level, weapon_damage, special_attack, charm", [
+    # Unarmed and outmatched: wins, deaths and runs all happen
+    ("Goblin", 5, 0, 0, None),
+    ("Goblin", 5, 0, 0, "Ironhide"),
+    ("Wolf", 2, 3, 1, "Mightstone"),
+])
+def test_simulate_matches_resolve_fight(monster_name, level, weapon_damage, special_attack, charm):
+    settings = ServerSettings(default_settings, None)
+    monster = game_data().monster_stats(monster_name, 1)
+    fighter = build_fighter("human", level, weapon_damage, special_attack, 0, charm, carried_potions())
+
+    results = simulate(fighter, monster, settings, FIGHTS, max_duration=600, seed=SEED)
+    rng = random.Random(SEED)
+    fights = [engine.resolve_fight(fighter, monster, settings, max_duration=600, rng=rng) for _ in range(FIGHTS)]
+
+    for code, label in OUTCOMES.items():
+        simulated = float(np.mean(results["outcome"] == code))
+        resolved = sum(fight.outcome == label for fight in fights) / FIGHTS
+        assert simulated == pytest.approx(resolved, abs=0.03), label
+
+    simulated_damage = float(results["damage_taken"].mean())
+    resolved_damage = sum(fight.damage_taken for fight in fights) / FIGHTS
+    assert simulated_damage == pytest.approx(resolved_damage, rel=0.05, abs=1)
+
+
+def test_live_battle_rolls_are_the_engine_rolls(monkeypatch):
+    pytest.importorskip("discord")
+    from monsters import monster
+    from storage import settings as server_settings_module
+
+    guild_id = 424248
+    settings = ServerSettings(default_settings, None)
+    monkeypatch.setitem(server_settings_module._snapshots, str(guild_id), settings)
+
+    def wearing(charm):
+        return SimpleNamespace(inventory=SimpleNamespace(equipped_charm=SimpleNamespace(name=charm) if charm else None))
+
+    for charm in (None, "Ironhide", "Mightstone"):
+        player = wearing(charm)
+        for attack, defense in ((3, 40), (12, 12), (60, 4)):
+            assert monster.calculate_hit_probability(attack, defense, guild_id, player) == \
+                engine.hit_probability(attack, defense, settings, charm == "Ironhide")
+
+            for is_critical_hit in (False, True):
+                random.seed(attack * defense)
+                live = monster.calculate_damage(player, attack, defense, guild_id, is_critical_hit)
+                random.seed(attack * defense)
+                assert live == engine.roll_damage(attack, defense, settings, is_critical_hit, charm == "Mightstone")
@@ -0,0 +1,37 @@
+# test_sqlite_backend.py
+import threading
+import pytest
+
+pytest.importorskip("discord")
+
+import utils  # noqa: F401 (_upsert looks up the JSON encoder there)
+from storage import sqlite_backend
+from storage.leaderboards import LEADERBOARD_METRICS
+
+GUILD_ID = "424246"
+
+
+@pytest.fixture(autouse=True)
+def database(tmp_path, monkeypatch):
+    monkeypatch.setattr(sqlite_backend, "DATABASE_PATH", str(tmp_path / "players.db"))
+    monkeypatch.setattr(sqlite_backend, "_local", threading.local())
+
+
+def test_scan_leaderboards_matches_a_record_scan():
+    sqlite_backend.write_players(GUILD_ID, [
+        ("1", {"stats": {"combat_experience": 900, "mining_experience": 40}, "monster_kills": {"Wolf": 3, "Kraken": 1},
+               "inventory": {"coppers": 120, "materium": 2}, "dice_stats": {"games_won": 5}}, None),
+        ("2", {"stats": {"woodcutting_experience": 75}, "monster_kills": {}, "inventory": {}}, None),
+    ])
+    sqlite_backend.write_player("elsewhere", "3", {"stats": {"combat_experience": 10}})
+
+    scanned = sqlite_backend.scan_players(GUILD_ID, LEADERBOARD_METRICS)
+    expected = {player_id: {metric: value or 0 for metric, value in fields.items()} for player_id, fields in scanned.items()}
+    assert sqlite_backend.scan_leaderboards(GUILD_ID) == expected
+
+
+def test_deleted_players_leave_the_scan():
+    sqlite_backend.write_player(GUILD_ID, "1", {"stats": {"combat_experience": 900}, "monster_kills": {"Wolf": 3}})
+    sqlite_backend.delete_player(GUILD_ID, "1")
+
+    assert sqlite_backend.scan_leaderboards(GUILD_ID) == {}
@@ -9,88 +9,87 @@ from resources.ore import Gem, Ore
 from resources.tree import Tree
 from discord.ext import commands
 import random
+import asyncio
 from images.urls import generate_urls
 import logging
+from storage.store import player_store, run_in_storage_executor, LazyInventory
+from storage.settings import server_settings, aserver_settings, invalidate_server_settings
+from storage.writer import atomic_write, group_writer
 
 class ExemplarJSONEncoder(json.JSONEncoder):
+    # Looked up by type instead of walking an isinstance chain; subclasses (Weapon, Armor...) resolve through their MRO
+    encoders = {
+        Exemplar: vars,
+        Inventory: vars,
+        LazyInventory: lambda obj: obj.to_dict(),
+        PlayerStats: vars,
+        Item: lambda obj: obj.to_dict(),
+        Herb: lambda obj: obj.to_dict(),
+        Gem: lambda obj: obj.to_dict(),
+        Ore: lambda obj: obj.to_dict(),
+        Tree: lambda obj: obj.to_dict(),
+    }
+
     def default(self, obj):
-        if isinstance(obj, Exemplar):
-            return obj.__dict__
-        elif isinstance(obj, Inventory):
-            return obj.__dict__
-        elif isinstance(obj, PlayerStats):
-            return obj.__dict__
-        elif isinstance(obj, Item):
-            return obj.to_dict()
-        elif isinstance(obj, Herb):
-            return obj.to_dict()
-        elif isinstance(obj, Gem):
-            return obj.to_dict()
-        elif isinstance(obj, Ore):
-            return obj.to_dict()
-        elif isinstance(obj, Tree):
-            return obj.to_dict()
-        else:
-            return super().default(obj)
+        for cls in type(obj).__mro__:
+            encode = self.encoders.get(cls)
+            if encode is not None:
+                return encode(obj)
+        return super().default(obj)
 
 def load_player_data(guild_id, player_id):
-    file_path = f'server/{guild_id}/player_data.json'
-    with open(file_path, 'r') as f:
-        all_player_data = json.load(f)
-
-    player_id_str = str(player_id)
-    if player_id_str in all_player_data:
-        player_data = all_player_data[player_id_str]
-        player_data["inventory"] = Inventory.from_dict(player_data["inventory"])
-        return player_data
-    else:
-        return None
+    # Served from the in-memory store; only a cold player touches disk
+    return player_store.get(guild_id, player_id)
 
 def load_all_player_data(guild_id):
-    file_path = f'server/{guild_id}/player_data.json'
-    with open(file_path, 'r') as f:
-        all_player_data = json.load(f)
+    # Inventories are only built for the players whose inventory actually gets used
+    return player_store.get_all(guild_id)
 
-    for player_id, player_info in all_player_data.items():
-        player_info["inventory"] = Inventory.from_dict(player_info["inventory"])
-    return all_player_data
+def scan_players(guild_id, fields):
+    # Just the requested dotted fields per player, e.g. scan_players(guild_id, ["stats.combat_experience"])
+    return player_store.scan(guild_id, fields)
 
 def save_player_data(guild_id, player_id, updated_player_data):
-    file_path = f'server/{guild_id}/player_data.json'
-    with open(file_path, 'r') as f:
-        all_player_data = json.load(f)
+    # Marks the player dirty; the store writes it out with the guild's next group commit
+    player_store.put(guild_id, player_id, updated_player_data)
 
-    all_player_data[str(player_id)] = updated_player_data
+# Async variants for coroutine handlers: cache hits stay on the loop, disk work runs on the storage executor
+async def aload_player_data(guild_id, player_id):
+    return await player_store.aget(guild_id, player_id)
 
-    with open(file_path, 'w') as f:
-        json.dump(all_player_data, f, indent=4, cls=ExemplarJSONEncoder)
+async def aload_all_player_data(guild_id):
+    return await player_store.aget_all(guild_id)
 
-def remove_player_data(guild_id, player_id):
-    file_path = f'server/{guild_id}/player_data.json'
-    with open(file_path, 'r') as f:
-        all_player_data = json.load(f)
+async def ascan_players(guild_id, fields):
+    return await player_store.ascan(guild_id, fields)
+
+async def asave_player_data(guild_id, player_id, updated_player_data, durable=False):
+    # Saves within the same commit window share one write; pass durable=True to wait until it is on disk
+    commit = player_store.put(guild_id, player_id, updated_player_data)
+    if durable and commit is not None:
+        await commit
 
-    player_id_str = str(player_id)
-    if player_id_str in all_player_data:
-        del all_player_data[player_id_str]
+async def aremove_player_data(guild_id, player_id):
+    await player_store.aremove(guild_id, player_id)
 
-    with open(file_path, 'w') as f:
-        json.dump(all_player_data, f, indent=4, cls=ExemplarJSONEncoder)
+async def atop_players(guild_id, metric, limit=5):
+    return await player_store.atop_players(guild_id, metric, limit)
+
+async def aplayer_rank(guild_id, player_id, metric, radius=2):
+    # (rank, total, [(rank, player_id, value), ...]) around the player, or None if they have no record
+    return await player_store.arank(guild_id, metric, player_id, radius)
+
+def top_players(guild_id, metric, limit=5):
+    # metric is "<section>.<field>" of a player record, e.g. "stats.combat_experience" or "monster_kills.Wolf"
+    return player_store.top_players(guild_id, metric, limit)
+
+def remove_player_data(guild_id, player_id):
+    player_store.remove(guild_id, player_id)
 
 
-# Get single setting from server
+# Get single setting from server (served from the cached snapshot)
 def get_server_setting(guild_id, setting_name):
-    settings_path = f'server/{guild_id}/server_settings.json'
-    try:
-        with open(settings_path, 'r') as f:
-            settings = json.load(f)
-        return settings.get(setting_name)
-    except FileNotFoundError:
-        logger.error(f"Settings file not found for guild ID {guild_id}.")
-        return None
-    except json.JSONDecodeError:
-        logger.error(f"JSON decoding error in settings file for guild ID {guild_id}.")
-        return None
+    return server_settings(guild_id).get(setting_name)
 
 
 
@@ -116,13 +115,54 @@ def save_server_settings(guild_id, settings_data):
     settings_file = f'server/{guild_id}/server_settings.json'
     logger.debug(f"Attempting to save settings to {settings_file}")
     try:
-        with open(settings_file, 'w') as f:
-            json.dump(settings_data, f, indent=4)
+        atomic_write(settings_file, json.dumps(settings_data, indent=4))
+        # Drop the cached snapshot so the next lookup sees the new values
+        invalidate_server_settings(guild_id)
         logger.debug("Settings saved successfully")
     except Exception as e:
         logger.error(f"Failed to save settings: {e}")
 
 
+async def aget_server_setting(guild_id, setting_name):
+    return (await aserver_settings(guild_id)).get(setting_name)
+
+async def aload_server_settings(guild_id):
+    return await run_in_storage_executor(load_server_settings, guild_id)
+
+# Latest settings per guild waiting for the next group commit
+pending_server_settings = {}
+
+async def asave_server_settings(guild_id, settings_data):
+    guild_key = str(guild_id)
+    pending_server_settings[guild_key] = settings_data
+
+    async def commit():
+        await run_in_storage_executor(save_server_settings, guild_key, pending_server_settings.pop(guild_key))
+
+    await group_writer.schedule(('settings', guild_key), commit)
+
+# Most recent and worst event loop delay seen by monitor_event_loop_lag, in seconds
+event_loop_lag = {"last": 0.0, "max": 0.0}
+event_loop_lag_task = None
+
+async def monitor_event_loop_lag(interval=0.5, warn_threshold=0.1):
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        # Anything past the requested sleep is time the loop spent blocked on someone else
+        lag = max(loop.time() - start - interval, 0.0)
+        event_loop_lag["last"] = lag
+        event_loop_lag["max"] = max(event_loop_lag["max"], lag)
+        if lag > warn_threshold:
+            logger.warning(f"Event loop blocked for {lag * 1000:.0f} ms")
+
+def start_event_loop_lag_monitor():
+    global event_loop_lag_task
+    if event_loop_lag_task is None or event_loop_lag_task.done():
+        event_loop_lag_task = asyncio.create_task(monitor_event_loop_lag())
+
+
 async def send_message(ctx: commands.Context, embed):
     return await ctx.send(embed=embed)
 
@@ -135,6 +175,50 @@ def update_and_save_player_data(interaction: discord.Interaction, inventory, pla
 
     save_player_data(interaction.guild.id, player_id, player_data)
 
+class PlayerSession:
+    """Exclusive read-modify-write access to one player.
+
+    `async with player_session(guild_id, player_id) as session:` waits out any other session on the same player,
+    then hands over the store's live record (session.player_data) and an Exemplar over it (session.player).
+    Stats are changed on session.player; on exit they are copied back and the record is committed once.
+    """
+
+    def __init__(self, guild_id, player_id, player=None):
+        self.guild_id = guild_id
+        self.player_id = str(player_id)
+        # Views that already hold the player's Exemplar (e.g. a running battle) pass it in instead of getting a new one
+        self.player = player
+        self.player_data = None
+        self.lock = player_store.lock(guild_id, player_id)
+
+    async def __aenter__(self):
+        from exemplars.exemplars import Exemplar
+
+        await self.lock.acquire()
+        try:
+            self.player_data = await aload_player_data(self.guild_id, self.player_id)
+        except BaseException:
+            self.lock.release()
+            raise
+
+        if self.player_data is not None and self.player is None:
+            self.player = Exemplar(self.player_data["exemplar"], self.player_data["stats"], guild_id=self.guild_id, inventory=self.player_data["inventory"])
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            # Changes made before an error are already in the live record, so save it either way
+            if self.player_data is not None:
+                if self.player is not None:
+                    self.player_data["stats"] = self.player.stats
+                player_store.put(self.guild_id, self.player_id, self.player_data)
+        finally:
+            self.lock.release()
+        return False
+
+def player_session(guild_id, player_id, player=None):
+    return PlayerSession(guild_id, player_id, player)
+
 async def refresh_player_from_data(context):
     from exemplars.exemplars import Exemplar
 
@@ -146,7 +230,7 @@ async def refresh_player_from_data(context):
         guild_id = context.guild_id
         author_id = str(context.user.id)
 
-    player_data = load_player_data(guild_id, author_id)
+    player_data = await aload_player_data(guild_id, author_id)
     player = None
     if player_data:
         player = Exemplar(player_data["exemplar"], player_data["stats"], guild_id=guild_id, inventory=player_data["inventory"])